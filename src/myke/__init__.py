@@ -1,23 +1,45 @@
+import sys as _sys
 from functools import lru_cache as cache
+from importlib import import_module as _import_module
+from types import ModuleType as _ModuleType
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-from yapx import Command, Context, arg, cmd
-
-from . import exceptions, types, utils
 from .__version__ import __version__
-from .io.echo import echo
-from .io.read import read
-from .io.write import write
-from .main import main
-from .run import (
-    require,
-    run,
-    run_stdout,
-    run_stdout_lines,
-    sh,
-    sh_stdout,
-    sh_stdout_lines,
-)
-from .tasks import TASKS, add_tasks, import_module, import_mykefile, shell_task, task
+
+if TYPE_CHECKING:
+    from yapx import Command, Context, arg, cmd
+
+    from . import exceptions, types, utils
+    from .env import Env
+    from .io.echo import echo
+    from .io.read import read
+    from .io.write import write
+    from .main import main
+    from .memo import persistent_cache
+    from .run import (
+        arun,
+        ash,
+        pipe,
+        require,
+        run,
+        run_iter_lines,
+        run_many,
+        run_stdout,
+        run_stdout_lines,
+        sh,
+        sh_iter_lines,
+        sh_stdout,
+        sh_stdout_lines,
+    )
+    from .shell import Shell
+    from .tasks import (
+        TASKS,
+        add_tasks,
+        import_module,
+        import_mykefile,
+        shell_task,
+        task,
+    )
 
 __all__ = [
     "__version__",
@@ -25,25 +47,110 @@ __all__ = [
     "TASKS",
     "add_tasks",
     "arg",
+    "arun",
+    "ash",
     "cmd",
     "Command",
     "cache",
     "echo",
+    "Env",
     "exceptions",
     "import_module",
     "import_mykefile",
     "main",
+    "persistent_cache",
+    "pipe",
     "read",
     "require",
     "run",
+    "run_iter_lines",
+    "run_many",
     "run_stdout",
     "run_stdout_lines",
     "sh",
+    "sh_iter_lines",
     "sh_stdout",
     "sh_stdout_lines",
+    "Shell",
     "shell_task",
     "task",
     "types",
     "utils",
     "write",
 ]
+
+# Exports are imported on first access (PEP 562), so that `import myke`
+# does not pay for importing `yapx` and friends until they are needed.
+# name -> (module, attribute); the module itself is exported if attribute is None.
+_LAZY_EXPORTS: Dict[str, Tuple[str, Optional[str]]] = {
+    "Command": ("yapx", "Command"),
+    "Context": ("yapx", "Context"),
+    "arg": ("yapx", "arg"),
+    "cmd": ("yapx", "cmd"),
+    "exceptions": (".exceptions", None),
+    "types": (".types", None),
+    "utils": (".utils", None),
+    "echo": (".io.echo", "echo"),
+    "Env": (".env", "Env"),
+    "read": (".io.read", "read"),
+    "write": (".io.write", "write"),
+    "main": (".main", "main"),
+    "persistent_cache": (".memo", "persistent_cache"),
+    "arun": (".run", "arun"),
+    "ash": (".run", "ash"),
+    "pipe": (".run", "pipe"),
+    "require": (".run", "require"),
+    "run": (".run", "run"),
+    "run_iter_lines": (".run", "run_iter_lines"),
+    "run_many": (".run", "run_many"),
+    "run_stdout": (".run", "run_stdout"),
+    "run_stdout_lines": (".run", "run_stdout_lines"),
+    "sh": (".run", "sh"),
+    "sh_iter_lines": (".run", "sh_iter_lines"),
+    "sh_stdout": (".run", "sh_stdout"),
+    "sh_stdout_lines": (".run", "sh_stdout_lines"),
+    "Shell": (".shell", "Shell"),
+    "TASKS": (".tasks", "TASKS"),
+    "add_tasks": (".tasks", "add_tasks"),
+    "import_module": (".tasks", "import_module"),
+    "import_mykefile": (".tasks", "import_mykefile"),
+    "shell_task": (".tasks", "shell_task"),
+    "task": (".tasks", "task"),
+}
+
+
+# nb: the builtin `globals` is shadowed by the submodule `myke.globals` once imported.
+_NAMESPACE: Dict[str, Any] = globals()
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name, attr_name = _LAZY_EXPORTS[name]
+    except KeyError:
+        raise AttributeError(
+            f"module '{__name__}' has no attribute '{name}'",
+        ) from None
+
+    module: _ModuleType = _import_module(module_name, __name__)
+    value: Any = module if attr_name is None else getattr(module, attr_name)
+    _NAMESPACE[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*_NAMESPACE, *_LAZY_EXPORTS})
+
+
+class _MykeModule(_ModuleType):
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+
+        # Importing the submodules `myke.main` and `myke.run` binds them onto
+        # the package; rebind the functions `myke.main` and `myke.run` over them.
+        if isinstance(value, _ModuleType) and name in _LAZY_EXPORTS:
+            module_name, attr_name = _LAZY_EXPORTS[name]
+            if attr_name is not None and value.__name__ == __name__ + module_name:
+                super().__setattr__(name, getattr(value, attr_name))
+
+
+_sys.modules[__name__].__class__ = _MykeModule
@@ -1,4 +1,24 @@
-from .main import main
+import sys
+
+
+def main() -> None:
+    # hand off to a warm daemon, if any, before importing anything heavy.
+    from .daemon import forward
+
+    exit_code = forward(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+    from .profiling import span
+
+    with span("import yapx"):
+        import yapx  # noqa: F401 # pylint: disable=unused-import
+
+    with span("import myke.main"):
+        from .main import main as _main
+
+    _main()
+
 
 if __name__ == "__main__":
     main()
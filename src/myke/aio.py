@@ -0,0 +1,145 @@
+"""> The event loop that runs `async def` tasks.
+
+myke runs one event loop per process, in a background thread, so that coroutines
+can be run from any thread (e.g., tasks run concurrently with `-j`), and so that
+objects created by an async root task (e.g., HTTP sessions) are usable by
+the async tasks that receive them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from contextlib import suppress
+from functools import wraps
+from inspect import isasyncgenfunction
+from typing import Any, AsyncGenerator, Awaitable, Callable, Generator, TypeVar
+
+__all__ = ["get_event_loop", "run_coroutine", "wrap_async"]
+
+T = TypeVar("T")
+
+# (pid, loop); a forked child must not use the loop of its parent.
+_LOOP: list[tuple[int, asyncio.AbstractEventLoop]] = []
+_LOCK: threading.Lock = threading.Lock()
+
+
+def _run_forever(loop: asyncio.AbstractEventLoop, started: threading.Event) -> None:
+    asyncio.set_event_loop(loop)
+    loop.call_soon(started.set)
+    loop.run_forever()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the event loop of myke, starting it in a background thread if needed.
+
+    Returns:
+        ...
+    """
+    with _LOCK:
+        if _LOOP and _LOOP[0][0] == os.getpid() and _LOOP[0][1].is_running():
+            return _LOOP[0][1]
+
+        loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        started: threading.Event = threading.Event()
+        threading.Thread(
+            target=_run_forever,
+            args=(loop, started),
+            name="myke-asyncio",
+            daemon=True,
+        ).start()
+        started.wait()
+
+        _LOOP[:] = [(os.getpid(), loop)]
+        return loop
+
+
+def run_coroutine(coro: Awaitable[T]) -> T:
+    """Run the given coroutine on the event loop of myke, and return its result.
+
+    If called from another running event loop, the coroutine is still run on
+    the loop of myke, so that it shares objects created by the root task.
+
+    Args:
+        coro: ...
+
+    Returns:
+        ...
+
+    Raises:
+        RuntimeError: if called from the event loop of myke, which would deadlock;
+            i.e., an async task that invokes an async task synchronously,
+            rather than awaiting it.
+
+    Examples:
+        >>> import asyncio
+        >>> from myke.aio import run_coroutine
+        ...
+        >>> async def hello():
+        ...     await asyncio.sleep(0)
+        ...     return 'Hello World.'
+        ...
+        >>> run_coroutine(hello())
+        'Hello World.'
+    """
+    running: asyncio.AbstractEventLoop | None = None
+    with suppress(RuntimeError):
+        running = asyncio.get_running_loop()
+
+    loop: asyncio.AbstractEventLoop = get_event_loop()
+
+    if running is loop:
+        if asyncio.iscoroutine(coro):
+            coro.close()
+        raise RuntimeError(
+            "cannot wait for an async task on the event loop it runs on; await it.",
+        )
+
+    future = asyncio.run_coroutine_threadsafe(
+        coro,  # type: ignore[arg-type]
+        loop,
+    )
+    try:
+        return future.result()
+    except KeyboardInterrupt:
+        future.cancel()
+        raise
+
+
+def wrap_async(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap the given `async def` function to run on the event loop of myke.
+
+    Async generator functions (e.g., a root task with async setup and teardown)
+    are wrapped as generator functions, with setup and teardown run on the same loop.
+
+    Args:
+        func: ...
+
+    Returns:
+        ...
+    """
+    if isasyncgenfunction(func):
+
+        @wraps(func)
+        def _inner_generator(*args: Any, **kwargs: Any) -> Generator[Any, None, None]:
+            agen: AsyncGenerator[Any, None] = func(*args, **kwargs)
+
+            try:
+                value: Any = run_coroutine(agen.__anext__())
+            except StopAsyncIteration:
+                return
+
+            yield value
+
+            with suppress(StopAsyncIteration):
+                while True:
+                    run_coroutine(agen.__anext__())
+
+        return _inner_generator
+
+    @wraps(func)
+    def _inner_func(*args: Any, **kwargs: Any) -> Any:
+        return run_coroutine(func(*args, **kwargs))
+
+    return _inner_func
@@ -0,0 +1,334 @@
+"""> A content-addressed store for the outputs of tasks.
+
+Declared with `@task(outputs=[...], cache_outputs=True)`. The cache key of a task
+is computed from its source, its arguments, the content of its inputs, and
+the values of selected environment variables. After the task runs, its outputs
+are saved to the store; on a later run with the same key, the outputs are
+restored from the store instead of running the task.
+
+The store is a directory, `get_cache_dir() / 'artifacts'` by default, and can be
+set to a shared path (e.g., an NFS mount) with the `MYKE_ARTIFACT_STORE`
+environment variable. Files are written atomically, so a store can be shared
+by concurrent runs.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import re
+import shutil
+import tempfile
+from contextlib import suppress
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+from .memo import _hash_arguments, _hash_source
+from .uptodate import PathPatterns, _hash_inputs, expand_paths
+from .utils import get_cache_dir
+
+__all__ = ["get_artifact_store", "get_cache_key", "with_artifact_cache"]
+
+_DIGEST_PATTERN: re.Pattern[str] = re.compile(r"[0-9a-f]{64}")
+
+
+def get_artifact_store() -> Path:
+    """Return the directory of the artifact store.
+
+    Defaults to `get_cache_dir() / 'artifacts'`, and can be overridden
+    with the `MYKE_ARTIFACT_STORE` environment variable.
+
+    Returns:
+        ...
+    """
+    store: str | None = os.getenv("MYKE_ARTIFACT_STORE")
+    if store:
+        return Path(store)
+    return get_cache_dir() / "artifacts"
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _make_tmp_path(path: Path) -> Path:
+    """Create an empty temp file next to the given path, unique across processes and threads."""
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent,
+        prefix=f".{path.name}.",
+        suffix=".tmp",
+    )
+    os.close(fd)
+    return Path(tmp_path)
+
+
+def _write_atomic(path: Path, write: Callable[[Path], Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path: Path = _make_tmp_path(path)
+    try:
+        write(tmp_path)
+        tmp_path.replace(path)
+    finally:
+        with suppress(FileNotFoundError):
+            tmp_path.unlink()
+
+
+def _get_object_path(store: Path, digest: str) -> Path:
+    return store / "objects" / digest[:2] / digest
+
+
+def _get_key_path(store: Path, key: str) -> Path:
+    return store / "keys" / key[:2] / (key + ".json")
+
+
+def _list_output_files(outputs: PathPatterns | None) -> list[Path] | None:
+    """Return the files of the given outputs, or None if any output does not exist."""
+    files: list[Path] = []
+
+    for x in expand_paths(outputs):
+        if x.is_dir():
+            files.extend(sorted(y for y in x.rglob("*") if y.is_file()))
+        elif x.is_file():
+            files.append(x)
+        else:
+            return None
+
+    return files
+
+
+def get_cache_key(
+    func: Callable[..., Any],
+    args: Sequence[Any],
+    kwargs: dict[str, Any],
+    inputs: PathPatterns | None,
+    outputs: PathPatterns | None,
+    env: Sequence[str] | None = None,
+) -> str | None:
+    """Return the cache key of a call to the given task function.
+
+    Args:
+        func: ...
+        args: ...
+        kwargs: ...
+        inputs: ...
+        outputs: ...
+        env: names of environment variables that affect the outputs.
+
+    Returns:
+        None: if the arguments cannot be pickled, to be hashed.
+        str: the cache key.
+    """
+    arguments: Any = (args, sorted(kwargs.items()))
+    with suppress(TypeError, ValueError):
+        bound: inspect.BoundArguments = inspect.signature(func).bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = list(bound.arguments.items())
+
+    # unlike `repr`, the pickle of an argument does not include its memory address.
+    try:
+        arguments_hash: str = _hash_arguments(arguments)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+
+    return hashlib.sha256(
+        json.dumps(
+            {
+                "source": _hash_source(func),
+                "arguments": arguments_hash,
+                "inputs": _hash_inputs(expand_paths(inputs)),
+                "outputs": [
+                    str(x)
+                    for x in (
+                        [outputs] if isinstance(outputs, (str, Path)) else outputs or []
+                    )
+                ],
+                "env": {x: os.getenv(x) for x in sorted(env or [])},
+            },
+            sort_keys=True,
+        ).encode(),
+    ).hexdigest()
+
+
+def _match_parts(parts: Sequence[str], pattern: Sequence[str]) -> bool:
+    """Return True if the given path, or a directory containing it,
+    matches the given glob pattern; both given as parts."""
+    if not pattern:
+        return True
+    if pattern[0] == "**":
+        return any(_match_parts(parts[i:], pattern[1:]) for i in range(len(parts) + 1))
+    return (
+        bool(parts)
+        and fnmatch.fnmatchcase(parts[0], pattern[0])
+        and _match_parts(parts[1:], pattern[1:])
+    )
+
+
+def _get_restore_path(
+    root: Path,
+    name: str,
+    outputs: PathPatterns | None,
+) -> Path | None:
+    """Return the path to restore the given file to, or None if it is outside `root`,
+    or not one of the declared outputs (or within one)."""
+    path: Path = Path(name)
+    if path.is_absolute() or ".." in path.parts:
+        return None
+
+    resolved: Path = (root / path).resolve()
+    if root not in resolved.parents:
+        return None
+
+    for x in [outputs] if isinstance(outputs, (str, Path)) else outputs or []:
+        pattern: str = os.path.normpath(
+            os.path.relpath(x, root) if os.path.isabs(x) else x
+        )
+        if pattern.split(os.sep)[0] != ".." and _match_parts(
+            path.parts,
+            Path(pattern).parts,
+        ):
+            return path
+
+    return None
+
+
+def _restore(store: Path, key: str, outputs: PathPatterns | None) -> bool:
+    """Restore the files of the given key, if all are in the store, and intact.
+
+    The manifest of a key may come from a shared store, so files that are not
+    declared outputs within the current directory are refused,
+    and each object is checked against its digest.
+    """
+    try:
+        manifest: dict[str, Any] = json.loads(_get_key_path(store, key).read_text())
+    except (OSError, ValueError):
+        return False
+
+    files: dict[str, dict[str, Any]] = manifest.get("files", {})
+    root: Path = Path.cwd().resolve()
+
+    # (tmp_path, path, mode) of files copied from the store, but not yet restored.
+    staged: list[tuple[Path, Path, int]] = []
+
+    try:
+        for name, x in files.items():
+            path: Path | None = _get_restore_path(root, name, outputs)
+            digest: str = x["sha256"]
+            if path is None or not _DIGEST_PATTERN.fullmatch(digest):
+                return False
+
+            object_path: Path = _get_object_path(store, digest)
+            if not object_path.exists():
+                return False
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path: Path = _make_tmp_path(path)
+            staged.append((tmp_path, path, x["mode"]))
+            shutil.copyfile(object_path, tmp_path)
+            if _hash_file(tmp_path) != digest:
+                # drop the corrupt object, to be saved again by this run.
+                object_path.unlink()
+                return False
+
+        for tmp_path, path, mode in staged:
+            tmp_path.chmod(mode)
+            tmp_path.replace(path)
+    except (OSError, KeyError, TypeError):
+        return False
+    finally:
+        for tmp_path, _, _ in staged:
+            with suppress(FileNotFoundError):
+                tmp_path.unlink()
+
+    return True
+
+
+def _save(store: Path, key: str, files: list[Path]) -> None:
+    manifest: dict[str, dict[str, Any]] = {}
+
+    for x in files:
+        digest: str = _hash_file(x)
+        object_path: Path = _get_object_path(store, digest)
+        if not object_path.exists():
+            _write_atomic(
+                object_path,
+                lambda tmp_path, x=x: shutil.copyfile(x, tmp_path),
+            )
+        manifest[os.path.relpath(x)] = {
+            "sha256": digest,
+            "mode": x.stat().st_mode & 0o7777,
+        }
+
+    _write_atomic(
+        _get_key_path(store, key),
+        lambda tmp_path: tmp_path.write_text(json.dumps({"files": manifest})),
+    )
+
+
+def with_artifact_cache(
+    func: Callable[..., Any],
+    name: str,
+    inputs: PathPatterns | None,
+    outputs: PathPatterns | None,
+    env: Sequence[str] | None = None,
+) -> Callable[..., Any]:
+    """Wrap the given task function to restore its outputs from the artifact store.
+
+    Args:
+        func: ...
+        name: name of the task.
+        inputs: ...
+        outputs: ...
+        env: names of environment variables that affect the outputs.
+
+    Returns:
+        ...
+    """
+
+    @wraps(func)
+    def _inner_func(*args: Any, **kwargs: Any) -> Any:
+        from .io.echo import echo
+
+        store: Path = get_artifact_store()
+        key: str | None = get_cache_key(
+            func,
+            args,
+            kwargs,
+            inputs=inputs,
+            outputs=outputs,
+            env=env,
+        )
+
+        if key is None:
+            echo.verbose(f"{name}: arguments cannot be hashed; artifact store skipped.")
+            return func(*args, **kwargs)
+
+        if _restore(store, key, outputs):
+            echo.verbose(f"{name}: restored outputs from the artifact store; {key}.")
+            return None
+
+        result: Any = func(*args, **kwargs)
+
+        files: list[Path] | None = _list_output_files(outputs)
+        if files is None:
+            echo.verbose(f"{name}: not all outputs exist; not saved to the store.")
+        else:
+            try:
+                _save(store, key, files)
+            except OSError as e:
+                # the store is a cache; never fail a task that succeeded over it.
+                echo.verbose(f"{name}: outputs not saved to the artifact store; {e}")
+            else:
+                echo.verbose(f"{name}: saved outputs to the artifact store; {key}.")
+
+        return result
+
+    return _inner_func
@@ -0,0 +1,371 @@
+"""> A warm myke process, serving tasks to thin clients over a Unix socket.
+
+`myke --myke-daemon` imports the Mykefiles (and everything they import),
+then listens on a Unix domain socket. The `myke` command forwards its
+arguments, working directory, environment, and stdio file descriptors
+to the daemon, which runs the task in a forked child of the warm process.
+
+When any imported file changes, the daemon restarts itself,
+and the client runs the task itself.
+
+A connected peer controls what the daemon runs, so only the user running the
+daemon may connect: the socket is private to that user (mode 0o600, in a
+directory of mode 0o700), and both sides check the user at the other end.
+"""
+
+from __future__ import annotations
+
+import array
+import json
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+import traceback
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+from .utils import _hash_text, get_cache_dir, get_repo_root
+
+__all__ = ["is_supported", "get_socket_path", "forward", "serve"]
+
+_HEADER: struct.Struct = struct.Struct("!I")
+_N_FDS: int = 3
+
+
+def is_supported() -> bool:
+    return hasattr(socket, "AF_UNIX") and hasattr(os, "fork")
+
+
+def get_socket_path() -> Path:
+    """Return the path of the daemon socket for the current directory.
+
+    Defaults to a socket in `get_cache_dir() / 'daemon'`, keyed by the root of the
+    git repo (or the current directory), and can be overridden with
+    the `MYKE_DAEMON_SOCKET` environment variable.
+
+    Returns:
+        ...
+    """
+    socket_path: str | None = os.getenv("MYKE_DAEMON_SOCKET")
+    if socket_path:
+        return Path(socket_path)
+
+    root: Path | None = None
+    with suppress(FileNotFoundError):
+        root = get_repo_root()
+
+    return (
+        get_cache_dir()
+        / "daemon"
+        / (_hash_text(root if root else Path.cwd())[:16] + ".sock")
+    )
+
+
+def _get_peer_uid(conn: socket.socket) -> int | None:
+    """Return the uid of the process at the other end of the given Unix socket,
+    or None if unknown on this platform."""
+    peercred: int | None = getattr(socket, "SO_PEERCRED", None)
+    if peercred is None:
+        return None
+
+    creds: struct.Struct = struct.Struct("3i")
+    _, uid, _ = creds.unpack(
+        conn.getsockopt(socket.SOL_SOCKET, peercred, creds.size),
+    )
+    return uid
+
+
+def _is_trusted_peer(conn: socket.socket) -> bool:
+    uid: int | None = _get_peer_uid(conn)
+    return uid is None or uid == os.getuid()
+
+
+def _is_trusted_socket(socket_path: Path) -> bool:
+    """Return True if the given path is a socket owned by, and private to, this user."""
+    try:
+        st: os.stat_result = socket_path.lstat()
+    except OSError:
+        return False
+
+    return (
+        stat.S_ISSOCK(st.st_mode)
+        and st.st_uid == os.getuid()
+        and not st.st_mode & (stat.S_IRWXG | stat.S_IRWXO)
+    )
+
+
+def _send_json(conn: socket.socket, obj: dict[str, Any]) -> None:
+    conn.sendall(json.dumps(obj).encode() + b"\n")
+
+
+def _recv_exactly(conn: socket.socket, size: int) -> bytes:
+    data: bytes = b""
+    while len(data) < size:
+        chunk: bytes = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        data += chunk
+    return data
+
+
+def forward(args: Sequence[str]) -> int | None:
+    """Run the given args in the myke daemon, if one is listening.
+
+    Args:
+        args: command-line arguments.
+
+    Returns:
+        None: if the daemon is not available, and the args should be run locally.
+        int: exit code of the task run by the daemon.
+    """
+    if "--myke-daemon" in args or os.getenv("MYKE_DAEMON") == "0" or not is_supported():
+        return None
+
+    socket_path: Path = get_socket_path()
+    if not socket_path.exists():
+        return None
+
+    if not _is_trusted_socket(socket_path):
+        print(
+            f"myke: ignoring daemon socket not private to this user: {socket_path}",
+            file=sys.stderr,
+        )
+        return None
+
+    conn: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        conn.connect(str(socket_path))
+
+        # the environment and stdio are only sent to a daemon of this user.
+        if not _is_trusted_peer(conn):
+            return None
+
+        request: bytes = json.dumps(
+            {"argv": list(args), "cwd": os.getcwd(), "env": dict(os.environ)},
+        ).encode()
+
+        conn.sendmsg(
+            [_HEADER.pack(len(request))],
+            [
+                (
+                    socket.SOL_SOCKET,
+                    socket.SCM_RIGHTS,
+                    array.array("i", range(_N_FDS)).tobytes(),
+                ),
+            ],
+        )
+        conn.sendall(request)
+
+        responses = conn.makefile("r", encoding="utf-8")
+        child_pid: int | None = None
+
+        while True:
+            try:
+                line: str = responses.readline()
+            except KeyboardInterrupt:
+                if child_pid:
+                    with suppress(OSError):
+                        os.kill(child_pid, signal.SIGINT)
+                continue
+
+            if not line:
+                # the daemon went away without a result.
+                return None
+
+            response: dict[str, Any] = json.loads(line)
+            if "pid" in response:
+                child_pid = response["pid"]
+            elif "exit" in response:
+                return int(response["exit"])
+            else:
+                return None
+    except (OSError, ValueError):
+        return None
+    finally:
+        conn.close()
+
+
+def _get_watched_files() -> dict[str, int]:
+    from .tasks import _IMPORTED_MYKEFILES
+
+    files: dict[str, int] = {}
+
+    for x in [
+        *_IMPORTED_MYKEFILES,
+        *[getattr(m, "__file__", None) for m in list(sys.modules.values())],
+    ]:
+        if x and x not in files:
+            with suppress(OSError):
+                files[x] = os.stat(x).st_mtime_ns
+
+    return files
+
+
+def _is_stale(files: dict[str, int]) -> bool:
+    for path, mtime_ns in files.items():
+        try:
+            if os.stat(path).st_mtime_ns != mtime_ns:
+                return True
+        except OSError:
+            return True
+    return False
+
+
+def _run_child(
+    conn: socket.socket,
+    fds: list[int],
+    request: dict[str, Any],
+    func: Callable[[], Any],
+) -> None:
+    """Run in the forked child: adopt the client's stdio, cwd, env, and argv."""
+    exit_code: int = 0
+
+    try:
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+        for i, fd in enumerate(fds):
+            os.dup2(fd, i)
+            os.close(fd)
+
+        sys.stdout.reconfigure(  # type: ignore[attr-defined]
+            line_buffering=os.isatty(1),
+            write_through=bool(request["env"].get("PYTHONUNBUFFERED")),
+        )
+
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.argv = [sys.argv[0], *request["argv"]]
+
+        _send_json(conn, {"pid": os.getpid()})
+
+        func()
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code, int):
+            exit_code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except KeyboardInterrupt:
+        exit_code = 130
+    except BaseException:  # pylint: disable=broad-except # noqa: BLE001
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        with suppress(BaseException):
+            sys.stdout.flush()
+            sys.stderr.flush()
+        with suppress(BaseException):
+            _send_json(conn, {"exit": exit_code})
+        os._exit(exit_code)
+
+
+def serve(
+    func: Callable[[], Any],
+    restart_args: Sequence[str],
+    restart_cwd: str | Path,
+    socket_path: str | Path | None = None,
+) -> None:
+    """Serve requests from `forward(...)` until any imported file changes.
+
+    Each request is handled by calling `func` in a forked child,
+    with the requested args, working directory, environment, and stdio.
+
+    Args:
+        func: function that runs a request, e.g., `myke.main`.
+        restart_args: args (including the executable) used to restart the daemon.
+        restart_cwd: working directory used to restart the daemon.
+        socket_path: path of the Unix socket to listen on.
+    """
+    if not is_supported():
+        raise NotImplementedError("The myke daemon requires Unix sockets and fork.")
+
+    if socket_path is None:
+        socket_path = get_socket_path()
+    socket_path = Path(socket_path)
+
+    socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if socket_path.parent.stat().st_uid != os.getuid():
+        raise PermissionError(f"not owned by this user: {socket_path.parent}")
+    with suppress(FileNotFoundError):
+        socket_path.unlink()
+
+    watched_files: dict[str, int] = _get_watched_files()
+
+    # children are reaped automatically.
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    server: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # the socket is private from its creation, regardless of the umask.
+    umask: int = os.umask(0o177)
+    try:
+        server.bind(str(socket_path))
+    finally:
+        os.umask(umask)
+    os.chmod(socket_path, 0o600)
+    server.listen()
+
+    print(f"myke daemon listening on: {socket_path}", flush=True)
+
+    try:
+        while True:
+            conn, _ = server.accept()
+
+            fds: list[int] = []
+            try:
+                if not _is_trusted_peer(conn):
+                    raise PermissionError("refused a connection from another user")
+
+                msg, ancdata, _, _ = conn.recvmsg(
+                    _HEADER.size,
+                    socket.CMSG_LEN(_N_FDS * array.array("i").itemsize),
+                )
+                for level, kind, data in ancdata:
+                    if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                        fds_array = array.array("i")
+                        fds_array.frombytes(
+                            data[: len(data) - (len(data) % fds_array.itemsize)],
+                        )
+                        fds.extend(fds_array)
+
+                if len(msg) != _HEADER.size or len(fds) != _N_FDS:
+                    raise ValueError("invalid request")
+
+                request: dict[str, Any] = json.loads(
+                    _recv_exactly(conn, _HEADER.unpack(msg)[0]),
+                )
+
+                if _is_stale(watched_files):
+                    _send_json(conn, {"stale": True})
+                    break
+
+                sys.stdout.flush()
+                sys.stderr.flush()
+
+                if os.fork() == 0:
+                    server.close()
+                    _run_child(conn, fds, request, func)
+            except (OSError, ValueError) as e:
+                print(f"myke daemon: {e}", file=sys.stderr, flush=True)
+            finally:
+                for fd in fds:
+                    with suppress(OSError):
+                        os.close(fd)
+                conn.close()
+    finally:
+        server.close()
+        with suppress(FileNotFoundError):
+            socket_path.unlink()
+
+    # an imported file has changed; restart to pick up the changes.
+    print("myke daemon: imported files changed; restarting.", flush=True)
+    os.chdir(restart_cwd)
+    os.execv(restart_args[0], list(restart_args))
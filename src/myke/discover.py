@@ -0,0 +1,236 @@
+"""> Functions for discovering tasks in a Mykefile without executing it.
+
+Tasks are read from the `@task` and `@shell_task` decorators of top-level
+functions. If the Mykefile registers tasks dynamically, e.g., using `add_tasks`
+or computed names, discovery is abandoned and the Mykefile must be imported.
+"""
+
+from __future__ import annotations
+
+import ast
+import os
+from pathlib import Path
+from typing import Any
+
+from .globals import MYKE_VAR_NAME
+from .tasks import ROOT_TASK_KEY, Task, _TaskStub
+from .utils import convert_to_command_string
+
+__all__ = ["discover_tasks"]
+
+_DECORATORS: tuple[str, ...] = ("task", "shell_task")
+_DYNAMIC_FUNCS: tuple[str, ...] = (
+    "add_tasks",
+    "import_module",
+    "import_mykefile",
+    *_DECORATORS,
+)
+
+
+class _DynamicTasksError(Exception):
+    """Raised when tasks cannot be discovered statically."""
+
+
+class _TaskVisitor(ast.NodeVisitor):
+    def __init__(self, source: str) -> None:
+        self.source: str = source
+        # local names that refer to the `myke` module, e.g., from `import myke`.
+        self.modules: set[str] = set()
+        # local names that refer to functions of `myke`, e.g., `from myke import task`.
+        self.funcs: dict[str, str] = {}
+        self.tasks: list[tuple[ast.FunctionDef | ast.AsyncFunctionDef, ast.expr]] = []
+        self._decorators: set[int] = set()
+        self._depth: int = 0
+
+    def _resolve(self, node: ast.expr) -> str | None:
+        if isinstance(node, ast.Name):
+            return self.funcs.get(node.id)
+        if (
+            isinstance(node, ast.Attribute)
+            and isinstance(node.value, ast.Name)
+            and node.value.id in self.modules
+        ):
+            return node.attr
+        return None
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for x in node.names:
+            if x.name == MYKE_VAR_NAME:
+                self.modules.add(x.asname or x.name)
+            elif x.name.startswith(MYKE_VAR_NAME + ".") and not x.asname:
+                # e.g., `import myke.io` binds `myke`.
+                self.modules.add(MYKE_VAR_NAME)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        if node.module == MYKE_VAR_NAME:
+            for x in node.names:
+                if x.name == "*":
+                    self.funcs.update((y, y) for y in (*_DYNAMIC_FUNCS, "cmd"))
+                else:
+                    self.funcs[x.asname or x.name] = x.name
+
+    def _visit_function(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+        for x in node.decorator_list:
+            func: ast.expr = x.func if isinstance(x, ast.Call) else x
+            if self._resolve(func) in _DECORATORS:
+                if self._depth:
+                    raise _DynamicTasksError(node.name)
+                self.tasks.append((node, x))
+                self._decorators.add(id(x))
+
+        self._depth += 1
+        self.generic_visit(node)
+        self._depth -= 1
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if id(node) not in self._decorators and (
+            self._resolve(node.func) in _DYNAMIC_FUNCS
+        ):
+            raise _DynamicTasksError(ast.dump(node.func))
+        self.generic_visit(node)
+
+    def _literal(self, node: ast.expr) -> Any:
+        try:
+            return ast.literal_eval(node)
+        except ValueError as e:
+            raise _DynamicTasksError(ast.dump(node)) from e
+
+    def _parent_name(self, node: ast.expr) -> str:
+        if isinstance(node, ast.Call) and self._resolve(node.func) == "cmd":
+            for kw in node.keywords:
+                if kw.arg == "name":
+                    name: Any = self._literal(kw.value)
+                    if not isinstance(name, str):
+                        raise _DynamicTasksError(ast.dump(node))
+                    return name
+            if node.args and isinstance(node.args[0], ast.Name):
+                return convert_to_command_string(node.args[0].id)
+            raise _DynamicTasksError(ast.dump(node))
+
+        name = self._literal(node)
+        if not isinstance(name, str):
+            raise _DynamicTasksError(ast.dump(node))
+        return name
+
+    def _format_signature(self, node: ast.arguments) -> str:
+        def _segment(x: ast.AST) -> str:
+            return ast.get_source_segment(self.source, x) or "..."
+
+        def _param(
+            x: ast.arg,
+            default: ast.expr | None = None,
+            prefix: str = "",
+        ) -> str:
+            txt: str = prefix + x.arg
+            if x.annotation is not None:
+                txt += ": " + _segment(x.annotation)
+            if default is not None:
+                txt += (" = " if x.annotation is not None else "=") + _segment(default)
+            return txt
+
+        positional: list[ast.arg] = [*node.posonlyargs, *node.args]
+        defaults: list[ast.expr | None] = [None] * (
+            len(positional) - len(node.defaults)
+        ) + list(node.defaults)
+
+        params: list[str] = [_param(x, d) for x, d in zip(positional, defaults)]
+        if node.posonlyargs:
+            params.insert(len(node.posonlyargs), "/")
+
+        if node.vararg:
+            params.append(_param(node.vararg, prefix="*"))
+        elif node.kwonlyargs:
+            params.append("*")
+
+        params.extend(_param(x, d) for x, d in zip(node.kwonlyargs, node.kw_defaults))
+
+        if node.kwarg:
+            params.append(_param(node.kwarg, prefix="**"))
+
+        return "(" + ", ".join(params) + ")"
+
+    def get_tasks(self, path: str, module: str) -> list[Task]:
+        tasks: list[Task] = []
+
+        for func_node, decorator in self.tasks:
+            name: str = convert_to_command_string(func_node.name)
+            parents: tuple[str, ...] = ()
+
+            if isinstance(decorator, ast.Call):
+                if decorator.args:
+                    raise _DynamicTasksError(func_node.name)
+                for kw in decorator.keywords:
+                    if kw.arg is None:
+                        # e.g., `@task(**kwargs)`
+                        raise _DynamicTasksError(func_node.name)
+                    if kw.arg == "name":
+                        name = self._literal(kw.value)
+                        if not isinstance(name, str):
+                            raise _DynamicTasksError(func_node.name)
+                    elif kw.arg == "parents":
+                        if isinstance(kw.value, (ast.Tuple, ast.List)):
+                            parents = tuple(self._parent_name(x) for x in kw.value.elts)
+                        elif not (
+                            isinstance(kw.value, ast.Constant)
+                            and kw.value.value is None
+                        ):
+                            parents = (self._parent_name(kw.value),)
+                    elif kw.arg == "root" and self._literal(kw.value):
+                        name = ROOT_TASK_KEY
+
+            returns: str = ""
+            if func_node.returns is not None:
+                returns = " -> " + (
+                    ast.get_source_segment(self.source, func_node.returns) or "..."
+                )
+
+            tasks.append(
+                Task(
+                    name=name,
+                    function=_TaskStub(
+                        name=func_node.name,
+                        module=module,
+                        path=path,
+                        doc=ast.get_docstring(func_node),
+                        signature=self._format_signature(func_node.args) + returns,
+                    ),
+                    parents=parents,
+                ),
+            )
+
+        return tasks
+
+
+def discover_tasks(path: str | Path) -> list[Task] | None:
+    """Statically discover the tasks of a Mykefile, without executing it.
+
+    The function of each returned task is a stub;
+    the Mykefile must be imported before any task is invoked.
+
+    Args:
+        path: path to the Mykefile.
+
+    Returns:
+        None: if the tasks cannot be discovered statically.
+        list: tasks defined in the Mykefile.
+
+    Examples:
+        >>> from myke.discover import discover_tasks
+        ...
+        >>> discover_tasks('/path/to/Mykefile')  # doctest: +SKIP
+    """
+    path = os.path.abspath(path)
+    source: str = Path(path).read_text(encoding="utf-8")
+
+    visitor: _TaskVisitor = _TaskVisitor(source)
+
+    try:
+        visitor.visit(ast.parse(source, filename=path))
+        tasks: list[Task] = visitor.get_tasks(path=path, module=os.path.relpath(path))
+    except (_DynamicTasksError, SyntaxError):
+        return None
+
+    return tasks if tasks else None
@@ -0,0 +1,97 @@
+"""> Prepared environments, for running many commands with the same environment.
+
+By default, each call to `myke.run` copies `os.environ`, and applies `env_update`.
+An `Env` is merged once, and passed as `myke.run(..., env=...)` to skip that work.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Iterator, Mapping
+
+__all__ = ["Env"]
+
+
+class Env(Mapping[str, str]):
+    """An environment for `myke.run(..., env=...)`, merged once and reused across calls.
+
+    An `Env` is immutable; use `derive(...)` for a child environment with changes.
+    A child is layered on its parent, and is only merged when first used.
+
+    Args:
+        base: the variables to start from; defaults to a snapshot of `os.environ`.
+        update: variables to set on top of `base`; a value of None unsets the variable.
+        **kwargs: more variables to set.
+
+    Examples:
+        >>> import myke
+        ...
+        >>> env = myke.Env(update={'GREETING': 'Hello'})
+        >>> for x in ['World', 'Moon']:
+        ...     p = myke.run('echo "$GREETING $NAME."', env=env.derive(NAME=x))
+        Hello World.
+        Hello Moon.
+    """
+
+    __slots__ = ("_parent", "_update", "_merged")
+
+    def __init__(
+        self,
+        base: Mapping[str, str] | None = None,
+        update: Mapping[str, str | None] | None = None,
+        **kwargs: str | None,
+    ) -> None:
+        self._parent: Mapping[str, str] = os.environ.copy() if base is None else base
+        self._update: dict[str, str | None] = {**(update or {}), **kwargs}
+        self._merged: dict[str, str] | None = None
+
+    def derive(
+        self,
+        update: Mapping[str, str | None] | None = None,
+        **kwargs: str | None,
+    ) -> Env:
+        """Return a child environment, with the given changes on top of this one.
+
+        Args:
+            update: ...
+            **kwargs: ...
+
+        Returns:
+            ...
+        """
+        return Env(self, update, **kwargs)
+
+    def to_dict(self) -> dict[str, str]:
+        """Return the merged environment.
+
+        The dict is merged once, and shared by every caller; it must not be modified.
+
+        Returns:
+            ...
+        """
+        merged: dict[str, str] | None = self._merged
+        if merged is None:
+            merged = dict(
+                self._parent.to_dict()
+                if isinstance(self._parent, Env)
+                else self._parent,
+            )
+            for k, v in self._update.items():
+                if v is None:
+                    merged.pop(k, None)
+                else:
+                    merged[k] = v
+            self._merged = merged
+        return merged
+
+    def __getitem__(self, key: str) -> str:
+        return self.to_dict()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_dict())
+
+    def __len__(self) -> int:
+        return len(self.to_dict())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._update!r})"
@@ -9,6 +9,18 @@ class NoTasksFoundError(Exception):
     ...
 
 
+class TaskNotFoundError(Exception):
+    ...
+
+
+class DependencyCycleError(Exception):
+    ...
+
+
+class ShellExitedError(Exception):
+    ...
+
+
 #  class CalledProcessError(subprocess.CalledProcessError):
 #      def __str__(self) -> str:
 #          if self.returncode and self.returncode < 0:
@@ -0,0 +1,365 @@
+"""> A local database of task runs, for spotting performance regressions over time.
+
+Each task run by `myke` is recorded in a SQLite database, `get_cache_dir() / 'history.db'`,
+with its duration, exit status, and the resource usage of the processes it ran.
+Recording is disabled with the `MYKE_HISTORY=0` environment variable.
+`myke --myke-stats [TASK]` prints a summary of the runs of tasks in the current project.
+"""
+
+from __future__ import annotations
+
+import inspect
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import suppress
+from functools import wraps
+from pathlib import Path
+from subprocess import CalledProcessError
+from typing import Any, Callable, Generator, Sequence
+
+from .memo import _hash_arguments
+from .usage import ResourceUsage, TaskUsage, get_task_usage
+from .utils import _hash_text, get_cache_dir
+
+__all__ = ["get_history_path", "enable", "wrap", "get_runs", "report"]
+
+_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL,
+    task TEXT NOT NULL,
+    parents TEXT NOT NULL,
+    args_hash TEXT NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    status INTEGER NOT NULL,
+    processes INTEGER NOT NULL,
+    user_time REAL,
+    system_time REAL,
+    max_rss INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_project_task_start ON runs (project, task, start);
+"""
+
+# number of recent runs compared with the runs before them, for the trend.
+TREND_WINDOW: int = 10
+
+_ENABLED: list[bool] = []
+# the project that runs are recorded under, i.e., the working directory of myke.
+_PROJECT: list[str] = []
+# (pid, path, connection); a forked child must not use the connection of its parent.
+_CONNECTION: list[tuple[int, Path, sqlite3.Connection]] = []
+_LOCK: threading.Lock = threading.Lock()
+
+
+def get_history_path() -> Path:
+    return get_cache_dir() / "history.db"
+
+
+def enable() -> None:
+    """Record the runs of tasks, unless disabled by `MYKE_HISTORY=0`.
+
+    Runs are recorded under the current working directory, as the project.
+    """
+    _PROJECT[:] = [os.getcwd()]
+    if os.getenv("MYKE_HISTORY", "").lower() not in ("0", "false", "no"):
+        _ENABLED[:] = [True]
+
+
+def _get_project() -> str:
+    return _PROJECT[0] if _PROJECT else os.getcwd()
+
+
+def _get_connection() -> sqlite3.Connection:
+    """Return the connection to the database, shared by this process.
+
+    The schema is created upon the first connection. The caller must hold `_LOCK`.
+    """
+    path: Path = get_history_path()
+
+    if _CONNECTION:
+        pid, conn_path, conn = _CONNECTION[0]
+        if pid == os.getpid() and conn_path == path:
+            return conn
+        if pid == os.getpid():
+            conn.close()
+        _CONNECTION.clear()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=10, check_same_thread=False)
+    try:
+        conn.executescript(_SCHEMA)
+    except sqlite3.Error:
+        conn.close()
+        raise
+
+    _CONNECTION[:] = [(os.getpid(), path, conn)]
+    return conn
+
+
+def _get_status(error: BaseException | None) -> int:
+    if error is None or isinstance(error, GeneratorExit):
+        return 0
+    if isinstance(error, CalledProcessError):
+        return error.returncode or 1
+    if isinstance(error, SystemExit):
+        return error.code if isinstance(error.code, int) else int(bool(error.code))
+    if isinstance(error, KeyboardInterrupt):
+        return 130
+    return 1
+
+
+class _Run:
+    """One run of a task, saved when it finishes."""
+
+    def __init__(self, task: str, parents: str, args_hash: str) -> None:
+        self.task: str = task
+        self.parents: str = parents
+        self.args_hash: str = args_hash
+        # the processes run by the task are counted by `usage.wrap`, outside this run.
+        self.usage: TaskUsage = get_task_usage() or TaskUsage()
+        self.start: float = time.time()
+
+    def finish(self, error: BaseException | None) -> None:
+        if not _ENABLED:
+            return
+
+        end: float = time.time()
+
+        # the history is a diagnostic; never fail a task over it.
+        with suppress(sqlite3.Error, OSError), _LOCK:
+            conn: sqlite3.Connection = _get_connection()
+            with conn:
+                conn.execute(
+                    "INSERT INTO runs (project, task, parents, args_hash, start, end,"
+                    " status, processes, user_time, system_time, max_rss)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        _get_project(),
+                        self.task,
+                        self.parents,
+                        self.args_hash,
+                        self.start,
+                        end,
+                        _get_status(error),
+                        self.usage.count,
+                        *_get_totals(self.usage),
+                    ),
+                )
+
+
+def _get_totals(task_usage: TaskUsage) -> tuple[Any, Any, Any]:
+    """Return the (user_time, system_time, max_rss) of the processes run by a task."""
+    x: ResourceUsage | None = task_usage.usage
+    if x is None:
+        return None, None, None
+    return x.user_time, x.system_time, x.max_rss
+
+
+def _get_arguments_hash(
+    signature: inspect.Signature | None,
+    args: Any,
+    kwargs: dict[str, Any],
+) -> str:
+    """Return a hash of the arguments of a run, bound to the parameters of the task,
+    so that, e.g., `build()` and `build(fail=False)` hash the same."""
+    arguments: Any = (args, sorted(kwargs.items()))
+    if signature is not None:
+        with suppress(TypeError):
+            bound: inspect.BoundArguments = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = list(bound.arguments.items())
+
+    # args of the form `_context` are given by myke, e.g., the relay value.
+    if isinstance(arguments, list):
+        arguments = [(k, v) for k, v in arguments if not k.startswith("_")]
+    else:
+        arguments = (args, [(k, v) for k, v in arguments[1] if not k.startswith("_")])
+
+    try:
+        return _hash_arguments(arguments)[:16]
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return _hash_text(repr(arguments))[:16]
+
+
+def wrap(
+    func: Callable[..., Any],
+    name: str,
+    parents: Sequence[str] = (),
+) -> Callable[..., Any]:
+    """Wrap the given task function, to record each run, if enabled by `enable()`.
+
+    The usage of each run is that of the task being run, e.g., by `usage.wrap`.
+    The setup and teardown of generator functions are recorded as one run.
+
+    Args:
+        func: ...
+        name: name of the task.
+        parents: names of the parents of the task.
+
+    Returns:
+        ...
+    """
+    full_name: str = " ".join([*parents, name])
+    parents_name: str = " ".join(parents)
+
+    signature: inspect.Signature | None = None
+    with suppress(TypeError, ValueError):
+        signature = inspect.signature(func)
+
+    def _start(args: Any, kwargs: dict[str, Any]) -> _Run:
+        return _Run(
+            full_name,
+            parents_name,
+            _get_arguments_hash(signature, args, kwargs),
+        )
+
+    if inspect.isgeneratorfunction(func):
+
+        @wraps(func)
+        def _wrapped_generator(*args: Any, **kwargs: Any) -> Generator[Any, None, Any]:
+            if not _ENABLED:
+                return (yield from func(*args, **kwargs))
+
+            run: _Run = _start(args, kwargs)
+            error: BaseException | None = None
+            try:
+                gen: Generator[Any, None, Any] = func(*args, **kwargs)
+
+                try:
+                    value: Any = next(gen)
+                except StopIteration as e:
+                    return e.value
+
+                yield value
+
+                with suppress(StopIteration):
+                    while True:
+                        next(gen)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                run.finish(error)
+
+        return _wrapped_generator
+
+    @wraps(func)
+    def _wrapped(*args: Any, **kwargs: Any) -> Any:
+        if not _ENABLED:
+            return func(*args, **kwargs)
+
+        run: _Run = _start(args, kwargs)
+        error: BaseException | None = None
+        try:
+            return func(*args, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            run.finish(error)
+
+    return _wrapped
+
+
+def get_runs(task: str | None = None) -> list[dict[str, Any]]:
+    """Return the recorded runs of tasks in the project, oldest first.
+
+    The project is the working directory when `enable()` was called, if at all,
+    else the current working directory.
+
+    Args:
+        task: return only the runs of this task.
+
+    Returns:
+        ...
+    """
+    if not get_history_path().exists():
+        return []
+
+    query: str = "SELECT * FROM runs WHERE project = ?"
+    params: list[Any] = [_get_project()]
+    if task:
+        query += " AND task = ?"
+        params.append(task)
+    query += " ORDER BY start"
+
+    with _LOCK:
+        cursor: sqlite3.Cursor = _get_connection().cursor()
+        cursor.row_factory = sqlite3.Row
+        return [dict(x) for x in cursor.execute(query, params)]
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    """Return the q-th percentile of the given sorted values, by linear interpolation."""
+    i: float = (len(values) - 1) * q / 100
+    lo: int = int(i)
+    hi: int = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (i - lo)
+
+
+def _get_trend(durations: Sequence[float]) -> str:
+    """Return the change in the median duration of the recent runs,
+    compared with the runs before them."""
+    if len(durations) < 2 * TREND_WINDOW:
+        return ""
+    recent: list[float] = sorted(durations[-TREND_WINDOW:])
+    before: list[float] = sorted(durations[-2 * TREND_WINDOW : -TREND_WINDOW])
+    median_before: float = _percentile(before, 50)
+    if not median_before:
+        return ""
+    return f"{(_percentile(recent, 50) / median_before - 1) * 100:+.0f}%"
+
+
+def report(task: str | None = None) -> None:
+    """Print a summary of the recorded runs of each task in the current project.
+
+    Percentiles, and the trend, are of the durations of successful runs.
+    The trend compares the median of the last 10 successful runs
+    with the median of the 10 runs before them.
+
+    Args:
+        task: summarize only the runs of this task.
+    """
+    from .io.echo import echo
+
+    runs_by_task: dict[str, list[dict[str, Any]]] = {}
+    for x in get_runs(task):
+        runs_by_task.setdefault(x["task"], []).append(x)
+
+    if not runs_by_task:
+        echo(f"No runs recorded{f' of: {task}' if task else ''}.")
+        return
+
+    rows: list[dict[str, Any]] = []
+
+    for name, runs in sorted(runs_by_task.items()):
+        durations: list[float] = [
+            x["end"] - x["start"] for x in runs if not x["status"]
+        ]
+        sorted_durations: list[float] = sorted(durations)
+        cpu_times: list[float] = [
+            x["user_time"] + x["system_time"]
+            for x in runs
+            if not x["status"] and x["user_time"] is not None
+        ]
+        max_rss: list[int] = [x["max_rss"] for x in runs if x["max_rss"] is not None]
+
+        rows.append(
+            {
+                "task": name,
+                "runs": len(runs),
+                "failed": f"{(len(runs) - len(durations)) / len(runs):.0%}",
+                "p50 (s)": _percentile(sorted_durations, 50) if durations else None,
+                "p90 (s)": _percentile(sorted_durations, 90) if durations else None,
+                "p99 (s)": _percentile(sorted_durations, 99) if durations else None,
+                "mean cpu (s)": sum(cpu_times) / len(cpu_times) if cpu_times else None,
+                "max rss (MiB)": max(max_rss) / (1024 * 1024) if max_rss else None,
+                "trend": _get_trend(durations),
+            },
+        )
+
+    echo.table(rows, floatfmt=".2f")
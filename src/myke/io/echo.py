@@ -2,6 +2,7 @@
 
 import collections.abc
 import os
+import sys
 from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Union
 
 from ..globals import MYKE_VAR_NAME
@@ -36,6 +37,24 @@ class echo:
         """
         cls._print(*args, print_kwargs=kwargs)
 
+    @classmethod
+    def verbose(cls, *args: Any, **kwargs: Any) -> None:
+        """Prints text to stderr, if verbose output is enabled.
+
+        Enabled with `--myke-verbose`, or the `MYKE_VERBOSE` environment variable.
+
+        Arguments:
+            *args: ...
+            **kwargs: ...
+
+        Examples:
+            >>> import myke
+            ...
+            >>> myke.echo.verbose('Hello World.')
+        """
+        if os.getenv("MYKE_VERBOSE", "").lower() not in ("", "0", "false", "no"):
+            cls._print(*args, print_kwargs={"file": sys.stderr, **kwargs})
+
     @classmethod
     def lines(
         cls,
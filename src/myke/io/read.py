@@ -5,6 +5,8 @@ from functools import partial, wraps
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Union
 
+from ..profiling import traced
+
 if sys.version_info >= (3, 10):
     from typing import TypeGuard
 else:
@@ -33,6 +35,7 @@ class read(str):
         return content
 
     @staticmethod
+    @traced("read.text")
     def text(path: Union[str, Path], encoding: str = "utf-8") -> str:
         """Read text file contents and strip surrounding whitespace.
 
@@ -55,6 +58,7 @@ class read(str):
         return path.read_text(encoding=encoding).strip()
 
     @classmethod
+    @traced("read.lines")
     @wraps(text)
     def lines(cls, *args: str, **kwargs: str) -> List[str]:
         """Read lines from a text file, strip whitespace from each line, and return list of non-empty elements.
@@ -76,6 +80,7 @@ class read(str):
         ]
 
     @classmethod
+    @traced("read.json")
     @wraps(text)
     def json(cls, *args: str, **kwargs: str) -> Dict[str, Any]:
         """Parse object(s) from a JSON text file.
@@ -97,6 +102,7 @@ class read(str):
         return cls._read_simple_dict(partial(_json.loads, cls.text(*args, **kwargs)))
 
     @classmethod
+    @traced("read.yaml")
     @wraps(text)
     def yaml(cls, *args: str, **kwargs: str) -> Dict[str, Any]:
         """Parse object(s) from a YAML text file.
@@ -120,6 +126,7 @@ class read(str):
         )
 
     @classmethod
+    @traced("read.yaml_all")
     @wraps(text)
     def yaml_all(cls, *args: str, **kwargs: str) -> List[Dict[str, Any]]:
         """Parse object(s) from multiple documents in a single YAML text file.
@@ -147,6 +154,7 @@ class read(str):
         return _yaml_all(cls.text(*args, **kwargs))
 
     @classmethod
+    @traced("read.toml")
     @wraps(text)
     def toml(cls, *args: str, **kwargs: str) -> Dict[str, Any]:
         """Parse object(s) from a TOML text file.
@@ -171,6 +179,7 @@ class read(str):
         return cls._read_simple_dict(partial(_toml.loads, cls.text(*args, **kwargs)))
 
     @classmethod
+    @traced("read.cfg")
     @wraps(text)
     def cfg(cls, *args: str, **kwargs: str) -> Dict[str, Any]:
         """Parse object(s) from a INI/CFG text file.
@@ -197,6 +206,7 @@ class read(str):
         return cls._read_simple_dict(partial(_read_cfg, cls.text(*args, **kwargs)))
 
     @classmethod
+    @traced("read.ini")
     @wraps(cfg)
     def ini(cls, *args: str, **kwargs: str) -> Dict[str, Any]:
         """Parse object(s) from a INI/CFG text file.
@@ -216,6 +226,7 @@ class read(str):
         return cls.cfg(*args, **kwargs)
 
     @classmethod
+    @traced("read.dotfile")
     @wraps(text)
     def dotfile(cls, *args: str, **kwargs: str) -> Dict[str, str]:
         """Parse key-value pairs from a dotfile (aka "envfile").
@@ -241,6 +252,7 @@ class read(str):
         )
 
     @classmethod
+    @traced("read.envfile")
     @wraps(dotfile)
     def envfile(cls, *args: str, **kwargs: str) -> Dict[str, str]:
         """Parse key-value pairs from a dotfile (aka "envfile").
@@ -275,6 +287,7 @@ class read(str):
         return resp
 
     @classmethod
+    @traced("read.url")
     def url(cls, addr: str, **kwargs: Any) -> str:
         """Return text from HTTP GET response.
 
@@ -294,6 +307,7 @@ class read(str):
         return resp_text
 
     @classmethod
+    @traced("read.url_json")
     def url_json(cls, addr: str, **kwargs: Any) -> Dict[str, Any]:
         """Parse JSON from HTTP GET response.
 
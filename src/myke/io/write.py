@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Any, List, Optional, Union
 
 from ..globals import DEFAULT_MYKEFILE
+from ..profiling import traced
 from ..utils import make_executable
 
 
@@ -26,6 +27,7 @@ class write:
         )
 
     @staticmethod
+    @traced("write.text")
     def text(
         content: Union[str, bytes],
         path: Union[str, Path],
@@ -78,6 +80,7 @@ class write:
             f.write(content)
 
     @classmethod
+    @traced("write.lines")
     def lines(
         cls,
         content: List[Optional[str]],
@@ -114,6 +117,7 @@ class write:
         )
 
     @classmethod
+    @traced("write.mykefile")
     def mykefile(
         cls,
         path: Union[None, str, Path] = None,
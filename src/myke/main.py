@@ -1,28 +1,247 @@
 import os
 import sys
 from collections import defaultdict
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
 from contextlib import suppress
+from contextvars import copy_context
 from dataclasses import dataclass
+from functools import lru_cache, partial, wraps
 from inspect import getsource
 from pathlib import Path
 from subprocess import CalledProcessError
-from typing import Dict, List, Optional, Tuple, Union
+from types import GeneratorType
+from typing import Any, Callable, Dict, Generator, List, Optional, Set, Tuple, Union
 
 import yapx
 
+from . import history, profiling, usage
 from .__version__ import __version__
-from .exceptions import NoTasksFoundError, TaskAlreadyRegisteredError
+from .discover import discover_tasks
+from .exceptions import (
+    DependencyCycleError,
+    NoTasksFoundError,
+    TaskAlreadyRegisteredError,
+    TaskNotFoundError,
+)
 from .globals import DEFAULT_MYKEFILE, MYKE_VAR_NAME
 from .io.echo import echo
 from .io.write import write
-from .tasks import ROOT_TASK_KEY, TASKS, Task, import_module, import_mykefile
-from .types import Annotated
+from .manifest import load_manifest, save_manifest
+from .memo import clear_cache, get_memo_dir
+from .profiling import span
+from .scheduler import _get_env_jobs, get_jobs, invocation, set_jobs
+from .tasks import (
+    _IMPORTED_MYKEFILES,
+    ROOT_TASK_KEY,
+    TASKS,
+    Task,
+    import_module,
+    import_mykefile,
+)
+from .types import Annotated, Literal
 from .utils import get_repo_root
 
 __all__ = ["__version__", "main", "sys"]
 
+# Mykefiles and modules preloaded by the daemon, inherited by its children.
+_PRELOADED: Dict[str, Tuple[Union[Path, str], ...]] = {}
+
+# separates the args of tasks run in one invocation.
+TASK_SEPARATOR: str = "+"
+
+# environment variables that provide values to myke parameters.
+_MYKE_ENV_VARS: Tuple[str, ...] = (
+    "MYKE_FILE",
+    "MYKE_MODULE",
+    "MYKE_STATIC",
+    "MYKE_JOBS",
+    "MYKE_USAGE",
+)
+
+
+def _has_myke_args(args: List[str]) -> bool:
+    """Return True if the given args, or the environment, provide myke parameters."""
+    return any(x.startswith(("--myke-", "-j")) for x in args) or any(
+        os.getenv(x) or os.getenv(x + "_FILE") for x in _MYKE_ENV_VARS
+    )
+
+
+def _prune_subcommands(
+    subcommands: Union[yapx.CommandMap, List[yapx.Command]],
+    args: List[str],
+) -> Union[yapx.CommandMap, List[yapx.Command]]:
+    """Drop the branches of the subcommand tree that are not named in `args`.
+
+    At each level, if no subcommand is named in `args` (e.g., `--help`),
+    the entire level is kept.
+    """
+    tokens: Set[str] = set(args)
+
+    if isinstance(subcommands, dict):
+        named: bool = any(
+            x is not None and x.name in tokens for x in subcommands
+        ) or any(x.name in tokens for x in subcommands.get(None, []))
+
+        if not named:
+            return subcommands
+
+        return {
+            k: (
+                [x for x in v if x.name in tokens]
+                if k is None
+                else _prune_subcommands(v, args)
+            )
+            for k, v in subcommands.items()
+            if k is None or k.name in tokens
+        }
+
+    pruned: List[yapx.Command] = [x for x in subcommands if x.name in tokens]
+    return pruned if pruned else subcommands
+
+
+def _split_task_args(
+    args: List[str],
+    names: Set[str],
+) -> Tuple[List[str], List[List[str]]]:
+    """Split the given args into the args of the root task, and the args of each task.
+
+    Tasks are separated by `TASK_SEPARATOR` (e.g., `lint + test --fast`).
+    Names alone are not split, since they may name nested subcommands
+    (e.g., `db test`). Args that precede the first task name are given to the root task.
+    """
+    if TASK_SEPARATOR not in args:
+        return [], [args]
+
+    groups: List[List[str]] = [[]]
+    for x in args:
+        if x == TASK_SEPARATOR:
+            groups.append([])
+        else:
+            groups[-1].append(x)
+
+    i: int = next((i for i, x in enumerate(groups[0]) if x in names), len(groups[0]))
+    root_args: List[str] = groups[0][:i]
+    groups[0] = groups[0][i:]
+
+    return root_args, [x for x in groups if x]
+
+
+def _run_task_groups(
+    root: Optional[Callable[..., Any]],
+    subcommands: yapx.CommandMap,
+    root_args: List[str],
+    groups: List[List[str]],
+    **run_kwargs: Any,
+) -> None:
+    """Run the root task once, then each group of task args concurrently.
+
+    The args of every group are parsed first, so that invalid args run no task.
+    Each task receives the relay value of the root task. The teardown of the root
+    task runs after all tasks have finished. The first error cancels any
+    tasks that have not started yet.
+    """
+    teardown: List[Generator[Any, None, Any]] = []
+    relay_value: Any = None
+
+    def _relay() -> Any:
+        return relay_value
+
+    for x in groups:
+        yapx.build_parser(
+            _relay,
+            subcommands=_prune_subcommands(subcommands, x),
+            **run_kwargs,
+        ).parse_args(x)
+
+    if root is not None:
+        root_function: Callable[..., Any] = root
+
+        @wraps(root_function)
+        def _setup(*args: Any, **kwargs: Any) -> Any:
+            value: Any = root_function(*args, **kwargs)
+            if not isinstance(value, GeneratorType):
+                return value
+            try:
+                setup_value: Any = next(value)
+            except StopIteration:
+                return value
+            teardown.append(value)
+            return setup_value
+
+        relay_value = yapx.run(_setup, args=root_args, **run_kwargs)
+
+    try:
+        with invocation(), ThreadPoolExecutor(
+            max_workers=min(get_jobs(), len(groups)),
+            thread_name_prefix="myke",
+        ) as pool:
+            futures: List[Future[Any]] = [
+                pool.submit(
+                    copy_context().run,
+                    partial(
+                        yapx.run,
+                        _relay,
+                        subcommands=_prune_subcommands(subcommands, x),
+                        args=x,
+                        **run_kwargs,
+                    ),
+                )
+                for x in groups
+            ]
+
+            done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+            for x in not_done:
+                x.cancel()
+
+            for x in [*done, *not_done]:
+                if not x.cancelled():
+                    x.result()
+    finally:
+        for x in reversed(teardown):
+            with suppress(StopIteration):
+                while True:
+                    next(x)
+
+
+def _load_task_stubs(path: Path, static: bool = False) -> Optional[List[Task]]:
+    """Load tasks from the cached manifest of the given Mykefile or,
+    if `static`, by parsing it; without executing the Mykefile."""
+    tasks: Optional[List[Task]] = load_manifest(path)
+    if tasks is None and static:
+        with suppress(OSError):
+            tasks = discover_tasks(path)
+    return tasks
+
+
+def _import_mykefile(path: Path) -> None:
+    """Import the given Mykefile, and save a manifest of the tasks it registered."""
+    n_tasks_before: int = len(TASKS)
+    n_mykefiles_before: int = len(_IMPORTED_MYKEFILES)
+    modules_before: Set[str] = set(sys.modules)
+
+    import_mykefile(str(path))
+
+    dependencies: List[str] = [
+        x for x in _IMPORTED_MYKEFILES[n_mykefiles_before:] if x != str(path)
+    ]
+    for name in set(sys.modules) - modules_before:
+        module_file: Optional[str] = getattr(sys.modules[name], "__file__", None)
+        if module_file:
+            dependencies.append(module_file)
+
+    save_manifest(path, TASKS[n_tasks_before:], dependencies=dependencies)
+
 
 def main(_file: Optional[Union[str, Path]] = None) -> None:
+    try:
+        _main(_file)
+    finally:
+        usage.report()
+        profiling.report()
+        profiling.write_trace()
+
+
+def _main(_file: Optional[Union[str, Path]] = None) -> None:
     @dataclass
     class MykeArgs(yapx.types.Dataclass):
         file: Annotated[
@@ -61,6 +280,15 @@ def main(_file: Optional[Union[str, Path]] = None) -> None:
                 exclusive=True,
             ),
         ]
+        static: Annotated[
+            Optional[bool],
+            yapx.arg(
+                "myke-static",
+                default=None,
+                env="MYKE_STATIC",
+                group="myke parameters",
+            ),
+        ]
         create: Annotated[
             Optional[bool],
             yapx.arg(
@@ -70,30 +298,168 @@ def main(_file: Optional[Union[str, Path]] = None) -> None:
                 exclusive=True,
             ),
         ]
+        daemon: Annotated[
+            Optional[bool],
+            yapx.arg(
+                "myke-daemon",
+                default=None,
+                group="myke parameters",
+                exclusive=True,
+            ),
+        ]
+        clear_cache: Annotated[
+            Optional[bool],
+            yapx.arg(
+                "myke-clear-cache",
+                default=None,
+                group="myke parameters",
+                exclusive=True,
+                help="Remove the values cached by `myke.persistent_cache`.",
+            ),
+        ]
+        stats: Annotated[
+            Optional[List[str]],
+            yapx.arg(
+                "myke-stats",
+                default=None,
+                nargs="*",
+                metavar="TASK",
+                group="myke parameters",
+                exclusive=True,
+                help=(
+                    "Print the durations, failure rates, and trends of recorded runs"
+                    " of tasks in this project; of all tasks, or the given task."
+                ),
+            ),
+        ]
+        verbose: Annotated[
+            Optional[bool],
+            yapx.arg(
+                "myke-verbose",
+                default=None,
+                group="myke parameters",
+                help="Print verbose output, e.g., why tasks are skipped.",
+            ),
+        ]
+        jobs: Annotated[
+            Optional[int],
+            yapx.arg(
+                "myke-jobs",
+                "j",
+                default=None,
+                env="MYKE_JOBS",
+                group="myke parameters",
+                help="Max number of task dependencies to run concurrently.",
+            ),
+        ]
+        usage: Annotated[
+            Optional[bool],
+            yapx.arg(
+                "myke-usage",
+                default=None,
+                env="MYKE_USAGE",
+                group="myke parameters",
+                help=(
+                    "Print the wall time, CPU time, and peak memory of"
+                    " the processes run by each task."
+                ),
+            ),
+        ]
+        trace: Annotated[
+            Optional[str],
+            yapx.arg(
+                "myke-trace",
+                default=None,
+                group="myke parameters",
+                help=(
+                    "Write a timeline of tasks, subprocesses, and file reads/writes"
+                    " to this file, in Chrome trace-event format; view it with"
+                    " https://ui.perfetto.dev"
+                ),
+            ),
+        ]
+        profile_startup: Annotated[
+            Optional[Literal["table", "json"]],
+            yapx.arg(
+                "myke-profile-startup",
+                default=None,
+                group="myke parameters",
+                help=(
+                    "Report where startup time went. The self time of 'dispatch'"
+                    " is spent building the task parser and parsing args."
+                ),
+            ),
+        ]
 
     prog: str = str(_file) if _file else MYKE_VAR_NAME
+    cwd: str = os.getcwd()
 
-    parser = yapx.ArgumentParser(
-        prog=prog,
-        prog_version=__version__,
-        help_flags=["--myke-help"],
-        version_flags=["--myke-version"],
-        completion_flags=[],
-        tui_flags=[],
-    )
-    parser.add_arguments(MykeArgs)
+    @lru_cache(maxsize=None)
+    def get_parser() -> yapx.ArgumentParser:
+        with span("build myke parser"):
+            parser = yapx.ArgumentParser(
+                prog=prog,
+                prog_version=__version__,
+                help_flags=["--myke-help"],
+                version_flags=["--myke-version"],
+                completion_flags=[],
+                tui_flags=[],
+            )
+            parser.add_arguments(MykeArgs)
+            return parser
 
     args = sys.argv[1:]
 
+    try:
+        # the myke parser reads `MYKE_JOBS` as the default of `--myke-jobs`.
+        _get_env_jobs()
+    except ValueError as e:
+        print(f"{prog}: error: {e}", file=sys.stderr)
+        sys.exit(2)
+
     myke_args: MykeArgs
     task_args: List[str]
-    myke_args, task_args = parser.parse_known_args_to_model(
-        args,
-        args_model=MykeArgs,
-        skip_pydantic_validation=True,
-    )
+    if _has_myke_args(args):
+        myke_args, task_args = get_parser().parse_known_args_to_model(
+            args,
+            args_model=MykeArgs,
+            skip_pydantic_validation=True,
+        )
+    else:
+        # fast-path: skip building the myke parser when there is nothing to parse.
+        myke_args = MykeArgs(
+            file=[Path(_file)] if _file else None,
+            module=None,
+            list_tasks=None,
+            explain=None,
+            static=None,
+            create=None,
+            daemon=None,
+            clear_cache=None,
+            stats=None,
+            verbose=None,
+            jobs=None,
+            usage=None,
+            trace=None,
+            profile_startup=None,
+        )
+        task_args = args
     assert isinstance(myke_args, MykeArgs)
 
+    if myke_args.profile_startup:
+        profiling.enable(myke_args.profile_startup)
+
+    if myke_args.usage:
+        usage.enable()
+
+    if myke_args.trace:
+        profiling.enable_trace(myke_args.trace)
+
+    set_jobs(myke_args.jobs)
+
+    if myke_args.verbose:
+        os.environ["MYKE_VERBOSE"] = "1"
+
     if _file:
         if not isinstance(_file, Path):
             _file = Path(_file)
@@ -108,11 +474,14 @@ def main(_file: Optional[Union[str, Path]] = None) -> None:
     elif Path(DEFAULT_MYKEFILE).exists():
         myke_args.file = [Path(DEFAULT_MYKEFILE).absolute()]
 
-    with suppress(FileNotFoundError):
+    with suppress(FileNotFoundError), span("get_repo_root"):
         repo_root: Optional[Path] = get_repo_root()
         if repo_root:
             os.chdir(repo_root)
 
+    # runs are recorded under the repo root, as the project.
+    history.enable()
+
     if not myke_args.file:
         if Path(DEFAULT_MYKEFILE).exists():
             myke_args.file = [Path(DEFAULT_MYKEFILE).absolute()]
@@ -123,16 +492,45 @@ def main(_file: Optional[Union[str, Path]] = None) -> None:
         out_file: Path = myke_args.file[0] if myke_args.file else Path(DEFAULT_MYKEFILE)
         write.mykefile(str(out_file))
         echo(f"Created: {out_file}")
-        parser.exit()
+        get_parser().exit()
+
+    if myke_args.clear_cache:
+        clear_cache()
+        echo(f"Cleared: {get_memo_dir()}")
+        get_parser().exit()
+
+    if myke_args.stats is not None:
+        history.report(" ".join(myke_args.stats) or None)
+        get_parser().exit()
+
+    if myke_args.list_tasks and not myke_args.module and not _file:
+        # serve the task list without importing Mykefiles, when possible.
+        cached_tasks: List[Optional[List[Task]]] = [
+            _load_task_stubs(f, static=bool(myke_args.static)) for f in myke_args.file
+        ]
+        if all(x is not None for x in cached_tasks):
+            TASKS.extend([t for x in cached_tasks if x is not None for t in x])
+            echo.tasks(prog=prog)
+            get_parser().exit()
+
+    preloaded: bool = _PRELOADED == {
+        "file": tuple(myke_args.file),
+        "module": tuple(myke_args.module if myke_args.module else ()),
+    }
+    if _PRELOADED and not preloaded:
+        # this is a child of the daemon, which preloaded other Mykefiles.
+        TASKS.clear()
 
     try:
         try:
             for f in myke_args.file:
+                if preloaded:
+                    break
                 if f and (not _file or not f.samefile(_file)):
-                    import_mykefile(str(f))
+                    _import_mykefile(f)
                     # TODO: os.environ["MYKE_FILE"] = str(myke_args.file)
         except FileNotFoundError as e:
-            parser.print_help()
+            get_parser().print_help()
             echo(
                 (
                     f"{os.linesep}"
@@ -142,19 +540,37 @@ def main(_file: Optional[Union[str, Path]] = None) -> None:
                     f"{os.linesep}"
                 ),
             )
-            parser.exit()
+            get_parser().exit()
 
-        if myke_args.module:
+        if myke_args.module and not preloaded:
             for m in myke_args.module:
                 import_module(m)
                 # TODO: os.environ["MYKE_MODULE"] = x
     except TaskAlreadyRegisteredError as e:
-        parser.error(str(e))
+        get_parser().error(str(e))
+
+    if myke_args.daemon:
+        from .daemon import serve
+
+        _PRELOADED.clear()
+        _PRELOADED.update(
+            {
+                "file": tuple(myke_args.file),
+                "module": tuple(myke_args.module if myke_args.module else ()),
+            },
+        )
 
-    root_task: Optional[Task] = None
-    root_tasks: List[Task] = [x for x in TASKS if x.name == ROOT_TASK_KEY]
-    if root_tasks:
-        root_task = root_tasks[0]
+        serve(
+            partial(main, _file),
+            restart_args=(
+                [sys.executable, "-m", MYKE_VAR_NAME, *args]
+                if _file is None
+                else [sys.executable, str(_file), *args]
+            ),
+            restart_cwd=cwd,
+        )
+
+    root_task: Optional[Task] = TASKS.root
 
     if myke_args.explain:
         explain_this: Optional[Task] = None
@@ -164,20 +580,18 @@ def main(_file: Optional[Union[str, Path]] = None) -> None:
             if explain_this is None:
                 echo("There is no root task. Provide a task name to explain.")
         else:
-            explain_this_list: List[Task] = [x for x in TASKS if x.name == task_args[0]]
-            if not explain_this_list:
+            explain_this = TASKS.find(task_args[0])
+            if explain_this is None:
                 echo(f"Given task name not found: {task_args[0]}")
-            else:
-                explain_this = explain_this_list[0]
 
         if explain_this:
             echo(getsource(explain_this.function))
 
-        parser.exit()
+        get_parser().exit()
 
     if myke_args.list_tasks:
         echo.tasks(prog=prog)
-        parser.exit()
+        get_parser().exit()
 
     task_parents: Dict[
         Optional[Tuple[Union[str, yapx.Command], ...]],
@@ -185,8 +599,20 @@ def main(_file: Optional[Union[str, Path]] = None) -> None:
     ] = defaultdict(
         list,
     )
-    for x in TASKS:
-        task_parents[x.parents].append(yapx.cmd(x.function, x.name))
+    for parents, tasks in TASKS.tree.items():
+        task_parents[parents].extend(
+            [
+                yapx.cmd(
+                    (
+                        profiling.wrap(x.function, f"task: {x.name}")
+                        if myke_args.profile_startup or myke_args.trace
+                        else x.function
+                    ),
+                    x.name,
+                )
+                for x in tasks
+            ],
+        )
 
     def defaultdict_recursive():
         return defaultdict(defaultdict_recursive)
@@ -209,15 +635,38 @@ def main(_file: Optional[Union[str, Path]] = None) -> None:
 
         this_dict[leaf_parent] = cmds_list
 
+    root_function: Optional[Callable[..., Any]] = (
+        None if root_task is None else root_task.function
+    )
+    if root_function and (myke_args.profile_startup or myke_args.trace):
+        root_function = profiling.wrap(root_function, "task: root")
+
+    top_level_names: Set[str] = {
+        x.name for x in TASKS.tree.get((), []) if x.name != ROOT_TASK_KEY
+    } | {x[0] if isinstance(x[0], str) else x[0].name for x in TASKS.tree if x}
+
+    root_args, task_groups = _split_task_args(task_args, top_level_names)
+
     try:
-        yapx.run(
-            None if root_task is None else root_task.function,
-            subcommands=subcommands,
-            args=task_args,
-            default_args=["--tui"],
-            prog=prog,
-            prog_version=__version__,
-        )
+        with span("dispatch"):
+            if len(task_groups) > 1:
+                _run_task_groups(
+                    root_function,
+                    subcommands=subcommands,
+                    root_args=root_args,
+                    groups=task_groups,
+                    prog=prog,
+                    prog_version=__version__,
+                )
+            else:
+                yapx.run(
+                    root_function,
+                    subcommands=_prune_subcommands(subcommands, task_args),
+                    args=task_args,
+                    default_args=["--tui"],
+                    prog=prog,
+                    prog_version=__version__,
+                )
     except CalledProcessError as e:
         print(e)
         if e.output:
@@ -225,5 +674,7 @@ def main(_file: Optional[Union[str, Path]] = None) -> None:
         elif e.stderr:
             print(f"stderr: {e.stderr}")
         sys.exit(e.returncode)
+    except (DependencyCycleError, TaskNotFoundError) as e:
+        get_parser().error(f"{type(e).__name__}: {e}")
     except KeyboardInterrupt:
         pass
@@ -0,0 +1,145 @@
+"""> Functions for caching the tasks registered by a Mykefile.
+
+After a Mykefile is imported, a manifest of its tasks is saved to
+`get_cache_dir() / 'manifests'`. The manifest is keyed by the content hash
+of the Mykefile, and the set of modules (and Mykefiles) imported by it.
+While valid, it is used to list tasks without executing the Mykefile.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+from contextlib import suppress
+from importlib.util import MAGIC_NUMBER
+from inspect import getdoc, signature
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+from .__version__ import __version__
+from .tasks import Task, _TaskStub
+from .utils import _hash_text, get_cache_dir
+
+__all__ = ["get_manifest_path", "save_manifest", "load_manifest"]
+
+
+def get_manifest_path(path: str | Path) -> Path:
+    return (
+        get_cache_dir()
+        / "manifests"
+        / (_hash_text(os.path.abspath(path))[:32] + ".json")
+    )
+
+
+def _hash_file(path: str | Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _stat_file(path: str | Path) -> list[int]:
+    st: os.stat_result = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _get_signature(task: Task) -> str | None:
+    with suppress(TypeError, ValueError):
+        return str(signature(task.function))
+    return None
+
+
+def _interpreter_key() -> str:
+    return _hash_text(__version__, MAGIC_NUMBER.hex(), sys.version)[:16]
+
+
+def save_manifest(
+    path: str | Path,
+    tasks: Sequence[Task],
+    dependencies: Iterable[str | Path] = (),
+) -> None:
+    """Save a manifest of the tasks registered by the given Mykefile.
+
+    Args:
+        path: path to the Mykefile.
+        tasks: tasks registered when importing the Mykefile.
+        dependencies: files of the modules (and Mykefiles) imported by the Mykefile.
+    """
+    modules: dict[str, list[int]] = {}
+    for x in dependencies:
+        with suppress(OSError):
+            modules[os.path.abspath(x)] = _stat_file(x)
+
+    manifest: dict[str, Any] = {
+        "interpreter": _interpreter_key(),
+        "sha256": _hash_file(path),
+        "modules": dict(sorted(modules.items())),
+        "tasks": [
+            {
+                "name": x.name,
+                "parents": [p if isinstance(p, str) else p.name for p in x.parents],
+                "module": x.function.__module__,
+                "qualname": x.function.__qualname__,
+                "signature": _get_signature(x),
+                "doc": getdoc(x.function),
+            }
+            for x in tasks
+        ],
+    }
+
+    content: str = json.dumps(manifest, indent=1)
+
+    manifest_path: Path = get_manifest_path(path)
+
+    with suppress(OSError):
+        if manifest_path.read_text(encoding="utf-8") == content:
+            return
+
+    with suppress(OSError):
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path: Path = manifest_path.with_name(
+            f"{manifest_path.name}.{os.getpid()}.tmp",
+        )
+        tmp_path.write_text(content, encoding="utf-8")
+        tmp_path.replace(manifest_path)
+
+
+def load_manifest(path: str | Path) -> list[Task] | None:
+    """Load task stubs from the manifest of the given Mykefile.
+
+    Args:
+        path: path to the Mykefile.
+
+    Returns:
+        None: if there is no valid manifest for the Mykefile.
+        list: the tasks registered by the Mykefile, with stubs in place of functions.
+    """
+    try:
+        manifest: dict[str, Any] = json.loads(
+            get_manifest_path(path).read_text(encoding="utf-8"),
+        )
+
+        if (
+            manifest.get("interpreter") != _interpreter_key()
+            or manifest.get("sha256") != _hash_file(path)
+            or any(_stat_file(k) != v for k, v in manifest["modules"].items())
+        ):
+            return None
+
+        abs_path: str = os.path.abspath(path)
+
+        return [
+            Task(
+                name=x["name"],
+                function=_TaskStub(
+                    name=x["qualname"],
+                    module=x["module"],
+                    path=abs_path,
+                    doc=x["doc"],
+                    signature=x["signature"],
+                ),
+                parents=tuple(x["parents"]),
+            )
+            for x in manifest["tasks"]
+        ]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
@@ -0,0 +1,213 @@
+"""> A decorator for caching the return values of functions on disk.
+
+Unlike `myke.cache` (i.e., `functools.lru_cache`), values cached by
+`persistent_cache` outlive the process, so they are reused by later invocations of myke.
+Values are pickled to `get_cache_dir() / 'memo'`, keyed by the qualified name
+and source of the function, and its arguments.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import marshal
+import os
+import pickle
+import shutil
+import time
+from contextlib import suppress
+from functools import partial, wraps
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+from .utils import _hash_text, get_cache_dir
+
+__all__ = ["persistent_cache", "clear_cache", "get_memo_dir"]
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# default max size, in bytes, of the values cached for each function.
+DEFAULT_MAX_SIZE: int = 64 * 1024 * 1024
+
+_PICKLE_PROTOCOL: int = 4
+
+
+def get_memo_dir() -> Path:
+    return get_cache_dir() / "memo"
+
+
+def _get_function_dir(func: Callable[..., Any]) -> Path:
+    return get_memo_dir() / _hash_text(func.__module__, func.__qualname__)[:32]
+
+
+def _hash_source(func: Callable[..., Any]) -> str:
+    try:
+        source: bytes = inspect.getsource(func).encode()
+    except (OSError, TypeError):
+        try:
+            source = marshal.dumps(func.__code__)
+        except AttributeError:
+            # e.g., builtins, and other functions implemented in C.
+            source = f"{func.__module__}.{func.__qualname__}".encode()
+    return hashlib.sha256(source).hexdigest()
+
+
+def _normalize(value: Any) -> Any:
+    """Return the given value with the members of sets in a stable order.
+
+    The order of a set, and so its pickle, varies across processes with the seed
+    of string hashes (`PYTHONHASHSEED`). Sets within lists, tuples, and dicts
+    are normalized too, but not sets within the attributes of other objects.
+    """
+    if isinstance(value, (set, frozenset)):
+        members: list[Any] = [_normalize(x) for x in value]
+        members.sort(key=partial(pickle.dumps, protocol=_PICKLE_PROTOCOL))
+        return (type(value).__name__, members)
+    if type(value) in (list, tuple):
+        return type(value)(_normalize(x) for x in value)
+    if type(value) is dict:
+        return {_normalize(k): _normalize(v) for k, v in value.items()}
+    return value
+
+
+def _hash_arguments(arguments: Any) -> str:
+    """Return a hash of the given arguments that is stable across processes.
+
+    Raises:
+        pickle.PicklingError: if the arguments cannot be pickled.
+        TypeError: ...
+        AttributeError: ...
+    """
+    return hashlib.sha256(
+        pickle.dumps(_normalize(arguments), protocol=_PICKLE_PROTOCOL),
+    ).hexdigest()
+
+
+def _evict(func_dir: Path, max_size: int) -> None:
+    """Remove the least-recently used values until the total size is within `max_size`."""
+    entries: list[tuple[float, int, Path]] = []
+    for x in func_dir.glob("*.pkl"):
+        with suppress(OSError):
+            st = x.stat()
+            entries.append((st.st_mtime, st.st_size, x))
+
+    total_size: int = sum(x[1] for x in entries)
+
+    for _, size, path in sorted(entries):
+        if total_size <= max_size:
+            break
+        with suppress(OSError):
+            path.unlink()
+        total_size -= size
+
+
+def persistent_cache(
+    func: F | None = None,
+    *,
+    ttl: float | None = None,
+    max_size: int | None = DEFAULT_MAX_SIZE,
+) -> F | Callable[[F], F]:
+    """Function decorator to cache return values on disk, across invocations.
+
+    Arguments and return values must be picklable; if not, the function is called
+    and the value is returned without caching. Arguments are keyed by their pickle,
+    with the members of sets sorted; sets held by other objects are not sorted,
+    so such arguments may miss the cache in other processes. The cache of a decorated function
+    is cleared by calling `func.cache_clear()`, and the cache of all functions
+    with `myke --myke-clear-cache`.
+
+    Args:
+        func: ...
+        ttl: seconds after which a cached value expires.
+        max_size: max size, in bytes, of the values cached for this function.
+            When exceeded, the least-recently used values are removed.
+
+    Returns:
+        ...
+
+    Examples:
+        >>> import myke
+        ...
+        >>> @myke.persistent_cache(ttl=3600)  # doctest: +SKIP
+        ... def list_instances(region: str) -> list[str]:
+        ...     return myke.sh_stdout_lines(f'aws ec2 describe-instances --region {region}')
+    """
+    if func is None:
+        return partial(persistent_cache, ttl=ttl, max_size=max_size)
+
+    signature: inspect.Signature | None = None
+    with suppress(TypeError, ValueError):
+        signature = inspect.signature(func)
+
+    source_hash: list[str] = []
+
+    @wraps(func)
+    def _inner_func(*args: Any, **kwargs: Any) -> Any:
+        assert func
+
+        if not source_hash:
+            source_hash.append(_hash_source(func))
+
+        arguments: Any = (args, sorted(kwargs.items()))
+        if signature is not None:
+            with suppress(TypeError):
+                bound: inspect.BoundArguments = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                arguments = list(bound.arguments.items())
+
+        try:
+            key: str = _hash_text(source_hash[0], _hash_arguments(arguments))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return func(*args, **kwargs)
+
+        func_dir: Path = _get_function_dir(func)
+        path: Path = func_dir / (key + ".pkl")
+
+        with suppress(
+            OSError,
+            EOFError,
+            pickle.UnpicklingError,
+            ValueError,
+            TypeError,
+            AttributeError,
+            ImportError,
+        ):
+            created, value = pickle.loads(path.read_bytes())
+            if ttl is None or time.time() - created < ttl:
+                # the modification time is the last access, for LRU eviction.
+                os.utime(path)
+                return value
+
+        result: Any = func(*args, **kwargs)
+
+        try:
+            data: bytes = pickle.dumps((time.time(), result), protocol=_PICKLE_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return result
+
+        with suppress(OSError):
+            func_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path: Path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            tmp_path.replace(path)
+
+            if max_size is not None:
+                _evict(func_dir, max_size)
+
+        return result
+
+    _inner_func.cache_clear = partial(clear_cache, func)  # type: ignore[attr-defined]
+
+    return _inner_func  # type: ignore[return-value]
+
+
+def clear_cache(func: Callable[..., Any] | None = None) -> None:
+    """Remove the values cached by `persistent_cache`.
+
+    Args:
+        func: remove only the values cached for this function.
+    """
+    shutil.rmtree(
+        get_memo_dir() if func is None else _get_function_dir(func),
+        ignore_errors=True,
+    )
@@ -0,0 +1,379 @@
+"""> Functions for measuring where the time goes when myke starts up, or runs tasks.
+
+Spans are always recorded (the overhead is a pair of `perf_counter` calls),
+so that the cost of importing myke itself is known by the time the
+`--myke-profile-startup` parameter is parsed.
+
+Finer-grained spans, e.g., for each subprocess or file read, are only recorded
+with `--myke-trace`, which writes all spans to a Chrome trace-event file, viewable
+with `chrome://tracing` or https://ui.perfetto.dev.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager, nullcontext, suppress
+from functools import wraps
+from inspect import isgeneratorfunction
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, ContextManager, Generator, Iterator, TypeVar
+
+__all__ = [
+    "Span",
+    "span",
+    "wrap",
+    "get_spans",
+    "enable",
+    "report",
+    "enable_trace",
+    "is_tracing",
+    "trace",
+    "traced",
+    "add_span",
+    "write_trace",
+]
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+REPORT_FORMATS: tuple[str, ...] = ("table", "json")
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "start",
+        "duration",
+        "self_duration",
+        "depth",
+        "thread_id",
+        "args",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        start: float,
+        duration: float,
+        self_duration: float,
+        depth: int,
+        thread_id: int | None = None,
+        args: dict[str, Any] | None = None,
+    ) -> None:
+        self.name: str = name
+        self.start: float = start
+        self.duration: float = duration
+        self.self_duration: float = self_duration
+        self.depth: int = depth
+        self.thread_id: int = threading.get_ident() if thread_id is None else thread_id
+        self.args: dict[str, Any] | None = args
+
+    def __repr__(self) -> str:
+        return f"Span(name={self.name!r}, duration={self.duration!r})"
+
+
+_SPANS: list[Span] = []
+_LOCAL: threading.local = threading.local()
+_REPORT_FORMAT: list[str] = []
+_TRACE_PATH: list[Path] = []
+_THREAD_NAMES: dict[int, str] = {}
+
+
+@contextmanager
+def span(name: str, args: dict[str, Any] | None = None) -> Iterator[None]:
+    """Record the time spent in the body of this context manager.
+
+    Spans opened within the body are recorded as children of this span.
+
+    Args:
+        name: ...
+        args: details shown with the span in the trace, e.g., a command.
+
+    Examples:
+        >>> from myke.profiling import span, get_spans
+        ...
+        >>> with span('say-hello'):
+        ...     print('Hello.')
+        Hello.
+        >>> get_spans()[-1].name
+        'say-hello'
+    """
+    # time spent in the children of each open span, on this thread.
+    stack: list[float] | None = getattr(_LOCAL, "stack", None)
+    if stack is None:
+        stack = _LOCAL.stack = []
+
+    stack.append(0.0)
+    start: float = perf_counter()
+    try:
+        yield
+    finally:
+        duration: float = perf_counter() - start
+        children_duration: float = stack.pop()
+        if stack:
+            stack[-1] += duration
+        _SPANS.append(
+            Span(
+                name=name,
+                start=start,
+                duration=duration,
+                self_duration=duration - children_duration,
+                depth=len(stack),
+                args=args,
+            ),
+        )
+        if _TRACE_PATH:
+            _name_thread(threading.current_thread())
+
+
+def wrap(func: Callable[..., Any], name: str) -> Callable[..., Any]:
+    """Wrap the given function to record a span each time it is called.
+
+    The setup and teardown of generator functions are recorded as separate spans.
+
+    Args:
+        func: ...
+        name: name of the span.
+
+    Returns:
+        ...
+    """
+    if isgeneratorfunction(func):
+
+        @wraps(func)
+        def _wrapped_generator(*args: Any, **kwargs: Any) -> Generator[Any, None, Any]:
+            gen: Generator[Any, None, Any] = func(*args, **kwargs)
+
+            with span(f"{name} (setup)"):
+                try:
+                    value: Any = next(gen)
+                except StopIteration as e:
+                    return e.value
+
+            yield value
+
+            with span(f"{name} (teardown)"), suppress(StopIteration):
+                while True:
+                    next(gen)
+
+        return _wrapped_generator
+
+    @wraps(func)
+    def _wrapped(*args: Any, **kwargs: Any) -> Any:
+        with span(name):
+            return func(*args, **kwargs)
+
+    return _wrapped
+
+
+def get_spans() -> list[Span]:
+    """Return the spans recorded so far, in the order they ended.
+
+    Returns:
+        ...
+    """
+    return list(_SPANS)
+
+
+def enable(fmt: str = "table") -> None:
+    """Print a report of the recorded spans upon the next call to `report()`.
+
+    Args:
+        fmt: one of 'table', 'json'.
+    """
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format: {fmt}")
+    _REPORT_FORMAT[:] = [fmt]
+
+
+def report() -> None:
+    """Print the recorded spans to stderr, sorted by duration, if enabled by `enable()`."""
+    if not _REPORT_FORMAT:
+        return
+
+    fmt: str = _REPORT_FORMAT.pop()
+
+    from .io.echo import echo
+
+    spans: list[Span] = sorted(_SPANS, key=lambda x: x.duration, reverse=True)
+    first_start: float = min((x.start for x in spans), default=0.0)
+
+    print_kwargs: dict[str, Any] = {"file": sys.stderr}
+
+    if fmt == "json":
+        echo.json(
+            [
+                {
+                    "name": x.name,
+                    "depth": x.depth,
+                    "start_ms": round((x.start - first_start) * 1000, 3),
+                    "total_ms": round(x.duration * 1000, 3),
+                    "self_ms": round(x.self_duration * 1000, 3),
+                }
+                for x in spans
+            ],
+            print_kwargs=print_kwargs,
+        )
+    else:
+        echo.table(
+            [
+                {
+                    "span": x.name,
+                    "depth": x.depth,
+                    "total (ms)": x.duration * 1000,
+                    "self (ms)": x.self_duration * 1000,
+                }
+                for x in spans
+            ],
+            print_kwargs=print_kwargs,
+            floatfmt=".2f",
+        )
+
+
+def enable_trace(path: str | Path) -> None:
+    """Record fine-grained spans, and write all spans to the given file upon
+    the next call to `write_trace()`.
+
+    Args:
+        path: ...
+    """
+    _TRACE_PATH[:] = [Path(path)]
+
+
+def is_tracing() -> bool:
+    return bool(_TRACE_PATH)
+
+
+def trace(name: str, **kwargs: Any) -> ContextManager[None]:
+    """Like `span(...)`, but only recorded if enabled by `enable_trace()`.
+
+    Args:
+        name: ...
+        **kwargs: details shown with the span in the trace.
+
+    Returns:
+        ...
+    """
+    if not _TRACE_PATH:
+        return nullcontext()
+    return span(name, args=kwargs or None)
+
+
+def _name_thread(thread: threading.Thread) -> None:
+    if thread.ident is not None and thread.ident not in _THREAD_NAMES:
+        _THREAD_NAMES[thread.ident] = thread.name
+
+
+def _describe(value: Any, max_length: int = 200) -> str:
+    text: str = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= max_length else text[: max_length - 3] + "..."
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Function decorator to record a span each time the function is called,
+    if enabled by `enable_trace()`.
+
+    Args:
+        name: ...
+
+    Returns:
+        ...
+    """
+
+    def _decorator(func: F) -> F:
+        @wraps(func)
+        def _wrapped(*args: Any, **kwargs: Any) -> Any:
+            if not _TRACE_PATH:
+                return func(*args, **kwargs)
+
+            with span(
+                name,
+                args={
+                    "args": [_describe(x) for x in args if not isinstance(x, type)],
+                    **{k: _describe(v) for k, v in kwargs.items()},
+                },
+            ):
+                return func(*args, **kwargs)
+
+        return _wrapped  # type: ignore[return-value]
+
+    return _decorator
+
+
+def add_span(
+    name: str,
+    start: float,
+    duration: float,
+    thread: threading.Thread | None = None,
+    **kwargs: Any,
+) -> None:
+    """Record a span that was timed elsewhere, e.g., the lifetime of a subprocess,
+    if enabled by `enable_trace()`.
+
+    Args:
+        name: ...
+        start: ... from `time.perf_counter()`.
+        duration: ...
+        thread: the thread that started the span; defaults to the current thread.
+        **kwargs: details shown with the span in the trace.
+    """
+    if not _TRACE_PATH:
+        return
+
+    if thread is None:
+        thread = threading.current_thread()
+    _name_thread(thread)
+
+    _SPANS.append(
+        Span(
+            name=name,
+            start=start,
+            duration=duration,
+            self_duration=duration,
+            depth=0,
+            thread_id=thread.ident,
+            args=kwargs or None,
+        ),
+    )
+
+
+def write_trace() -> None:
+    """Write the recorded spans to a Chrome trace-event file, if enabled by `enable_trace()`."""
+    if not _TRACE_PATH:
+        return
+
+    path: Path = _TRACE_PATH.pop()
+
+    spans: list[Span] = sorted(_SPANS, key=lambda x: x.start)
+    first_start: float = min((x.start for x in spans), default=0.0)
+    pid: int = os.getpid()
+
+    events: list[dict[str, Any]] = [
+        {
+            "name": "thread_name",
+            "ph": "M",
+            "pid": pid,
+            "tid": tid,
+            "args": {"name": _THREAD_NAMES.get(tid, f"thread-{tid}")},
+        }
+        for tid in sorted({x.thread_id for x in spans})
+    ]
+
+    for x in spans:
+        event: dict[str, Any] = {
+            "name": x.name,
+            "ph": "X",
+            "ts": round((x.start - first_start) * 1e6, 3),
+            "dur": round(x.duration * 1e6, 3),
+            "pid": pid,
+            "tid": x.thread_id,
+        }
+        if x.args:
+            event["args"] = x.args
+        events.append(event)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
@@ -2,13 +2,21 @@
 
 from __future__ import annotations
 
+import codecs
 import json
 import os
+import signal
 import subprocess
 import sys
+import threading
+from contextlib import suppress
+from contextvars import copy_context
 from functools import wraps
-from typing import Any, Sequence
+from typing import IO, Any, Iterator, Mapping, Sequence
 
+from .env import Env
+from .profiling import span
+from .usage import _Popen, attach, combine, record, run_process
 from .utils import split_and_trim_text
 
 __all__ = [
@@ -18,6 +26,13 @@ __all__ = [
     "sh",
     "sh_stdout",
     "sh_stdout_lines",
+    "run_iter_lines",
+    "sh_iter_lines",
+    "run_many",
+    "pipe",
+    "CompletedPipeline",
+    "arun",
+    "ash",
     "require",
 ]
 
@@ -27,21 +42,28 @@ def run(
     capture_output: None | bool = False,
     echo: bool | None = True,
     check: bool | None = True,
-    env: dict[str, str] | None = None,
+    env: Mapping[str, str] | None = None,
     env_update: dict[str, str | None] | None = None,
     shell: bool | None = None,
+    capture_tail: int | None = None,
     **kwargs: Any,
 ) -> subprocess.CompletedProcess[bytes | str]:
     r"""Thin wrapper around `subprocess.run`
 
+    With both `capture_output` and `echo`, output is written to the terminal
+    as it arrives, and also captured in the returned `CompletedProcess`.
+
     Args:
         args: ...
         capture_output: ...
         echo: ...
         check: ...
-        env: ...
+        env: ... For many calls with the same environment, pass a `myke.Env`,
+            which is merged once, rather than on every call.
         env_update: ...
         shell: ...
+        capture_tail: keep only the last `capture_tail` bytes of each of
+            the captured stdout and stderr, e.g., to bound memory for long builds.
         **kwargs: passed to `subprocess.run(...)`
 
     Returns:
@@ -64,28 +86,72 @@ def run(
     if shell is None:
         shell = isinstance(args, str) and " " in args
 
-    env = env.copy() if env else os.environ.copy()
+    if (
+        capture_output
+        and (echo or capture_tail is not None)
+        and not {"stdout", "stderr"} & kwargs.keys()
+    ):
+        return _run_streaming(
+            args,
+            echo=echo,
+            capture_output=True,
+            capture_tail=capture_tail,
+            check=check,
+            env=env,
+            env_update=env_update,
+            shell=shell,
+            **kwargs,
+        )
 
-    if env_update:
-        for k, v in env_update.items():
-            if v is None:
-                env.pop(k, None)
-            else:
-                env[k] = v
+    env = _prepare_env(env, env_update)
 
     if not echo and not capture_output:
         for k in ("stdout", "stderr"):
             kwargs[k] = subprocess.DEVNULL
 
-    p: subprocess.CompletedProcess[str] = subprocess.run(
+    if capture_output and {"stdout", "stderr"} & kwargs.keys():
+        raise ValueError(
+            "stdout and stderr arguments may not be used with capture_output.",
+        )
+
+    p: subprocess.CompletedProcess[str] = run_process(
         args,
         shell=shell,
         env=env,
         capture_output=bool(capture_output),
-        check=False,
         **kwargs,
     )
 
+    _check_and_echo(p, check=check, echo=echo, capture_output=capture_output)
+
+    return p
+
+
+def _prepare_env(
+    env: Mapping[str, str] | None,
+    env_update: Mapping[str, str | None] | None,
+) -> dict[str, str]:
+    if isinstance(env, Env):
+        return (env.derive(env_update) if env_update else env).to_dict()
+
+    prepared: dict[str, str] = dict(env) if env else os.environ.copy()
+
+    if env_update:
+        for k, v in env_update.items():
+            if v is None:
+                prepared.pop(k, None)
+            else:
+                prepared[k] = v
+
+    return prepared
+
+
+def _check_and_echo(
+    p: subprocess.CompletedProcess[Any],
+    check: bool | None,
+    echo: bool | None,
+    capture_output: bool | None,
+) -> None:
     try:
         if check:
             p.check_returncode()
@@ -97,9 +163,121 @@ def run(
                         x = x.decode()
                     print(x.rstrip(os.linesep))
 
+
+async def arun(
+    args: str | Sequence[str],
+    capture_output: None | bool = False,
+    echo: bool | None = True,
+    check: bool | None = True,
+    env: Mapping[str, str] | None = None,
+    env_update: dict[str, str | None] | None = None,
+    shell: bool | None = None,
+    **kwargs: Any,
+) -> subprocess.CompletedProcess[bytes | str]:
+    r"""Async counterpart of `myke.run`, built on `asyncio.create_subprocess_exec`.
+
+    If the awaiting task is cancelled, the process is killed.
+
+    Args:
+        args: ...
+        capture_output: ...
+        echo: ...
+        check: ...
+        env: ...
+        env_update: ...
+        shell: ...
+        **kwargs: `text`, `input`, and `timeout` are handled as in `subprocess.run`;
+            the rest are passed to `asyncio.create_subprocess_exec(...)`.
+
+    Returns:
+        ...
+
+    Examples:
+        >>> import asyncio
+        >>> import myke
+        ...
+        >>> async def hello():
+        ...     return await myke.arun(["python", "-c", "print('Hello World.')"])
+        ...
+        >>> asyncio.run(hello())
+        CompletedProcess(args=['python', '-c', "print('Hello World.')"], returncode=0)
+    """
+    import asyncio
+
+    if shell is None:
+        shell = isinstance(args, str) and " " in args
+
+    env = _prepare_env(env, env_update)
+
+    text: bool = bool(kwargs.pop("text", None)) | bool(
+        kwargs.pop("universal_newlines", None),
+    )
+    input_data: bytes | str | None = kwargs.pop("input", None)
+    timeout: float | None = kwargs.pop("timeout", None)
+
+    if capture_output:
+        kwargs["stdout"] = kwargs["stderr"] = subprocess.PIPE
+    elif not echo:
+        for k in ("stdout", "stderr"):
+            kwargs[k] = subprocess.DEVNULL
+
+    if input_data is not None:
+        kwargs["stdin"] = subprocess.PIPE
+        if isinstance(input_data, str):
+            input_data = input_data.encode()
+
+    if shell and os.name == "nt":
+        proc = await asyncio.create_subprocess_shell(
+            args if isinstance(args, str) else subprocess.list2cmdline(args),
+            env=env,
+            **kwargs,
+        )
+    else:
+        argv: list[str] = [args] if isinstance(args, str) else list(args)
+        if shell:
+            argv = ["/bin/sh", "-c", *argv]
+        proc = await asyncio.create_subprocess_exec(*argv, env=env, **kwargs)
+
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            proc.communicate(input_data),  # type: ignore[arg-type]
+            timeout=timeout,
+        )
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise subprocess.TimeoutExpired(args, timeout) from None  # type: ignore[arg-type]
+    except BaseException:
+        with suppress(ProcessLookupError):
+            proc.kill()
+        raise
+
+    p: subprocess.CompletedProcess[bytes | str] = subprocess.CompletedProcess(
+        args,
+        returncode=proc.returncode,  # type: ignore[arg-type]
+        stdout=stdout.decode() if text and stdout is not None else stdout,
+        stderr=stderr.decode() if text and stderr is not None else stderr,
+    )
+
+    _check_and_echo(p, check=check, echo=echo, capture_output=capture_output)
+
     return p
 
 
+@wraps(arun)
+async def ash(*args: Any, **kwargs: Any) -> subprocess.CompletedProcess[bytes | str]:
+    """Shorthand for: `myke.arun(..., shell=True)`
+
+    Args:
+        *args: ...
+        **kwargs: ...
+
+    Returns:
+        ...
+    """
+    return await arun(*args, shell=True, **kwargs)
+
+
 @wraps(run)
 def run_stdout(*args: Any, **kwargs: Any) -> str:
     """Shorthand for:
@@ -188,6 +366,581 @@ def sh_stdout_lines(*args: Any, **kwargs: Any) -> list[str]:
     return run_stdout_lines(*args, shell=True, **kwargs)
 
 
+def run_iter_lines(
+    args: str | Sequence[str],
+    echo: bool | None = False,
+    check: bool | None = True,
+    env: Mapping[str, str] | None = None,
+    env_update: dict[str, str | None] | None = None,
+    shell: bool | None = None,
+    **kwargs: Any,
+) -> Iterator[str]:
+    """Similar to...
+
+    `myke.run_stdout_lines(...)`
+
+    ...except that lines are yielded as they arrive, rather than after
+    the process exits, so that output of any size is read in constant memory.
+
+    If the caller stops iterating early, the process is killed.
+
+    Args:
+        args: ...
+        echo: write stderr to the terminal.
+        check: ...
+        env: ...
+        env_update: ...
+        shell: ...
+        **kwargs: passed to `subprocess.Popen(...)`
+
+    Yields:
+        each line of stdout, stripped, if not empty.
+
+    Raises:
+        CalledProcessError: once all lines are yielded, if `check` and
+            the process failed; with the last part of stderr.
+
+    Examples:
+        >>> import myke
+        ...
+        >>> for x in myke.run_iter_lines(["python", "-c", "print(' Hello World. ')"]):
+        ...     print(x)
+        Hello World.
+    """
+    if shell is None:
+        shell = isinstance(args, str) and " " in args
+
+    stderr: bytearray = bytearray()
+
+    with _Popen(
+        args,
+        shell=shell,
+        env=_prepare_env(env, env_update),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        **kwargs,
+    ) as proc:
+        assert proc.stdout is not None
+        stderr_thread: threading.Thread = threading.Thread(
+            target=_forward_output,
+            args=(proc.stderr, sys.stderr if echo else None, "", stderr),
+            kwargs={"capture_tail": _CHUNK_SIZE},
+            daemon=True,
+        )
+        stderr_thread.start()
+
+        try:
+            for raw in proc.stdout:
+                line: str = raw.decode(errors="replace").strip()
+                if line:
+                    yield line
+        except BaseException:
+            # e.g., `GeneratorExit` when the caller stops iterating early.
+            proc.kill()
+            raise
+        finally:
+            proc.wait()
+            stderr_thread.join()
+
+    record(proc.usage)
+
+    if check and proc.returncode:
+        raise subprocess.CalledProcessError(
+            proc.returncode,
+            args,
+            stderr=stderr.decode(errors="replace"),
+        )
+
+
+@wraps(run_iter_lines)
+def sh_iter_lines(*args: Any, **kwargs: Any) -> Iterator[str]:
+    """Shorthand for: `myke.run_iter_lines(..., shell=True)`
+
+    Args:
+        *args: ...
+        **kwargs: ...
+
+    Yields:
+        ...
+    """
+    yield from run_iter_lines(*args, shell=True, **kwargs)
+
+
+_PRINT_LOCK: threading.Lock = threading.Lock()
+
+_CHUNK_SIZE: int = 64 * 1024
+
+
+def _forward_output(
+    stream: IO[bytes],
+    out: IO[str] | None,
+    prefix: str,
+    captured: bytearray | None,
+    capture_tail: int | None = None,
+) -> None:
+    """Write the output of a process to `out` as it arrives, and accumulate it.
+
+    With a `prefix`, output is written line by line; otherwise, chunk by chunk,
+    so that partial lines (e.g., progress bars) are shown as they arrive.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending: str = ""
+
+    def _write(text: str, final: bool = False) -> None:
+        nonlocal pending
+        if prefix:
+            lines: list[str] = (pending + text).split("\n")
+            pending = lines.pop()
+            if final and pending:
+                lines.append(pending)
+            text = "".join(prefix + x.rstrip("\r") + "\n" for x in lines)
+        if text and out is not None:
+            with _PRINT_LOCK:
+                out.write(text)
+                out.flush()
+
+    read = getattr(stream, "read1", stream.read)
+
+    for chunk in iter(lambda: read(_CHUNK_SIZE), b""):
+        if captured is not None:
+            captured += chunk
+            if capture_tail is not None and len(captured) > capture_tail:
+                del captured[: len(captured) - capture_tail]
+        _write(decoder.decode(chunk))
+
+    _write(decoder.decode(b"", final=True), final=True)
+    stream.close()
+
+
+def _write_input(stream: IO[bytes], data: bytes) -> None:
+    with suppress(BrokenPipeError):
+        stream.write(data)
+    with suppress(BrokenPipeError):
+        stream.close()
+
+
+def _run_streaming(
+    args: str | Sequence[str],
+    prefix: str = "",
+    echo: bool | None = True,
+    capture_output: bool | None = False,
+    capture_tail: int | None = None,
+    check: bool | None = True,
+    env: Mapping[str, str] | None = None,
+    env_update: dict[str, str | None] | None = None,
+    shell: bool | None = None,
+    **kwargs: Any,
+) -> subprocess.CompletedProcess[bytes | str]:
+    """Like `run(...)`, but write output to the terminal as it arrives.
+
+    Each line of output is prefixed with the given `prefix`, if any.
+    """
+    if shell is None:
+        shell = isinstance(args, str) and " " in args
+
+    encoding: str | None = kwargs.pop("encoding", None)
+    errors: str | None = kwargs.pop("errors", None)
+    text: bool = (
+        bool(kwargs.pop("text", None))
+        | bool(kwargs.pop("universal_newlines", None))
+        | bool(encoding or errors)
+    )
+    timeout: float | None = kwargs.pop("timeout", None)
+
+    input_data: bytes | str | None = kwargs.pop("input", None)
+    if isinstance(input_data, str):
+        input_data = input_data.encode(encoding or "utf-8")
+    if input_data is not None:
+        kwargs["stdin"] = subprocess.PIPE
+
+    captured: tuple[bytearray | None, ...] = (
+        (bytearray(), bytearray()) if capture_output else (None, None)
+    )
+
+    with _Popen(
+        args,
+        shell=shell,
+        env=_prepare_env(env, env_update),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        **kwargs,
+    ) as proc:
+        threads: list[threading.Thread] = [
+            threading.Thread(
+                target=_forward_output,
+                args=(stream, out if echo else None, prefix, buffer, capture_tail),
+                daemon=True,
+            )
+            for stream, out, buffer in zip(
+                (proc.stdout, proc.stderr),
+                (sys.stdout, sys.stderr),
+                captured,
+            )
+        ]
+        if input_data is not None:
+            threads.append(
+                threading.Thread(
+                    target=_write_input,
+                    args=(proc.stdin, input_data),
+                    daemon=True,
+                ),
+            )
+        for x in threads:
+            x.start()
+
+        try:
+            proc.wait(timeout=timeout)
+        except BaseException:
+            proc.kill()
+            raise
+        finally:
+            for x in threads:
+                x.join()
+
+    outputs: list[bytes | str | None] = [
+        None
+        if x is None
+        else (
+            bytes(x).decode(encoding or "utf-8", errors or "strict")
+            if text
+            else bytes(x)
+        )
+        for x in captured
+    ]
+
+    p: subprocess.CompletedProcess[bytes | str] = subprocess.CompletedProcess(
+        args,
+        returncode=proc.returncode,
+        stdout=outputs[0],
+        stderr=outputs[1],
+    )
+    attach(p, proc.usage)
+
+    if check:
+        p.check_returncode()
+
+    return p
+
+
+def run_many(
+    commands: Sequence[str | Sequence[str]] | Mapping[str, str | Sequence[str]],
+    max_workers: int | None = None,
+    fail_fast: bool = True,
+    prefix: bool = False,
+    **kwargs: Any,
+) -> list[subprocess.CompletedProcess[bytes | str]]:
+    r"""Run the given commands concurrently, with `myke.run`.
+
+    Args:
+        commands: commands to run or, to label their output, a dict of label -> command.
+        max_workers: max number of commands to run at once;
+            defaults to `--myke-jobs`, or the number of CPUs.
+        fail_fast: if a command fails, don't start any more commands.
+            Commands already running are left to finish.
+        prefix: prefix each line of output with the label of its command,
+            i.e., its key in `commands`, or the command itself.
+        **kwargs: passed to `myke.run(...)`, e.g., `check`, `echo`, `env`.
+
+    Returns:
+        a `CompletedProcess` for each command, in the order given.
+
+    Raises:
+        CalledProcessError: the first error, in the order given, once all started
+            commands have finished.
+
+    Examples:
+        >>> import myke
+        ...
+        >>> results = myke.run_many(
+        ...     {'a': "echo 'Hello World.'", 'b': "echo 'Goodbye World.'"},
+        ...     max_workers=1,
+        ...     prefix=True,
+        ... )
+        [a] Hello World.
+        [b] Goodbye World.
+        >>> [x.returncode for x in results]
+        [0, 0]
+    """
+    from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, wait
+
+    from .scheduler import get_jobs
+
+    labels: list[str]
+    args_list: list[str | Sequence[str]]
+    if isinstance(commands, Mapping):
+        labels = [str(x) for x in commands]
+        args_list = list(commands.values())
+    else:
+        args_list = list(commands)
+        labels = [x if isinstance(x, str) else " ".join(x) for x in args_list]
+
+    if not args_list:
+        return []
+
+    echo: bool | None = kwargs.pop("echo", True)
+    failed: threading.Event = threading.Event()
+
+    def _run_one(i: int) -> subprocess.CompletedProcess[bytes | str]:
+        if fail_fast and failed.is_set():
+            raise CancelledError(labels[i])
+        try:
+            if prefix and echo:
+                return _run_streaming(
+                    args_list[i],
+                    prefix=f"[{labels[i]}] ",
+                    **kwargs,
+                )
+            return run(args_list[i], echo=echo, **kwargs)
+        except BaseException:
+            failed.set()
+            raise
+
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers or get_jobs(), len(args_list)),
+        thread_name_prefix="myke",
+    ) as pool:
+        futures: list[Future[subprocess.CompletedProcess[bytes | str]]] = [
+            # each in a copy of this context, to count towards the usage of this task.
+            pool.submit(copy_context().run, _run_one, i)
+            for i in range(len(args_list))
+        ]
+
+        try:
+            wait(futures)
+        except BaseException:
+            for x in futures:
+                x.cancel()
+            raise
+
+    return [x.result() for x in futures]
+
+
+_SIGPIPE: int = getattr(signal, "SIGPIPE", 13)
+
+
+class CompletedPipeline(subprocess.CompletedProcess):  # type: ignore[type-arg]
+    """The result of `myke.pipe(...)`.
+
+    Like `bash -o pipefail`, `returncode` is that of the last stage that failed,
+    or 0 if all succeeded. A stage killed by `SIGPIPE`, because a later stage
+    exited without reading all of its output (e.g., `head`), is not a failure.
+
+    Attributes:
+        args: the command of each stage.
+        returncodes: the return code of each stage.
+        stdout: the captured stdout of the last stage.
+        stderr: the captured stderr of all stages.
+    """
+
+    def __init__(
+        self,
+        args: list[list[str]],
+        returncodes: list[int],
+        stdout: bytes | str | None = None,
+        stderr: bytes | str | None = None,
+    ) -> None:
+        self.returncodes: list[int] = returncodes
+        self.failed_stage: int | None = None
+
+        for i, x in reversed(list(enumerate(returncodes))):
+            if x and not (i < len(returncodes) - 1 and x == -_SIGPIPE):
+                self.failed_stage = i
+                break
+
+        super().__init__(
+            args,
+            returncode=(
+                0 if self.failed_stage is None else returncodes[self.failed_stage]
+            ),
+            stdout=stdout,
+            stderr=stderr,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(args={self.args!r}, "
+            f"returncodes={self.returncodes!r})"
+        )
+
+    def check_returncode(self) -> None:
+        """Raise `CalledProcessError`, for the stage that failed, if any."""
+        if self.failed_stage is not None:
+            raise subprocess.CalledProcessError(
+                self.returncode,
+                self.args[self.failed_stage],
+                self.stdout,
+                self.stderr,
+            )
+
+
+def pipe(
+    *commands: str | Sequence[str],
+    capture_output: None | bool = False,
+    echo: bool | None = True,
+    check: bool | None = True,
+    env: Mapping[str, str] | None = None,
+    env_update: dict[str, str | None] | None = None,
+    **kwargs: Any,
+) -> CompletedPipeline:
+    r"""Run the given commands as a pipeline, without a shell.
+
+    The stdout of each command is connected to the stdin of the next with
+    an OS pipe, i.e., data does not pass through Python.
+
+    Args:
+        *commands: the command of each stage; a string is split with `shlex.split`.
+        capture_output: capture the stdout of the last stage, and the stderr
+            of all stages. With `echo`, output is also written to the terminal
+            as it arrives.
+        echo: ...
+        check: ...
+        env: ...
+        env_update: ...
+        **kwargs: `text`, `input`, and `timeout` are handled as in `subprocess.run`;
+            the rest are passed to `subprocess.Popen(...)` for each stage.
+
+    Returns:
+        ...
+
+    Raises:
+        CalledProcessError: if `check`, for the last stage that failed.
+
+    Examples:
+        >>> import myke
+        ...
+        >>> p = myke.pipe(
+        ...     ["printf", "b\na\nb\n"],
+        ...     ["sort"],
+        ...     ["uniq", "-c"],
+        ...     capture_output=True,
+        ...     echo=False,
+        ...     text=True,
+        ... )
+        >>> p.returncodes
+        [0, 0, 0]
+        >>> p.stdout.split()
+        ['1', 'a', '2', 'b']
+    """
+    import shlex
+    import time
+
+    if not commands:
+        raise ValueError("No commands given.")
+
+    args: list[list[str]] = [
+        shlex.split(x) if isinstance(x, str) else list(x) for x in commands
+    ]
+
+    text: bool = bool(kwargs.pop("text", None)) | bool(
+        kwargs.pop("universal_newlines", None),
+    )
+    timeout: float | None = kwargs.pop("timeout", None)
+
+    input_data: bytes | str | None = kwargs.pop("input", None)
+    if isinstance(input_data, str):
+        input_data = input_data.encode()
+    stdin: Any = (
+        subprocess.PIPE if input_data is not None else kwargs.pop("stdin", None)
+    )
+
+    output: Any = (
+        subprocess.PIPE if capture_output else (None if echo else subprocess.DEVNULL)
+    )
+    terminal: tuple[IO[str] | None, IO[str] | None] = (
+        (sys.stdout, sys.stderr) if echo else (None, None)
+    )
+
+    env = _prepare_env(env, env_update)
+
+    procs: list[_Popen] = []
+    threads: list[threading.Thread] = []
+    captured_stdout: bytearray = bytearray()
+    captured_stderr: list[bytearray] = [bytearray() for _ in args]
+
+    try:
+        for i, x in enumerate(args):
+            proc: _Popen = _Popen(
+                x,
+                stdin=stdin,
+                stdout=subprocess.PIPE if i < len(args) - 1 else output,
+                stderr=output,
+                env=env,
+                **kwargs,
+            )
+            procs.append(proc)
+
+            if i > 0 and stdin is not None:
+                # so that the previous stage gets `SIGPIPE` if this one exits early.
+                stdin.close()
+            stdin = proc.stdout
+
+            if capture_output:
+                threads.append(
+                    threading.Thread(
+                        target=_forward_output,
+                        args=(proc.stderr, terminal[1], "", captured_stderr[i]),
+                        daemon=True,
+                    ),
+                )
+
+        if capture_output:
+            threads.append(
+                threading.Thread(
+                    target=_forward_output,
+                    args=(procs[-1].stdout, terminal[0], "", captured_stdout),
+                    daemon=True,
+                ),
+            )
+
+        if input_data is not None:
+            threads.append(
+                threading.Thread(
+                    target=_write_input,
+                    args=(procs[0].stdin, input_data),
+                    daemon=True,
+                ),
+            )
+
+        for t in threads:
+            t.start()
+
+        deadline: float | None = None if timeout is None else time.monotonic() + timeout
+        for proc in procs:
+            proc.wait(
+                timeout=None
+                if deadline is None
+                else max(0, deadline - time.monotonic()),
+            )
+    except BaseException:
+        for proc in procs:
+            with suppress(OSError):
+                proc.kill()
+        raise
+    finally:
+        for proc in procs:
+            proc.wait()
+        for t in threads:
+            t.join()
+
+    outputs: list[bytes | str | None] = [
+        None if not capture_output else (bytes(x).decode() if text else bytes(x))
+        for x in (captured_stdout, b"".join(captured_stderr))
+    ]
+
+    p: CompletedPipeline = CompletedPipeline(
+        args,
+        returncodes=[x.returncode for x in procs],
+        stdout=outputs[0],
+        stderr=outputs[1],
+    )
+    attach(p, combine(x.usage for x in procs))
+
+    if check:
+        p.check_returncode()
+
+    return p
+
+
 def _run_pip(
     *args: str,
     pip_args: list[str] | None = None,
@@ -238,6 +991,18 @@ def require(
         ...     'module-c': '0.1.*',
         ... })
     """
+    with span(
+        "require: " + " ".join([*args, *[f"{k}=={v}" for k, v in kwargs.items()]]),
+    ):
+        return _require(*args, pip_args=pip_args, skip_check=skip_check, **kwargs)
+
+
+def _require(
+    *args: str,
+    pip_args: list[str] | None = None,
+    skip_check: bool = False,
+    **kwargs: str,
+) -> subprocess.CompletedProcess[str]:
     if not pip_args:
         pip_args = []
 
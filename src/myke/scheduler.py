@@ -0,0 +1,326 @@
+"""> Functions for running the dependencies of tasks, declared with `@task(deps=[...])`.
+
+When a task with dependencies is invoked, the graph of its (transitive) dependencies
+is built, and independent dependencies are run concurrently on a thread pool.
+Each dependency runs at most once per invocation, and the first error
+stops any dependencies that have not started yet.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    CancelledError,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar, copy_context
+from typing import Any, Callable, Iterator, Sequence, Union
+
+from .exceptions import DependencyCycleError, TaskNotFoundError
+from .profiling import is_tracing, trace
+
+__all__ = [
+    "get_jobs",
+    "set_jobs",
+    "get_dependencies",
+    "get_graph",
+    "invocation",
+    "run_dependencies",
+]
+
+Dependency = Union[Callable[..., Any], str]
+
+DEPS_ATTR: str = "__myke_deps__"
+
+# set on `async def` tasks; the function that runs the task, i.e., as invoked by myke.
+SYNC_ATTR: str = "__myke_sync__"
+
+_JOBS: list[int] = []
+
+
+class _Invocation:
+    """The dependencies run (or running) during one invocation of myke."""
+
+    def __init__(self) -> None:
+        self.lock: threading.Lock = threading.Lock()
+        self.futures: dict[Callable[..., Any], Future[Any]] = {}
+
+    def claim(self, func: Callable[..., Any]) -> tuple[Future[Any], bool]:
+        """Return the future of the given function, and whether it is newly claimed.
+
+        The caller that newly claims a function is responsible for running it.
+        """
+        with self.lock:
+            future: Future[Any] | None = self.futures.get(func)
+            if future is not None:
+                return future, False
+            future = self.futures[func] = Future()
+            return future, True
+
+
+_INVOCATION: ContextVar[_Invocation | None] = ContextVar(
+    "myke_invocation",
+    default=None,
+)
+
+
+def get_jobs() -> int:
+    """Return the max number of dependencies to run concurrently.
+
+    Set by `set_jobs(...)`, the `MYKE_JOBS` environment variable,
+    or defaults to the number of CPUs.
+
+    Returns:
+        ...
+
+    Raises:
+        ValueError: if `MYKE_JOBS` is not an integer.
+    """
+    if _JOBS:
+        return _JOBS[-1]
+
+    return _get_env_jobs() or os.cpu_count() or 1
+
+
+def _get_env_jobs() -> int | None:
+    """Return the max number of jobs given by the `MYKE_JOBS` environment variable.
+
+    Raises:
+        ValueError: if `MYKE_JOBS` is not an integer.
+    """
+    jobs: str | None = os.getenv("MYKE_JOBS")
+    if not jobs:
+        return None
+
+    try:
+        return max(1, int(jobs))
+    except ValueError:
+        raise ValueError(f"MYKE_JOBS must be an integer, not: '{jobs}'") from None
+
+
+def set_jobs(jobs: int | None) -> None:
+    """Set the max number of dependencies to run concurrently.
+
+    Args:
+        jobs: ... If None, revert to the default.
+    """
+    _JOBS.clear()
+    if jobs is not None:
+        _JOBS.append(max(1, jobs))
+
+
+def _get_name(func: Callable[..., Any]) -> str:
+    from .tasks import TASKS
+
+    for x in TASKS:
+        if x.function is func:
+            return x.name
+
+    return getattr(func, "__name__", repr(func))
+
+
+def _resolve(dep: Dependency) -> Callable[..., Any]:
+    if not isinstance(dep, str):
+        return getattr(dep, SYNC_ATTR, dep)
+
+    from .tasks import TASKS
+    from .utils import convert_to_command_string
+
+    for name in dep, convert_to_command_string(dep):
+        found = TASKS.find(name)
+        if found is not None:
+            return found.function
+
+    raise TaskNotFoundError(dep)
+
+
+def get_dependencies(func: Callable[..., Any]) -> tuple[Callable[..., Any], ...]:
+    """Return the direct dependencies of the given task function.
+
+    Args:
+        func: ...
+
+    Returns:
+        ...
+
+    Raises:
+        TaskNotFoundError: if a dependency is given by name, and no such task exists.
+    """
+    deps: Sequence[Dependency] = getattr(func, DEPS_ATTR, ())
+    return tuple(_resolve(x) for x in deps)
+
+
+def get_graph(
+    func: Callable[..., Any],
+) -> dict[Callable[..., Any], tuple[Callable[..., Any], ...]]:
+    """Return the graph of the given task function and its transitive dependencies.
+
+    Args:
+        func: ...
+
+    Returns:
+        a dict of function -> dependencies, in topological order,
+            i.e., every function comes after its dependencies.
+
+    Raises:
+        DependencyCycleError: ...
+        TaskNotFoundError: ...
+    """
+    graph: dict[Callable[..., Any], tuple[Callable[..., Any], ...]] = {}
+    visiting: list[Callable[..., Any]] = []
+
+    def _visit(f: Callable[..., Any]) -> None:
+        if f in visiting:
+            cycle: list[Callable[..., Any]] = [*visiting[visiting.index(f) :], f]
+            raise DependencyCycleError(" -> ".join(_get_name(x) for x in cycle))
+
+        if f in graph:
+            return
+
+        visiting.append(f)
+        deps: tuple[Callable[..., Any], ...] = get_dependencies(f)
+        for x in deps:
+            _visit(x)
+        visiting.pop()
+
+        graph[f] = deps
+
+    _visit(func)
+
+    return graph
+
+
+def _run_claimed(future: Future[Any], func: Callable[..., Any]) -> None:
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        # nb: `_get_name` scans the registered tasks; only pay for it when tracing.
+        with trace(f"task: {_get_name(func)}") if is_tracing() else nullcontext():
+            result: Any = func()
+    except BaseException as e:  # pylint: disable=broad-except # noqa: BLE001
+        future.set_exception(e)
+    else:
+        future.set_result(result)
+
+
+def _run_graph(
+    graph: dict[Callable[..., Any], tuple[Callable[..., Any], ...]],
+    state: _Invocation,
+    jobs: int,
+) -> None:
+    if jobs <= 1 or len(graph) <= 1:
+        # the graph is in topological order.
+        for f in graph:
+            future, claimed = state.claim(f)
+            if claimed:
+                _run_claimed(future, f)
+            # raises the error of the dependency, or waits for another thread.
+            future.result()
+        return
+
+    remaining: dict[Callable[..., Any], tuple[Callable[..., Any], ...]] = dict(graph)
+    done: set[Callable[..., Any]] = set()
+    waiting: dict[Future[Any], Callable[..., Any]] = {}
+    claimed_futures: list[Future[Any]] = []
+    error: BaseException | None = None
+
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="myke") as pool:
+        while True:
+            if error is None:
+                for f in [k for k, v in remaining.items() if all(x in done for x in v)]:
+                    del remaining[f]
+                    future, claimed = state.claim(f)
+                    if claimed:
+                        pool.submit(copy_context().run, _run_claimed, future, f)
+                        claimed_futures.append(future)
+                    waiting[future] = f
+
+            if not waiting:
+                break
+
+            finished, _ = wait(waiting, return_when=FIRST_COMPLETED)
+
+            for future in finished:
+                f = waiting.pop(future)
+
+                e: BaseException | None = (
+                    CancelledError(_get_name(f))
+                    if future.cancelled()
+                    else future.exception()
+                )
+
+                if e is None:
+                    done.add(f)
+                elif error is None:
+                    error = e
+                    # fail fast: drop dependencies that have not started yet.
+                    for x in claimed_futures:
+                        x.cancel()
+
+    if error is not None:
+        raise error
+
+
+@contextmanager
+def invocation() -> Iterator[None]:
+    """Share the dependencies run within this context, e.g., across concurrent tasks.
+
+    Each dependency runs at most once per invocation.
+    Nested invocations share the state of the outermost one.
+    """
+    if _INVOCATION.get() is not None:
+        yield
+        return
+
+    token = _INVOCATION.set(_Invocation())
+    try:
+        yield
+    finally:
+        _INVOCATION.reset(token)
+
+
+@contextmanager
+def run_dependencies(func: Callable[..., Any]) -> Iterator[None]:
+    """Run the dependencies of the given task function, before entering the context.
+
+    Dependencies completed within the context, e.g., by tasks that invoke other
+    tasks, are not run again.
+
+    Args:
+        func: ...
+
+    Raises:
+        DependencyCycleError: ...
+        TaskNotFoundError: ...
+
+    Examples:
+        >>> from myke.scheduler import run_dependencies
+        ...
+        >>> def build():
+        ...     print('build')
+        ...
+        >>> def test():
+        ...     with run_dependencies(test):
+        ...         print('test')
+        ...
+        >>> test.__myke_deps__ = [build]
+        >>> test()
+        build
+        test
+    """
+    with invocation():
+        state: _Invocation | None = _INVOCATION.get()
+        assert state is not None
+
+        graph: dict[Callable[..., Any], tuple[Callable[..., Any], ...]] = get_graph(
+            func,
+        )
+        del graph[func]
+        _run_graph(graph, state, jobs=get_jobs())
+
+        yield
@@ -0,0 +1,320 @@
+"""> A persistent shell session, for running many commands without a new shell each.
+
+`myke.sh` starts a new shell for every command. A `Shell` keeps one shell alive,
+and sends it each command over stdin; the output and exit status of each command
+are delimited by unique markers. State like the working directory and exported
+variables persists between commands, as in an interactive shell.
+"""
+
+from __future__ import annotations
+
+import codecs
+import os
+import selectors
+import shlex
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from contextlib import suppress
+from types import TracebackType
+from typing import IO, Mapping
+
+from .exceptions import ShellExitedError
+from .run import _PRINT_LOCK, _prepare_env
+
+__all__ = ["Shell"]
+
+
+class _Stream:
+    """The output of the shell on one pipe, up to the marker of the current command."""
+
+    def __init__(
+        self,
+        fd: int,
+        out: IO[str] | None,
+        capture: bool,
+        marker: bytes,
+    ) -> None:
+        self.fd: int = fd
+        self.out: IO[str] | None = out
+        self.capture: bool = capture
+        self.marker: bytes = marker
+        self.buffer: bytearray = bytearray()
+        self.written: int = 0
+        self.done: bool = False
+        self.eof: bool = False
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk:
+            self.eof = True
+            self._write(len(self.buffer), final=True)
+            return
+
+        self.buffer += chunk
+
+        i: int = self.buffer.find(self.marker)
+        if i < 0:
+            # hold back what could be the start of the marker.
+            self._write(len(self.buffer) - len(self.marker) + 1)
+        elif self.buffer.find(b"\n", i + len(self.marker)) >= 0:
+            self.done = True
+            self._write(i, final=True)
+
+    def _write(self, stop: int, final: bool = False) -> None:
+        text: str = ""
+        if stop > self.written:
+            text = self.decoder.decode(bytes(self.buffer[self.written : stop]))
+            if self.capture:
+                self.written = stop
+            else:
+                del self.buffer[:stop]
+                self.written = 0
+        if final:
+            text += self.decoder.decode(b"", final=True)
+
+        if text and self.out is not None:
+            with _PRINT_LOCK:
+                self.out.write(text)
+                self.out.flush()
+
+    def get_output(self) -> bytes:
+        """Return the output of the command, i.e., before the marker."""
+        i: int = self.buffer.find(self.marker)
+        return bytes(self.buffer if i < 0 else self.buffer[:i])
+
+    def get_status(self) -> int:
+        """Return the exit status printed after the marker."""
+        i: int = self.buffer.find(self.marker)
+        return int(self.buffer[i + len(self.marker) :])
+
+
+class Shell:
+    """A persistent shell session, to run many commands in one shell process.
+
+    Commands are run with `eval`, with stdin from `/dev/null`. If a command
+    exits the shell (e.g., `exit 1`), the session is closed, and later commands
+    raise `ShellExitedError`.
+
+    Args:
+        executable: the shell to run; defaults to `bash`, if found, else `/bin/sh`.
+        cwd: initial working directory of the shell.
+        env: ...
+        env_update: ...
+
+    Examples:
+        >>> import myke
+        ...
+        >>> with myke.Shell() as shell:
+        ...     _ = shell.run('cd /tmp && export GREETING="Hello World."')
+        ...     _ = shell.run('echo "$GREETING"; pwd')
+        Hello World.
+        /tmp
+    """
+
+    def __init__(
+        self,
+        executable: str | None = None,
+        cwd: str | os.PathLike[str] | None = None,
+        env: Mapping[str, str] | None = None,
+        env_update: Mapping[str, str | None] | None = None,
+    ) -> None:
+        self.executable: str = executable or shutil.which("bash") or "/bin/sh"
+        self.cwd: str | os.PathLike[str] | None = cwd
+        self.env: Mapping[str, str] | None = env
+        self.env_update: Mapping[str, str | None] | None = env_update
+        self._proc: subprocess.Popen[bytes] | None = None
+        self._exited: int | None = None
+        self._lock: threading.Lock = threading.Lock()
+        self._marker: str = f"__myke_{uuid.uuid4().hex}"
+        self._count: int = 0
+
+    def __enter__(self) -> Shell:
+        self._start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _start(self) -> subprocess.Popen[bytes]:
+        if self._exited is not None:
+            raise ShellExitedError(self._exited)
+
+        if self._proc is None:
+            self._proc = subprocess.Popen(
+                [self.executable],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=self.cwd,
+                env=_prepare_env(self.env, self.env_update),
+            )
+
+        return self._proc
+
+    def close(self, timeout: float | None = 5) -> None:
+        """Exit the shell.
+
+        Args:
+            timeout: seconds to wait for the shell to exit, before killing it.
+        """
+        proc: subprocess.Popen[bytes] | None = self._proc
+        if proc is None:
+            return
+
+        self._proc = None
+
+        assert proc.stdin is not None
+        with suppress(OSError):
+            proc.stdin.write(b"exit\n")
+            proc.stdin.close()
+
+        try:
+            proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        finally:
+            for x in (proc.stdout, proc.stderr):
+                if x is not None:
+                    x.close()
+
+        if self._exited is None:
+            self._exited = proc.returncode
+
+    def run(
+        self,
+        command: str,
+        capture_output: None | bool = False,
+        echo: bool | None = True,
+        check: bool | None = True,
+        text: bool | None = False,
+        timeout: float | None = None,
+    ) -> subprocess.CompletedProcess[bytes | str]:
+        r"""Run the given command in the shell.
+
+        Args:
+            command: ...
+            capture_output: ...
+            echo: ...
+            check: ...
+            text: ...
+            timeout: seconds to wait for the command; if exceeded,
+                the shell is killed, and `TimeoutExpired` is raised.
+
+        Returns:
+            ...
+
+        Raises:
+            ShellExitedError: if the shell has exited, e.g., by a previous `exit`.
+
+        Examples:
+            >>> import myke
+            ...
+            >>> with myke.Shell() as shell:
+            ...     p = shell.run("echo 'Hello World.'", capture_output=True, echo=False)
+            >>> p.stdout
+            b'Hello World.\n'
+        """
+        with self._lock:
+            proc: subprocess.Popen[bytes] = self._start()
+            assert proc.stdin is not None
+            assert proc.stdout is not None
+            assert proc.stderr is not None
+
+            self._count += 1
+            marker: str = f"{self._marker}_{self._count}"
+
+            # the marker is printed on a new line, and the newline is removed again.
+            script: str = (
+                f"eval {shlex.quote(command)} </dev/null\n"
+                f"printf '\\n%s %d\\n' '{marker}' \"$?\"\n"
+                f"printf '\\n%s\\n' '{marker}' >&2\n"
+            )
+
+            streams: list[_Stream] = [
+                _Stream(
+                    proc.stdout.fileno(),
+                    sys.stdout if echo else None,
+                    capture=bool(capture_output),
+                    marker=f"\n{marker} ".encode(),
+                ),
+                _Stream(
+                    proc.stderr.fileno(),
+                    sys.stderr if echo else None,
+                    capture=bool(capture_output),
+                    marker=f"\n{marker}".encode(),
+                ),
+            ]
+
+            with suppress(BrokenPipeError):
+                proc.stdin.write(script.encode())
+                proc.stdin.flush()
+
+            self._communicate(proc, streams, timeout, command)
+
+            returncode: int
+            if all(x.done for x in streams):
+                returncode = streams[0].get_status()
+            else:
+                # the command exited the shell.
+                self.close()
+                returncode = proc.returncode
+
+            outputs: list[bytes | str | None] = [None, None]
+            if capture_output:
+                outputs = [
+                    x.get_output().decode() if text else x.get_output() for x in streams
+                ]
+
+        p: subprocess.CompletedProcess[bytes | str] = subprocess.CompletedProcess(
+            command,
+            returncode=returncode,
+            stdout=outputs[0],
+            stderr=outputs[1],
+        )
+
+        if check:
+            p.check_returncode()
+
+        return p
+
+    def _communicate(
+        self,
+        proc: subprocess.Popen[bytes],
+        streams: list[_Stream],
+        timeout: float | None,
+        command: str,
+    ) -> None:
+        """Read the output of the current command, until its markers, or the shell exits."""
+        deadline: float | None = None if timeout is None else time.monotonic() + timeout
+
+        with selectors.DefaultSelector() as selector:
+            for x in streams:
+                selector.register(x.fd, selectors.EVENT_READ, x)
+
+            while selector.get_map():
+                remaining: float | None = (
+                    None if deadline is None else max(0, deadline - time.monotonic())
+                )
+                events: list[tuple[selectors.SelectorKey, int]] = selector.select(
+                    remaining,
+                )
+                if not events:
+                    proc.kill()
+                    self.close()
+                    raise subprocess.TimeoutExpired(command, timeout)  # type: ignore[arg-type]
+
+                for key, _ in events:
+                    stream: _Stream = key.data
+                    stream.feed(os.read(stream.fd, 64 * 1024))
+                    if stream.done or stream.eof:
+                        selector.unregister(stream.fd)
@@ -4,29 +4,254 @@ from __future__ import annotations
 
 import collections.abc
 import os
-from dataclasses import dataclass, field
+import sys
 from functools import partial, wraps
+from inspect import isasyncgenfunction, iscoroutinefunction
 from subprocess import CompletedProcess
 from types import ModuleType
-from typing import Any, Callable, Sequence
+from typing import Any, Callable, Iterable, Iterator, Mapping, Sequence, Tuple, overload
 
 import yapx
 
-from .exceptions import NoTasksFoundError
+from . import history, usage
+from .artifacts import with_artifact_cache
+from .exceptions import NoTasksFoundError, TaskAlreadyRegisteredError
+from .profiling import span
 from .run import sh
+from .scheduler import DEPS_ATTR, SYNC_ATTR, Dependency, run_dependencies
+from .uptodate import PathPatterns, skip_if_up_to_date
 from .utils import _MykeSourceFileLoader, convert_to_command_string
 
+# interned tuples of task parents, shared by all tasks with the same parents.
+_PARENTS: dict[tuple[str | yapx.Command, ...], tuple[str | yapx.Command, ...]] = {}
+
+
+def _intern_parents(
+    parents: Iterable[str | yapx.Command],
+) -> tuple[str | yapx.Command, ...]:
+    parents = tuple(sys.intern(x) if isinstance(x, str) else x for x in parents)
+    return _PARENTS.setdefault(parents, parents)
+
 
-@dataclass
 class Task:
-    name: str
-    function: Callable[..., Any]
-    parents: tuple[str | yapx.Command, ...] = field(default_factory=tuple)
+    """A task registered with myke.
+
+    Tasks are slotted, and their names and parents are interned,
+    so that registries of many (e.g., generated) tasks stay small.
+
+    Args:
+        name: name of the command.
+        function: function called when the command is invoked.
+        parents: optional parent(s) for the command.
+    """
+
+    __slots__ = ("name", "function", "parents")
+
+    def __init__(
+        self,
+        name: str,
+        function: Callable[..., Any],
+        parents: Iterable[str | yapx.Command] = (),
+    ) -> None:
+        self.name: str = sys.intern(name)
+        self.function: Callable[..., Any] = function
+        self.parents: tuple[str | yapx.Command, ...] = _intern_parents(parents)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(name={self.name!r},"
+            f" function={self.function!r}, parents={self.parents!r})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Task):
+            return NotImplemented
+        return (self.name, self.function, self.parents) == (
+            other.name,
+            other.function,
+            other.parents,
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+class _TaskStub:
+    """Stands in for the function of a task that has not been imported,
+    e.g., when the task was read from a cached manifest.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        module: str,
+        path: str,
+        doc: str | None = None,
+        signature: str | None = None,
+    ) -> None:
+        self.__name__: str = name
+        self.__qualname__: str = name
+        self.__module__: str = module
+        self.__doc__: str | None = doc
+        self.path: str = path
+        self.signature: str | None = signature
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        raise RuntimeError(
+            f"Task '{self.__qualname__}' must be imported from '{self.path}'",
+        )
+
+    def __repr__(self) -> str:
+        return f"<task stub {self.__module__}.{self.__qualname__}>"
 
 
-TASKS: list[Task] = []
 ROOT_TASK_KEY: str = "__root__"
 
+TaskKey = Tuple[Tuple[str, ...], str]
+
+
+class TaskRegistry(Sequence[Task]):
+    """A sequence of registered tasks, indexed by their parents and name.
+
+    Registering a task with the same parents and name as another raises
+    `TaskAlreadyRegisteredError`.
+
+    Examples:
+        >>> from myke.tasks import Task, TaskRegistry
+        ...
+        >>> registry = TaskRegistry([Task('say-hello', print)])
+        >>> registry.get('say-hello').function
+        <built-in function print>
+        >>> registry.append(Task('say-hello', print))
+        Traceback (most recent call last):
+        ...
+        myke.exceptions.TaskAlreadyRegisteredError: say-hello
+    """
+
+    def __init__(self, tasks: Iterable[Task] = ()) -> None:
+        self._tasks: list[Task] = []
+        self._index: dict[TaskKey, Task] = {}
+        # the first task registered with each name.
+        self._by_name: dict[str, Task] = {}
+        self._tree: dict[tuple[str | yapx.Command, ...], list[Task]] = {}
+        self.extend(tasks)
+
+    @staticmethod
+    def get_key(name: str, parents: Sequence[str | yapx.Command] = ()) -> TaskKey:
+        parent_names: tuple[Any, ...] = _intern_parents(
+            p if isinstance(p, str) else p.name for p in parents
+        )
+        return (parent_names, name)
+
+    def append(self, task: Task) -> None:
+        self.extend([task])
+
+    def extend(self, tasks: Iterable[Task]) -> None:
+        new_tasks: dict[TaskKey, Task] = {}
+
+        for x in tasks:
+            key: TaskKey = self.get_key(x.name, x.parents)
+            if key in self._index or key in new_tasks:
+                raise TaskAlreadyRegisteredError(" > ".join([*key[0], key[1]]))
+            new_tasks[key] = x
+
+        for key, x in new_tasks.items():
+            self._tasks.append(x)
+            self._index[key] = x
+            self._by_name.setdefault(x.name, x)
+            self._tree.setdefault(x.parents, []).append(x)
+
+    def clear(self) -> None:
+        self._tasks.clear()
+        self._index.clear()
+        self._by_name.clear()
+        self._tree.clear()
+
+    def get(
+        self,
+        name: str,
+        parents: Sequence[str | yapx.Command] = (),
+    ) -> Task | None:
+        """Return the task with the given name and parents, if registered."""
+        return self._index.get(self.get_key(name, parents))
+
+    def find(self, name: str) -> Task | None:
+        """Return the first task registered with the given name, under any parents."""
+        return self._by_name.get(name)
+
+    @property
+    def root(self) -> Task | None:
+        return self.find(ROOT_TASK_KEY)
+
+    @property
+    def tree(self) -> dict[tuple[str | yapx.Command, ...], list[Task]]:
+        """Registered tasks, grouped by their parents."""
+        return self._tree
+
+    @overload
+    def __getitem__(self, index: int) -> Task:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Task]:
+        ...
+
+    def __getitem__(self, index: int | slice) -> Task | list[Task]:
+        return self._tasks[index]
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __iter__(self) -> Iterator[Task]:
+        return iter(self._tasks)
+
+    def __contains__(self, task: object) -> bool:
+        return isinstance(task, Task) and (
+            self._index.get(self.get_key(task.name, task.parents)) == task
+        )
+
+    def __repr__(self) -> str:
+        return repr(self._tasks)
+
+
+TASKS: TaskRegistry = TaskRegistry()
+
+# set on task functions wrapped by `_wrap_task`, and copied by `functools.wraps`.
+_WRAPPED_ATTR: str = "__myke_task__"
+
+# absolute paths of all imported Mykefiles, in order of import.
+_IMPORTED_MYKEFILES: list[str] = []
+
+
+def _wrap_task(
+    func: Callable[..., Any],
+    name: str,
+    parents: Iterable[str | yapx.Command] = (),
+) -> Callable[..., Any]:
+    """Wrap the given task function, to record each run in the history,
+    with the usage of the processes it runs.
+
+    Functions wrapped before, e.g., by `task`, are returned unchanged,
+    as are `async def` functions, which are run on an event loop by `task`.
+    """
+    if (
+        getattr(func, _WRAPPED_ATTR, False)
+        or iscoroutinefunction(func)
+        or isasyncgenfunction(func)
+    ):
+        return func
+
+    parent_names: list[str] = [x if isinstance(x, str) else x.name for x in parents]
+    if name == ROOT_TASK_KEY:
+        name = "(root)"
+
+    func = usage.wrap(
+        history.wrap(func, name=name, parents=parent_names),
+        " ".join([*parent_names, name]),
+    )
+    setattr(func, _WRAPPED_ATTR, True)
+
+    return func
+
 
 def add_tasks(*args: Callable[..., Any] | Task, **kwargs: Callable[..., Any]) -> None:
     """Register the given callable(s) with myke.
@@ -49,24 +274,28 @@ def add_tasks(*args: Callable[..., Any] | Task, **kwargs: Callable[..., Any]) ->
         ...
         >>> myke.add_tasks(say_hello, say_goodbye)
     """
-    TASKS.extend(
-        [
-            x
-            if isinstance(x, Task)
-            else Task(name=convert_to_command_string(x.__name__), function=x)
-            for x in args
-        ],
-    )
-    TASKS.extend(
-        [
-            Task(
-                name=(k if k == ROOT_TASK_KEY else convert_to_command_string(k)),
-                function=v,
-            )
-            for k, v in kwargs.items()
-        ],
+    tasks: list[Task] = [
+        x
+        if isinstance(x, Task)
+        else Task(name=convert_to_command_string(x.__name__), function=x)
+        for x in args
+    ]
+    tasks.extend(
+        Task(
+            name=(k if k == ROOT_TASK_KEY else convert_to_command_string(k)),
+            function=v,
+        )
+        for k, v in kwargs.items()
     )
 
+    # every task is wrapped here, however it is registered.
+    for i, x in enumerate(tasks):
+        func: Callable[..., Any] = _wrap_task(x.function, x.name, x.parents)
+        if func is not x.function:
+            tasks[i] = Task(name=x.name, function=func, parents=x.parents)
+
+    TASKS.extend(tasks)
+
 
 def import_mykefile(path: str) -> None:
     """Import tasks from another Mykefile.
@@ -84,9 +313,12 @@ def import_mykefile(path: str) -> None:
     """
     n_tasks_before: int = len(TASKS)
 
-    loader = _MykeSourceFileLoader(os.path.relpath(path), path)
-    mod: ModuleType = ModuleType(loader.name)
-    loader.exec_module(mod)
+    _IMPORTED_MYKEFILES.append(os.path.abspath(path))
+
+    with span(f"import_mykefile: {os.path.relpath(path)}"):
+        loader = _MykeSourceFileLoader(os.path.relpath(path), path)
+        mod: ModuleType = ModuleType(loader.name)
+        loader.exec_module(mod)
 
     if len(TASKS) <= n_tasks_before:
         raise NoTasksFoundError(path)
@@ -108,26 +340,65 @@ def import_module(name: str) -> None:
     """
     n_tasks_before: int = len(TASKS)
 
-    __import__(name)
+    with span(f"import_module: {name}"):
+        __import__(name)
 
     if len(TASKS) <= n_tasks_before:
         raise NoTasksFoundError(name)
 
 
+def _with_dependencies(
+    func: Callable[..., Any],
+    deps: Sequence[Dependency],
+) -> Callable[..., Any]:
+    @wraps(func)
+    def _inner_func(*args: Any, **kwargs: Any) -> Any:
+        with run_dependencies(_inner_func):
+            return func(*args, **kwargs)
+
+    setattr(_inner_func, DEPS_ATTR, tuple(deps))
+
+    return _inner_func
+
+
 def task(
     func: Callable[..., Any] | None = None,
     *,
     name: str | None = None,
     parents: str | tuple[str | yapx.Command, ...] | None = None,
     root: bool = False,
+    deps: Sequence[Dependency] | None = None,
+    inputs: PathPatterns | None = None,
+    outputs: PathPatterns | None = None,
+    hash_inputs: bool = False,
+    cache_outputs: bool = False,
+    cache_env: Sequence[str] | None = None,
 ) -> Callable[..., Any] | Callable[..., Callable[..., Any]]:
     """Function decorator to register functions with myke.
 
+    `async def` functions, including async generators (e.g., a root task with
+    async setup and teardown), are run on an event loop managed by myke.
+    The decorator returns them unchanged, so they can be awaited by other
+    async code (e.g., with `asyncio.gather`); awaited directly, a task runs
+    without its `deps`, and is not skipped or restored by `outputs`.
+
     Args:
         func: ...
         name: name of the command.
         parents: optional parent(s) for the command.
         root: if True, import this as the root command.
+        deps: tasks (functions or names) to run before this one,
+            concurrently when independent. Each is called without arguments,
+            at most once per invocation.
+        inputs: paths or glob patterns of the files this task reads.
+        outputs: paths or glob patterns of the files this task writes.
+            The task is skipped when all outputs exist, and are newer than all inputs.
+        hash_inputs: skip the task when all outputs exist, and the content of
+            inputs is unchanged since the last run, regardless of modification times.
+        cache_outputs: save outputs to the artifact store, and restore them
+            (rather than running the task) when the source, arguments,
+            inputs and `cache_env` of the task match a previous run.
+        cache_env: names of environment variables that affect the outputs.
 
     Returns:
         ...
@@ -143,10 +414,33 @@ def task(
         ... def say_goodbye(name):
         ...    print(f'Goodbye {name}.')
         ...
+        >>> @task(deps=[say_hello, 'say-goodbye'])  # doctest: +SKIP
+        ... def converse():
+        ...    print('...')
+        ...
+        >>> @task(inputs=['src/**/*.c'], outputs=['build/app'])  # doctest: +SKIP
+        ... def build():
+        ...    print('Building...')
+        ...
+        >>> @task  # doctest: +SKIP
+        ... async def deploy():
+        ...    await asyncio.gather(ash('kubectl apply -f a.yml'), ash('kubectl apply -f b.yml'))
+        ...
     """
 
     if not func:
-        return partial(task, name=name, parents=parents, root=root)
+        return partial(
+            task,
+            name=name,
+            parents=parents,
+            root=root,
+            deps=deps,
+            inputs=inputs,
+            outputs=outputs,
+            hash_inputs=hash_inputs,
+            cache_outputs=cache_outputs,
+            cache_env=cache_env,
+        )
 
     if root:
         name = ROOT_TASK_KEY
@@ -160,10 +454,48 @@ def task(
     elif not isinstance(parents, tuple):
         parents = tuple(parents)
 
+    async_func: Callable[..., Any] | None = None
+    if iscoroutinefunction(func) or isasyncgenfunction(func):
+        from .aio import wrap_async
+
+        async_func = func
+        func = wrap_async(func)
+
+    # each run of the task is recorded, with the usage of the processes it runs;
+    # wrapped first, so that runs skipped by `outputs` are not.
+    func = _wrap_task(func, name, parents)
+
+    if outputs and cache_outputs:
+        func = with_artifact_cache(
+            func,
+            name=name,
+            inputs=inputs,
+            outputs=outputs,
+            env=cache_env,
+        )
+
+    if outputs:
+        func = skip_if_up_to_date(
+            func,
+            name=name,
+            inputs=inputs,
+            outputs=outputs,
+            hash_inputs=hash_inputs,
+        )
+
+    # dependencies are run before checking whether outputs are up-to-date.
+    if deps:
+        func = _with_dependencies(func, deps)
+
     new_task: Task = Task(name=name, function=func, parents=parents)
 
     add_tasks(new_task)
 
+    if async_func is not None:
+        # e.g., for `@task(deps=[async_func])`.
+        setattr(async_func, SYNC_ATTR, func)
+        return async_func
+
     return func
 
 
@@ -173,11 +505,17 @@ def shell_task(
     name: str | None = None,
     parents: str | tuple[str] | None = None,
     root: bool | None = False,
+    deps: Sequence[Dependency] | None = None,
+    inputs: PathPatterns | None = None,
+    outputs: PathPatterns | None = None,
+    hash_inputs: bool = False,
+    cache_outputs: bool = False,
+    cache_env: Sequence[str] | None = None,
     capture_output: bool | None = False,
     echo: bool | None = True,
     check: bool | None = True,
     cwd: str | None = None,
-    env: dict[str, str] | None = None,
+    env: Mapping[str, str] | None = None,
     env_update: dict[str, str | None] | None = None,
     timeout: float | None = None,
     executable: str | None = None,
@@ -195,6 +533,12 @@ def shell_task(
         name: name of the command.
         parents: optional parents for the command.
         root: if True, import this as the root command.
+        deps: tasks (functions or names) to run before this one.
+        inputs: paths or glob patterns of the files this task reads.
+        outputs: paths or glob patterns of the files this task writes.
+        hash_inputs: compare the content of inputs, rather than modification times.
+        cache_outputs: save outputs to, and restore them from, the artifact store.
+        cache_env: names of environment variables that affect the outputs.
         capture_output: ...
         echo: ...
         check: ...
@@ -225,6 +569,12 @@ def shell_task(
             name=name,
             parents=parents,
             root=root,
+            deps=deps,
+            inputs=inputs,
+            outputs=outputs,
+            hash_inputs=hash_inputs,
+            cache_outputs=cache_outputs,
+            cache_env=cache_env,
             capture_output=capture_output,
             echo=echo,
             check=check,
@@ -261,4 +611,15 @@ def shell_task(
             executable=executable,
         )
 
-    return task(_inner_func, name=name, parents=parents, root=root)
+    return task(
+        _inner_func,
+        name=name,
+        parents=parents,
+        root=root,
+        deps=deps,
+        inputs=inputs,
+        outputs=outputs,
+        hash_inputs=hash_inputs,
+        cache_outputs=cache_outputs,
+        cache_env=cache_env,
+    )
@@ -0,0 +1,188 @@
+"""> Functions for skipping tasks whose outputs are up-to-date with their inputs.
+
+Declared with `@task(inputs=[...], outputs=[...])`. Like `make`, a task is skipped
+when all of its outputs exist, and none of its inputs are newer than its oldest output.
+With `hash_inputs=True`, a task is skipped when all of its outputs exist,
+and the content of its inputs is unchanged since the last successful run.
+"""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+from contextlib import suppress
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Sequence, Tuple, Union
+
+from .utils import _hash_text, get_cache_dir
+
+__all__ = ["expand_paths", "check_up_to_date", "skip_if_up_to_date"]
+
+PathPatterns = Union[str, Path, Sequence[Union[str, Path]]]
+
+# (up-to-date, reason)
+UpToDate = Tuple[bool, str]
+
+
+def expand_paths(patterns: PathPatterns | None) -> list[Path]:
+    """Expand the given paths and glob patterns, relative to the current directory.
+
+    Paths without glob characters are returned whether or not they exist.
+
+    Args:
+        patterns: ...
+
+    Returns:
+        ...
+
+    Examples:
+        >>> from myke.uptodate import expand_paths
+        ...
+        >>> [str(x) for x in expand_paths('build/out.txt')]
+        ['build/out.txt']
+    """
+    if not patterns:
+        return []
+
+    if isinstance(patterns, (str, Path)):
+        patterns = [patterns]
+
+    paths: dict[Path, None] = {}
+
+    for x in patterns:
+        x = str(x)
+        if glob.has_magic(x):
+            for match in sorted(glob.glob(x, recursive=True)):
+                paths[Path(match)] = None
+        else:
+            paths[Path(x)] = None
+
+    return list(paths)
+
+
+def _hash_inputs(paths: Sequence[Path]) -> str:
+    digest = hashlib.sha256()
+    for x in sorted(paths):
+        digest.update(str(x).encode() + b"\0")
+        with suppress(OSError):
+            digest.update(hashlib.sha256(x.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def _get_state_path(key: str) -> Path:
+    return get_cache_dir() / "uptodate" / (_hash_text(os.getcwd(), key)[:32] + ".json")
+
+
+def check_up_to_date(
+    key: str,
+    inputs: PathPatterns | None,
+    outputs: PathPatterns | None,
+    hash_inputs: bool = False,
+) -> UpToDate:
+    """Check whether the given outputs are up-to-date with the given inputs.
+
+    Args:
+        key: unique key of the task, used to store the hash of inputs.
+        inputs: ...
+        outputs: ...
+        hash_inputs: compare the content of inputs with the last successful run,
+            rather than the modification times of inputs and outputs.
+
+    Returns:
+        a tuple of (up-to-date, reason).
+    """
+    output_paths: list[Path] = expand_paths(outputs)
+    if not output_paths:
+        return False, "no outputs declared"
+
+    output_mtimes: list[float] = []
+    for x in output_paths:
+        try:
+            output_mtimes.append(x.stat().st_mtime)
+        except OSError:
+            return False, f"output does not exist: {x}"
+
+    input_paths: list[Path] = expand_paths(inputs)
+
+    if hash_inputs:
+        with suppress(OSError, ValueError):
+            state: dict[str, Any] = json.loads(_get_state_path(key).read_text())
+            if state.get("inputs") == _hash_inputs(input_paths):
+                return True, "inputs are unchanged since the last run"
+        return False, "inputs have changed since the last run"
+
+    oldest_output: float = min(output_mtimes)
+    for x in input_paths:
+        try:
+            if x.stat().st_mtime > oldest_output:
+                return False, f"input is newer than outputs: {x}"
+        except OSError:
+            return False, f"input does not exist: {x}"
+
+    return True, "outputs are newer than inputs"
+
+
+def _save_state(key: str, inputs_hash: str) -> None:
+    path: Path = _get_state_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path: Path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps({"key": key, "inputs": inputs_hash}))
+    tmp_path.replace(path)
+
+
+def skip_if_up_to_date(
+    func: Callable[..., Any],
+    name: str,
+    inputs: PathPatterns | None,
+    outputs: PathPatterns | None,
+    hash_inputs: bool = False,
+) -> Callable[..., Any]:
+    """Wrap the given task function to skip it when its outputs are up-to-date.
+
+    The decision, and its reason, is printed by `echo.verbose`.
+
+    Args:
+        func: ...
+        name: name of the task.
+        inputs: ...
+        outputs: ...
+        hash_inputs: ...
+
+    Returns:
+        ...
+    """
+    key: str = f"{func.__module__}.{func.__qualname__}\0{outputs!r}"
+
+    @wraps(func)
+    def _inner_func(*args: Any, **kwargs: Any) -> Any:
+        from .io.echo import echo
+
+        up_to_date, reason = check_up_to_date(
+            key,
+            inputs=inputs,
+            outputs=outputs,
+            hash_inputs=hash_inputs,
+        )
+
+        if up_to_date:
+            echo.verbose(f"{name}: skipped; {reason}.")
+            return None
+
+        echo.verbose(f"{name}: running; {reason}.")
+
+        # hash the inputs as they were when the task started.
+        inputs_hash: str | None = (
+            _hash_inputs(expand_paths(inputs)) if hash_inputs else None
+        )
+
+        result: Any = func(*args, **kwargs)
+
+        if inputs_hash is not None:
+            _save_state(key, inputs_hash)
+
+        return result
+
+    return _inner_func
@@ -0,0 +1,379 @@
+"""> Resource usage of the processes run by myke, e.g., with `myke.run`.
+
+The results of `myke.run`, `myke.sh`, and `myke.pipe` have a `usage` attribute,
+with the wall time, CPU time, and peak memory of the process, taken from `os.wait4`
+when the process is reaped. With `--myke-usage`, the usage of processes is
+summed per task, and printed when myke exits.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import threading
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from functools import wraps
+from inspect import isgeneratorfunction
+from time import perf_counter
+from typing import Any, Callable, Generator, Iterable, Iterator
+
+from .profiling import add_span, is_tracing
+
+__all__ = [
+    "ResourceUsage",
+    "TaskUsage",
+    "get_usage",
+    "measure",
+    "get_task_usage",
+    "wrap",
+    "enable",
+    "report",
+]
+
+
+class ResourceUsage:
+    """The resources used by one, or more, processes.
+
+    Attributes:
+        wall_time: seconds from start to exit.
+        user_time: seconds of CPU time in user mode.
+        system_time: seconds of CPU time in kernel mode.
+        max_rss: peak resident memory, in bytes. The memory of the process,
+            after it is forked from myke and before it runs the command, counts.
+    """
+
+    __slots__ = ("wall_time", "user_time", "system_time", "max_rss")
+
+    def __init__(
+        self,
+        wall_time: float,
+        user_time: float,
+        system_time: float,
+        max_rss: int,
+    ) -> None:
+        self.wall_time: float = wall_time
+        self.user_time: float = user_time
+        self.system_time: float = system_time
+        self.max_rss: int = max_rss
+
+    @property
+    def cpu_time(self) -> float:
+        return self.user_time + self.system_time
+
+    def __repr__(self) -> str:
+        return (
+            f"ResourceUsage(wall_time={self.wall_time:.3f},"
+            f" user_time={self.user_time:.3f}, system_time={self.system_time:.3f},"
+            f" max_rss={self.max_rss})"
+        )
+
+
+def combine(usages: Iterable[ResourceUsage | None]) -> ResourceUsage | None:
+    """Return the usage of processes run concurrently, e.g., the stages of a pipeline.
+
+    CPU times are summed; wall time and peak memory are the max of all processes.
+    """
+    found: list[ResourceUsage] = [x for x in usages if x is not None]
+    if not found:
+        return None
+
+    return ResourceUsage(
+        wall_time=max(x.wall_time for x in found),
+        user_time=sum(x.user_time for x in found),
+        system_time=sum(x.system_time for x in found),
+        max_rss=max(x.max_rss for x in found),
+    )
+
+
+# `ru_maxrss` is in kilobytes, except on macOS.
+_MAX_RSS_UNIT: int = 1 if sys.platform == "darwin" else 1024
+
+
+class _Popen(subprocess.Popen):  # type: ignore[type-arg]
+    """A `Popen` that reaps the process with `os.wait4`, to get its resource usage."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.usage: ResourceUsage | None = None
+        self._start_time: float = perf_counter()
+        self._thread: threading.Thread = threading.current_thread()
+        super().__init__(*args, **kwargs)
+
+    if hasattr(os, "wait4"):
+
+        def _try_wait(self, wait_flags: int) -> tuple[int, int]:
+            try:
+                pid, sts, rusage = os.wait4(self.pid, wait_flags)
+            except ChildProcessError:
+                # as in `Popen._try_wait`; the process was reaped elsewhere.
+                return self.pid, 0
+
+            if pid:
+                self.usage = ResourceUsage(
+                    wall_time=perf_counter() - self._start_time,
+                    user_time=rusage.ru_utime,
+                    system_time=rusage.ru_stime,
+                    max_rss=rusage.ru_maxrss * _MAX_RSS_UNIT,
+                )
+                if is_tracing():
+                    add_span(
+                        f"process: {self._get_program()}",
+                        start=self._start_time,
+                        duration=self.usage.wall_time,
+                        thread=self._thread,
+                        argv=(
+                            os.fsdecode(self.args)
+                            if isinstance(self.args, (str, bytes, os.PathLike))
+                            else [str(x) for x in self.args]
+                        ),
+                    )
+
+            return pid, sts
+
+    def _get_program(self) -> str:
+        if isinstance(self.args, (str, bytes, os.PathLike)):
+            return os.fsdecode(self.args).split(maxsplit=1)[0]
+        return os.path.basename(os.fsdecode(self.args[0]))
+
+
+def run_process(
+    *popenargs: Any,
+    input: bytes | str | None = None,  # pylint: disable=redefined-builtin
+    capture_output: bool = False,
+    timeout: float | None = None,
+    **kwargs: Any,
+) -> subprocess.CompletedProcess[Any]:
+    """Like `subprocess.run(..., check=False)`, with the `usage` of the process.
+
+    Returns:
+        ...
+    """
+    if input is not None:
+        kwargs["stdin"] = subprocess.PIPE
+
+    if capture_output:
+        kwargs["stdout"] = kwargs["stderr"] = subprocess.PIPE
+
+    with _Popen(*popenargs, **kwargs) as proc:
+        try:
+            stdout, stderr = proc.communicate(input, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            raise
+        except BaseException:
+            proc.kill()
+            raise
+
+    p: subprocess.CompletedProcess[Any] = subprocess.CompletedProcess(
+        proc.args,
+        returncode=proc.returncode,
+        stdout=stdout,
+        stderr=stderr,
+    )
+    attach(p, proc.usage)
+    return p
+
+
+def get_usage(p: subprocess.CompletedProcess[Any]) -> ResourceUsage | None:
+    """Return the resource usage of the given process, if known.
+
+    Usage is not known for processes run by `myke.arun`, `myke.Shell`,
+    or on platforms without `os.wait4` (e.g., Windows).
+
+    Args:
+        p: ...
+
+    Returns:
+        ...
+
+    Examples:
+        >>> import myke
+        >>> from myke.usage import get_usage
+        ...
+        >>> p = myke.run(["python", "-c", "print('Hello World.')"])
+        Hello World.
+        >>> get_usage(p).wall_time > 0
+        True
+    """
+    return getattr(p, "usage", None)
+
+
+class TaskUsage:
+    """The number of processes run by a task, and their total resource usage.
+
+    Wall and CPU times are summed; peak memory is the max of all processes.
+    """
+
+    __slots__ = ("count", "usage")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.usage: ResourceUsage | None = None
+
+    def add(self, usage: ResourceUsage) -> None:
+        self.count += 1
+        total: ResourceUsage | None = self.usage
+        self.usage = (
+            usage
+            if total is None
+            else ResourceUsage(
+                wall_time=total.wall_time + usage.wall_time,
+                user_time=total.user_time + usage.user_time,
+                system_time=total.system_time + usage.system_time,
+                max_rss=max(total.max_rss, usage.max_rss),
+            )
+        )
+
+
+# (name, usage) of the task being run, in this context.
+_TASK: ContextVar[tuple[str, TaskUsage] | None] = ContextVar(
+    "myke_usage_task",
+    default=None,
+)
+_TOTALS: dict[str | None, TaskUsage] = {}
+_LOCK: threading.Lock = threading.Lock()
+_ENABLED: list[bool] = []
+
+
+def attach(p: subprocess.CompletedProcess[Any], usage: ResourceUsage | None) -> None:
+    """Set the `usage` of the given process, and add it to the total of the current task."""
+    p.usage = usage  # type: ignore[attr-defined]
+    record(usage)
+
+
+def record(usage: ResourceUsage | None) -> None:
+    """Add the given usage to the current task, and to its total for `report()`."""
+    if usage is None:
+        return
+
+    task: tuple[str, TaskUsage] | None = _TASK.get()
+    if task is None and not _ENABLED:
+        return
+
+    with _LOCK:
+        if task is not None:
+            task[1].add(usage)
+        if _ENABLED:
+            name: str | None = None if task is None else task[0]
+            _TOTALS.setdefault(name, TaskUsage()).add(usage)
+
+
+@contextmanager
+def measure(name: str, task_usage: TaskUsage | None = None) -> Iterator[TaskUsage]:
+    """Count the processes run within this context towards the given task.
+
+    Args:
+        name: name of the task.
+        task_usage: add to this usage, e.g., across the setup and teardown
+            of a root task; by default, a new one.
+
+    Yields:
+        the usage of the processes run by the task.
+    """
+    if task_usage is None:
+        task_usage = TaskUsage()
+
+    token = _TASK.set((name, task_usage))
+    try:
+        yield task_usage
+    finally:
+        _TASK.reset(token)
+
+
+def get_task_usage() -> TaskUsage | None:
+    """Return the usage of the task being run, in this context, if any."""
+    task: tuple[str, TaskUsage] | None = _TASK.get()
+    return None if task is None else task[1]
+
+
+def wrap(func: Callable[..., Any], name: str) -> Callable[..., Any]:
+    """Wrap the given task function, to count the processes it runs towards it.
+
+    The setup and teardown of generator functions count as one run.
+
+    Args:
+        func: ...
+        name: name of the task.
+
+    Returns:
+        ...
+    """
+    if isgeneratorfunction(func):
+
+        @wraps(func)
+        def _wrapped_generator(*args: Any, **kwargs: Any) -> Generator[Any, None, Any]:
+            task_usage: TaskUsage = TaskUsage()
+            gen: Generator[Any, None, Any] = func(*args, **kwargs)
+
+            with measure(name, task_usage):
+                try:
+                    value: Any = next(gen)
+                except StopIteration as e:
+                    return e.value
+
+            yield value
+
+            with measure(name, task_usage), suppress(StopIteration):
+                while True:
+                    next(gen)
+
+        return _wrapped_generator
+
+    @wraps(func)
+    def _wrapped(*args: Any, **kwargs: Any) -> Any:
+        with measure(name):
+            return func(*args, **kwargs)
+
+    return _wrapped
+
+
+def enable() -> None:
+    """Sum the usage of processes per task, and print it upon the next call to `report()`."""
+    _ENABLED[:] = [True]
+
+
+def get_totals() -> dict[str | None, TaskUsage]:
+    """Return the number of processes, and their total usage, per task.
+
+    Returns:
+        ...
+    """
+    with _LOCK:
+        return dict(_TOTALS)
+
+
+def report() -> None:
+    """Print the usage of processes per task to stderr, if enabled by `enable()`."""
+    if not _ENABLED:
+        return
+
+    _ENABLED.clear()
+
+    totals: list[tuple[str | None, TaskUsage]] = sorted(
+        ((k, v) for k, v in get_totals().items() if v.usage is not None),
+        key=lambda x: x[1].usage.cpu_time,  # type: ignore[union-attr]
+        reverse=True,
+    )
+    if not totals:
+        return
+
+    from .io.echo import echo
+
+    echo.table(
+        [
+            {
+                "task": "(none)" if task is None else task,
+                "processes": x.count,
+                "wall (s)": x.usage.wall_time,
+                "user (s)": x.usage.user_time,
+                "sys (s)": x.usage.system_time,
+                "max rss (MiB)": x.usage.max_rss / (1024 * 1024),
+            }
+            for task, x in totals
+            if x.usage is not None
+        ],
+        print_kwargs={"file": sys.stderr},
+        floatfmt=".2f",
+    )
@@ -1,24 +1,54 @@
 from __future__ import annotations
 
+import hashlib
+import marshal
+import os
 import re
 import stat
+import sys
 from contextlib import suppress
+from functools import lru_cache
 from importlib.machinery import SourceFileLoader
+from importlib.util import MAGIC_NUMBER
 from pathlib import Path
 from shutil import which
 from subprocess import DEVNULL, CalledProcessError, CompletedProcess, run
+from types import CodeType
 from typing import Any
 
-from yapx.utils import convert_to_command_string
+from .globals import MYKE_VAR_NAME
 
 __all__ = [
     "convert_to_command_string",
     "make_executable",
     "is_version",
     "get_repo_root",
+    "get_cache_dir",
 ]
 
 
+def convert_to_command_string(text: str) -> str:
+    """Convert the given text to a command string, e.g., `say_hello` -> `say-hello`.
+
+    Equivalent to `yapx.utils.convert_to_command_string`.
+
+    Args:
+        text: ...
+
+    Returns:
+        ...
+
+    Examples:
+        >>> from myke.utils import convert_to_command_string
+        ...
+        >>> convert_to_command_string('say_hello')
+        'say-hello'
+    """
+    from yapx.utils import convert_to_command_string as _convert_to_command_string
+
+    return _convert_to_command_string(text)
+
+
 def split_and_trim_text(txt: str | None) -> list[str]:
     if txt is None:
         return []
@@ -99,6 +129,11 @@ def is_version(txt: str) -> bool:
 def get_repo_root(path: str | Path | None = None) -> Path | None:
     """Return the root a git repository.
 
+    The root is found by searching the given path and its parents for `.git`,
+    which is either a directory, or a file pointing to the git directory
+    (e.g., in a worktree or submodule). `git` is only invoked
+    for layouts that cannot be resolved this way. Results are memoized.
+
     Args:
         path: path to the git repo.
 
@@ -108,7 +143,7 @@ def get_repo_root(path: str | Path | None = None) -> Path | None:
 
 
     Raises:
-        FileNotFoundError: if `git` is not found.
+        FileNotFoundError: if `git` is required, but not found.
 
     Examples:
         >>> from myke.utils import get_repo_root
@@ -116,9 +151,6 @@ def get_repo_root(path: str | Path | None = None) -> Path | None:
         >>> get_repo_root('/my/git/repo/subdir')  # doctest: +SKIP
         Path('/my/git/repo')
     """
-    if not which("git"):
-        raise FileNotFoundError("git")
-
     if path is None:
         path = Path.cwd()
     else:
@@ -133,6 +165,52 @@ def get_repo_root(path: str | Path | None = None) -> Path | None:
         with suppress(ValueError):
             path = list(reversed(path.parents))[path.parts.index(".git") - 1]
 
+    if os.getenv("GIT_DIR") or os.getenv("GIT_WORK_TREE"):
+        return _get_repo_root_from_git(path)
+
+    return _find_repo_root(path.resolve())
+
+
+def _is_git_dir(path: Path) -> bool:
+    return (path / "HEAD").is_file()
+
+
+def _read_gitdir_file(path: Path) -> Path | None:
+    """Return the git directory referenced by a `.git` file, i.e., `gitdir: <path>`"""
+    with suppress(OSError, UnicodeDecodeError):
+        content: str = path.read_text(encoding="utf-8").strip()
+        prefix: str = "gitdir:"
+        if content.startswith(prefix):
+            return path.parent / content[len(prefix) :].strip()
+    return None
+
+
+@lru_cache(maxsize=None)
+def _find_repo_root(path: Path) -> Path | None:
+    for parent in (path, *path.parents):
+        dot_git: Path = parent / ".git"
+
+        git_dir: Path | None = None
+        if dot_git.is_dir():
+            git_dir = dot_git
+        elif dot_git.is_file():
+            git_dir = _read_gitdir_file(dot_git)
+        else:
+            continue
+
+        if git_dir is not None and _is_git_dir(git_dir):
+            return parent
+
+        # an exotic layout; let git figure it out.
+        return _get_repo_root_from_git(path)
+
+    return None
+
+
+def _get_repo_root_from_git(path: Path) -> Path | None:
+    if not which("git"):
+        raise FileNotFoundError("git")
+
     try:
         run(
             ["git", "status", "--porcelain"],
@@ -155,11 +233,94 @@ def get_repo_root(path: str | Path | None = None) -> Path | None:
     return Path(p.stdout.rstrip())
 
 
+def get_cache_dir() -> Path:
+    """Return the directory where myke caches data.
+
+    Defaults to `$XDG_CACHE_HOME/myke` (or `~/.cache/myke`),
+    and can be overridden with the `MYKE_CACHE_DIR` environment variable.
+
+    Returns:
+        ...
+
+    Examples:
+        >>> from myke.utils import get_cache_dir
+        ...
+        >>> get_cache_dir()  # doctest: +SKIP
+        Path('/home/user/.cache/myke')
+    """
+    cache_dir: str | None = os.getenv("MYKE_CACHE_DIR")
+    if cache_dir:
+        return Path(cache_dir)
+
+    xdg_cache_home: str | None = os.getenv("XDG_CACHE_HOME")
+    if xdg_cache_home:
+        return Path(xdg_cache_home) / MYKE_VAR_NAME
+
+    return Path.home() / ".cache" / MYKE_VAR_NAME
+
+
+def _hash_text(*args: Any) -> str:
+    return hashlib.sha256("\0".join(str(x) for x in args).encode()).hexdigest()
+
+
 class _MykeSourceFileLoader(SourceFileLoader):
-    """SourceFileLoader that does not output '__pycache__'"""
+    """SourceFileLoader that does not output '__pycache__'
+
+    Bytecode is instead cached in `get_cache_dir() / 'bytecode'`,
+    keyed by the absolute path, mtime, and size of the source file,
+    and the magic number of the interpreter.
+    """
 
     def _cache_bytecode(self, *args: Any, **kwargs: Any) -> None:
         raise NotImplementedError()
 
     def set_data(self, *args: Any, **kwargs: Any) -> None:
         raise NotImplementedError()
+
+    @staticmethod
+    def _get_bytecode_path(source_path: str) -> Path:
+        abs_path: str = os.path.abspath(source_path)
+        st: os.stat_result = os.stat(abs_path)
+        return (
+            get_cache_dir()
+            / "bytecode"
+            / (
+                _hash_text(abs_path)[:32]
+                + "-"
+                + _hash_text(st.st_mtime_ns, st.st_size, MAGIC_NUMBER.hex())[:32]
+                + ".pyc"
+            )
+        )
+
+    def get_code(self, fullname: str) -> CodeType:
+        source_path: str = self.get_filename(fullname)
+
+        bytecode_path: Path | None = None
+        with suppress(OSError):
+            bytecode_path = self._get_bytecode_path(source_path)
+            data: bytes = bytecode_path.read_bytes()
+            if data[: len(MAGIC_NUMBER)] == MAGIC_NUMBER:
+                with suppress(EOFError, ValueError, TypeError):
+                    code: Any = marshal.loads(data[len(MAGIC_NUMBER) :])
+                    if isinstance(code, CodeType):
+                        return code
+
+        code = self.source_to_code(self.get_data(source_path), source_path)
+
+        if bytecode_path is not None and not sys.dont_write_bytecode:
+            with suppress(OSError):
+                bytecode_path.parent.mkdir(parents=True, exist_ok=True)
+
+                # remove stale bytecode of previous versions of this file.
+                prefix: str = bytecode_path.name.split("-", maxsplit=1)[0]
+                for x in bytecode_path.parent.glob(prefix + "-*.pyc"):
+                    with suppress(OSError):
+                        x.unlink()
+
+                tmp_path: Path = bytecode_path.with_name(
+                    f"{bytecode_path.name}.{os.getpid()}.tmp",
+                )
+                tmp_path.write_bytes(MAGIC_NUMBER + marshal.dumps(code))
+                tmp_path.replace(bytecode_path)
+
+        return code
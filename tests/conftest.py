@@ -62,12 +62,18 @@ def _fixture_clean_dir(tmp_path: Path) -> Generator[None, None, None]:
     shutil.rmtree(tmp_path)
 
 
+@pytest.fixture(name="cache_dir", scope="session")
+def fixture_cache_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return tmp_path_factory.mktemp("myke-cache")
+
+
 @pytest.fixture(name="env", autouse=True)
-def _fixture_env() -> Generator[None, None, None]:
+def _fixture_env(cache_dir: Path) -> Generator[None, None, None]:
     env_og: dict[str, str] = os.environ.copy()
 
     os.environ.clear()
     os.environ.update({k: v for k, v in env_og.items() if not k.startswith("MYKE_")})
+    os.environ["MYKE_CACHE_DIR"] = str(cache_dir)
 
     yield
 
@@ -0,0 +1,128 @@
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Generator, List
+
+import pytest
+
+import myke
+from myke.artifacts import _write_atomic, get_artifact_store
+
+
+@pytest.fixture(name="tasks", autouse=True)
+def _fixture_tasks() -> Generator[None, None, None]:
+    myke.TASKS.clear()
+    yield
+    myke.TASKS.clear()
+
+
+@pytest.mark.usefixtures("clean_dir")
+def test_outputs_restored_from_store(tmp_path_factory: pytest.TempPathFactory):
+    # 1. ARRANGE
+    store: Path = tmp_path_factory.mktemp("store")
+    os.environ["MYKE_ARTIFACT_STORE"] = str(store)
+    os.environ["TARGET"] = "linux"
+
+    calls: List[str] = []
+    Path("main.c").write_text("int main() {}")
+
+    @myke.task(
+        inputs=["*.c"],
+        outputs=["build"],
+        cache_outputs=True,
+        cache_env=["TARGET"],
+    )
+    def build(flavor: str = "release"):
+        calls.append(flavor)
+        Path("build").mkdir(exist_ok=True)
+        Path("build", "app").write_text(f"{flavor} {os.environ['TARGET']}")
+        Path("build", "app").chmod(0o755)
+
+    # 2. ACT / 3. ASSERT
+    assert get_artifact_store() == store
+
+    build()
+    assert calls == ["release"]
+
+    shutil.rmtree("build")
+    build()
+    assert calls == ["release"]
+    assert Path("build", "app").read_text() == "release linux"
+    assert os.access(Path("build", "app"), os.X_OK)
+
+    shutil.rmtree("build")
+    build("debug")
+    assert calls == ["release", "debug"]
+
+    shutil.rmtree("build")
+    os.environ["TARGET"] = "darwin"
+    build()
+    assert calls == ["release", "debug", "release"]
+
+    shutil.rmtree("build")
+    Path("main.c").write_text("int main() { return 1; }")
+    build()
+    assert calls == ["release", "debug", "release", "release"]
+
+
+@pytest.mark.usefixtures("clean_dir")
+def test_tampered_store_not_restored(tmp_path_factory: pytest.TempPathFactory):
+    # 1. ARRANGE
+    store: Path = tmp_path_factory.mktemp("store")
+    os.environ["MYKE_ARTIFACT_STORE"] = str(store)
+    outside: Path = tmp_path_factory.mktemp("outside") / "evil"
+
+    calls: List[int] = []
+
+    @myke.task(outputs=["out.txt"], cache_outputs=True)
+    def build():
+        calls.append(1)
+        Path("out.txt").write_text("built")
+
+    build()
+    key_path: Path = next((store / "keys").rglob("*.json"))
+    manifest: Dict[str, Any] = json.loads(key_path.read_text())
+    entry: Dict[str, Any] = manifest["files"]["out.txt"]
+    object_path: Path = next((store / "objects").rglob(entry["sha256"]))
+
+    # 2. ACT / 3. ASSERT
+    for name in [str(outside), os.path.relpath(outside)]:
+        key_path.write_text(json.dumps({"files": {name: entry}}))
+        Path("out.txt").unlink()
+        build()
+        assert not outside.exists()
+
+    key_path.write_text(json.dumps({"files": {"Mykefile": entry}}))
+    Path("out.txt").unlink()
+    build()
+    assert not Path("Mykefile").exists()
+
+    key_path.write_text(json.dumps(manifest))
+    object_path.write_text("corrupted")
+    Path("out.txt").unlink()
+    build()
+    assert Path("out.txt").read_text() == "built"
+    assert len(calls) == 5
+
+    Path("out.txt").unlink()
+    build()
+    assert Path("out.txt").read_text() == "built"
+    assert len(calls) == 5
+
+
+def test_write_atomic_concurrent(tmp_path: Path):
+    # 1. ARRANGE
+    path: Path = tmp_path / "manifest.json"
+
+    def _write(i: int) -> None:
+        _write_atomic(path, lambda tmp: tmp.write_text(str(i % 10) * 4096))
+
+    # 2. ACT
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(_write, range(64)))
+
+    # 3. ASSERT
+    assert len(set(path.read_text())) == 1
+    assert [x.name for x in tmp_path.iterdir()] == ["manifest.json"]
@@ -0,0 +1,127 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Generator
+
+import pytest
+
+from myke import daemon
+
+pytestmark = pytest.mark.skipif(
+    not daemon.is_supported(),
+    reason="requires Unix sockets and fork",
+)
+
+
+@pytest.fixture(name="daemon_env")
+def fixture_daemon_env(tmp_path: Path) -> Generator[Dict[str, str], None, None]:
+    mykefile: Path = tmp_path / "Mykefile"
+    mykefile.write_text(
+        "import myke\n"
+        "print('importing Mykefile')\n"
+        "\n"
+        "@myke.task\n"
+        "def hello(name='world'):\n"
+        "    print('hello ' + name)\n"
+        "\n"
+        "@myke.task\n"
+        "def fail():\n"
+        "    raise SystemExit(3)\n",
+    )
+
+    src_dir: Path = Path(daemon.__file__).parent.parent
+
+    env: Dict[str, str] = {
+        **os.environ,
+        "MYKE_DAEMON_SOCKET": str(tmp_path / "myke.sock"),
+        "PYTHONPATH": str(src_dir),
+    }
+
+    p: subprocess.Popen = subprocess.Popen(
+        [sys.executable, "-m", "myke", "--myke-daemon"],
+        cwd=tmp_path,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        for _ in range(100):
+            if (tmp_path / "myke.sock").exists():
+                break
+            time.sleep(0.1)
+        else:
+            pytest.fail("daemon did not start")
+
+        yield env
+    finally:
+        p.terminate()
+        p.wait()
+
+
+def _run_client(env: Dict[str, str], *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-m", "myke", *args],
+        cwd=Path(env["MYKE_DAEMON_SOCKET"]).parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+
+def test_daemon(daemon_env: Dict[str, str]):
+    # 1. ACT
+    p_hello: subprocess.CompletedProcess = _run_client(
+        daemon_env, "hello", "--name", "you"
+    )
+    p_fail: subprocess.CompletedProcess = _run_client(daemon_env, "fail")
+
+    # 2. ASSERT
+    assert p_hello.returncode == 0
+    assert p_hello.stdout.strip() == "hello you"
+
+    assert p_fail.returncode == 3
+
+
+def test_daemon_stale(daemon_env: Dict[str, str]):
+    # 1. ARRANGE
+    mykefile: Path = Path(daemon_env["MYKE_DAEMON_SOCKET"]).parent / "Mykefile"
+    mykefile.write_text(mykefile.read_text().replace("hello ", "goodbye "))
+
+    # 2. ACT
+    p: subprocess.CompletedProcess = _run_client(daemon_env, "hello")
+
+    # 3. ASSERT
+    assert p.returncode == 0
+    assert p.stdout.splitlines() == ["importing Mykefile", "goodbye world"]
+
+
+def test_daemon_untrusted_socket(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    # 1. ARRANGE
+    socket_path: Path = tmp_path / "other.sock"
+    monkeypatch.setenv("MYKE_DAEMON_SOCKET", str(socket_path))
+    monkeypatch.delenv("MYKE_DAEMON", raising=False)
+
+    server: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(socket_path))
+    server.listen()
+    server.setblocking(False)
+
+    # 2. ACT / 3. ASSERT
+    try:
+        os.chmod(socket_path, 0o666)
+        assert daemon.forward(["hello"]) is None
+
+        os.chmod(socket_path, 0o600)
+        monkeypatch.setattr(daemon.os, "getuid", lambda: os.geteuid() + 1)
+        assert daemon.forward(["hello"]) is None
+
+        # nothing was sent to the listener.
+        with pytest.raises(BlockingIOError):
+            server.accept()
+    finally:
+        server.close()
@@ -0,0 +1,80 @@
+import os
+from pathlib import Path
+from typing import List, Optional
+
+import pytest
+
+from myke.discover import discover_tasks
+from myke.tasks import ROOT_TASK_KEY, Task
+
+
+def _discover(tmp_path: Path, content: str) -> Optional[List[Task]]:
+    mykefile: Path = tmp_path / "Mykefile"
+    mykefile.write_text(content)
+    return discover_tasks(mykefile)
+
+
+def test_discover_tasks(tmp_path: Path):
+    # 1. ARRANGE
+    content: str = '''
+import myke
+from myke import cmd, shell_task, task as my_task
+
+
+@my_task(root=True)
+def setup():
+    ...
+
+
+@myke.task
+def hello(name: str = "world", *, upper: bool = False) -> None:
+    """Say hello."""
+    raise RuntimeError("not executed")
+
+
+@shell_task(name="say-goodbye", parents=("parent", cmd(setup, name="other")))
+def goodbye(name="world"):
+    return f"echo goodbye {name}"
+
+
+def not_a_task():
+    ...
+'''
+
+    # 2. ACT
+    tasks: Optional[List[Task]] = _discover(tmp_path, content)
+
+    # 3. ASSERT
+    assert tasks is not None
+    assert [(x.name, x.parents) for x in tasks] == [
+        (ROOT_TASK_KEY, ()),
+        ("hello", ()),
+        ("say-goodbye", ("parent", "other")),
+    ]
+
+    hello_func = tasks[1].function
+    assert hello_func.__doc__ == "Say hello."
+    assert hello_func.__module__ == os.path.relpath(tmp_path / "Mykefile")
+    assert (
+        hello_func.signature == '(name: str = "world", *, upper: bool = False) -> None'
+    )
+
+    with pytest.raises(RuntimeError):
+        hello_func()
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "import myke\n\ndef hello():\n    ...\n\nmyke.add_tasks(hello)\n",
+        "from myke import task\n\nNAME = 'hi'\n\n@task(name=NAME)\ndef hello():\n    ...\n",
+        "from myke import task\n\n@task(**{'name': 'hi'})\ndef hello():\n    ...\n",
+        "from myke import import_mykefile\n\nimport_mykefile('other')\n",
+        "def hello():\n    ...\n",
+        # `task` is not from myke.
+        "from tasks import task\n\n@task\ndef hello():\n    ...\n",
+        "import tasks as myke\n\n@myke.task\ndef hello():\n    ...\n",
+    ],
+)
+def test_discover_tasks_dynamic(tmp_path: Path, content: str):
+    assert _discover(tmp_path, content) is None
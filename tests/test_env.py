@@ -0,0 +1,40 @@
+import os
+import subprocess
+
+import myke
+from myke.run import _prepare_env
+
+
+def test_env(monkeypatch):
+    # 1. ARRANGE
+    monkeypatch.setenv("MYKE_TEST_BASE", "base")
+    env: myke.Env = myke.Env(update={"MYKE_TEST_A": "a", "MYKE_TEST_BASE": None})
+
+    # 2. ACT
+    child: myke.Env = env.derive(MYKE_TEST_A="child", MYKE_TEST_B="b")
+    monkeypatch.setenv("MYKE_TEST_LATER", "later")
+
+    # 3. ASSERT
+    assert env["MYKE_TEST_A"] == "a"
+    assert "MYKE_TEST_B" not in env
+    assert "MYKE_TEST_BASE" not in env
+    assert "MYKE_TEST_LATER" not in env
+    assert env["PATH"] == os.environ["PATH"]
+
+    assert child["MYKE_TEST_A"] == "child"
+    assert child["MYKE_TEST_B"] == "b"
+    assert "MYKE_TEST_BASE" not in child
+
+    assert _prepare_env(env, None) is env.to_dict()
+    assert _prepare_env(env, {"MYKE_TEST_A": None}) == {
+        k: v for k, v in env.items() if k != "MYKE_TEST_A"
+    }
+
+    p: subprocess.CompletedProcess = myke.run(
+        'echo "$MYKE_TEST_A $MYKE_TEST_B"',
+        env=child,
+        capture_output=True,
+        echo=False,
+        text=True,
+    )
+    assert p.stdout == "child b\n"
@@ -0,0 +1,132 @@
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, Generator, List
+
+import pytest
+from _pytest.capture import CaptureFixture, CaptureResult
+
+import myke
+from myke import history
+
+
+@pytest.fixture(name="tasks", autouse=True)
+def _fixture_tasks() -> Generator[None, None, None]:
+    myke.TASKS.clear()
+    history.enable()
+    yield
+    history._ENABLED.clear()
+    myke.TASKS.clear()
+
+
+@pytest.mark.usefixtures("clean_dir")
+def test_history(capsys: CaptureFixture):
+    # 1. ARRANGE
+    history.enable()
+
+    @myke.task(parents="ci")
+    def build(fail: bool = False):
+        myke.run([sys.executable, "-c", "pass"])
+        if fail:
+            myke.run("exit 3")
+
+    # 2. ACT
+    for _ in range(20):
+        build()
+    build(fail=False)
+    with pytest.raises(subprocess.CalledProcessError):
+        build(fail=True)
+
+    runs: List[Dict[str, Any]] = history.get_runs()
+    history.report("ci build")
+
+    # 3. ASSERT
+    assert len(runs) == 22
+    assert {x["task"] for x in runs} == {"ci build"}
+    assert {x["parents"] for x in runs} == {"ci"}
+    assert [x["status"] for x in runs] == [0] * 21 + [3]
+    assert [x["processes"] for x in runs] == [1] * 21 + [2]
+    # `build()` and `build(fail=False)` are the same arguments.
+    assert len({x["args_hash"] for x in runs}) == 2
+    assert all(x["end"] >= x["start"] for x in runs)
+    assert all(x["max_rss"] > 0 for x in runs)
+
+    captured: CaptureResult = capsys.readouterr()
+    header, _, row = captured.out.splitlines()
+    assert header.split()[:3] == ["task", "runs", "failed"]
+    assert row.split()[:4] == ["ci", "build", "22", "5%"]
+    assert row.split()[-1].endswith("%")
+
+
+@pytest.mark.usefixtures("clean_dir")
+def test_history_project(tmp_path: Path):
+    # 1. ARRANGE
+    project: str = os.getcwd()
+    history.enable()
+    (tmp_path / "subdir").mkdir()
+
+    @myke.task
+    def build():
+        os.chdir(tmp_path / "subdir")
+
+    # 2. ACT
+    build()
+    connection: sqlite3.Connection = history._CONNECTION[0][2]
+    build()
+
+    # 3. ASSERT
+    runs: List[Dict[str, Any]] = history.get_runs()
+    assert [x["project"] for x in runs] == [project, project]
+    assert history._CONNECTION[0][2] is connection
+
+
+@pytest.mark.usefixtures("clean_dir")
+def test_history_add_tasks():
+    # 1. ARRANGE
+    history.enable()
+
+    def build():
+        myke.run([sys.executable, "-c", "pass"])
+
+    myke.add_tasks(build, ci=build)
+    myke.task(parents="ci")(build)
+
+    # 2. ACT
+    for x in myke.TASKS:
+        x.function()
+
+    # 3. ASSERT
+    runs: List[Dict[str, Any]] = history.get_runs()
+    assert [(x["task"], x["processes"]) for x in runs] == [
+        ("build", 1),
+        ("ci", 1),
+        ("ci build", 1),
+    ]
+
+
+@pytest.mark.usefixtures("clean_dir")
+def test_history_disabled(monkeypatch: pytest.MonkeyPatch, capsys: CaptureFixture):
+    # 1. ARRANGE
+    history._ENABLED.clear()
+    monkeypatch.setenv("MYKE_HISTORY", "0")
+    history.enable()
+
+    @myke.task
+    def build():
+        pass
+
+    # 2. ACT
+    build()
+    history.report()
+
+    # 3. ASSERT
+    assert not history.get_runs()
+    assert capsys.readouterr().out == "No runs recorded.\n"
+
+
+def test_percentile():
+    assert history._percentile([1.0], 90) == 1.0
+    assert history._percentile([1.0, 2.0, 3.0, 4.0, 5.0], 50) == 3.0
+    assert history._percentile([0.0, 10.0], 90) == 9.0
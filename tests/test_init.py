@@ -0,0 +1,70 @@
+import subprocess
+import sys
+from typing import Dict, List
+
+import pytest
+
+import myke
+
+
+def _import_times(statement: str) -> Dict[str, int]:
+    p: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # import time: self [us] | cumulative | imported package
+    times: Dict[str, int] = {}
+    for line in p.stderr.splitlines():
+        parts: List[str] = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            times[parts[2].strip()] = int(parts[1])
+    return times
+
+
+@pytest.mark.parametrize("module", ["myke", "myke.run"])
+def test_import_is_lazy(module: str):
+    times: Dict[str, int] = _import_times(f"import {module}")
+
+    assert module in times
+    assert "yapx" not in times
+    assert "myke.tasks" not in times
+
+
+def test_import_skips_heavy_modules():
+    # 1. ARRANGE
+    statement: str = "import sys, myke; print(*sys.modules)"
+
+    # 2. ACT
+    p: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # 3. ASSERT
+    modules: List[str] = p.stdout.split()
+    assert "myke" in modules
+    for x in ["yapx", "myke.main", "myke.run", "myke.tasks", "myke.io.echo"]:
+        assert x not in modules
+
+
+def test_lazy_exports():
+    for name in myke.__all__:
+        assert getattr(myke, name) is not None
+
+    from myke.main import sys as _  # noqa: F401
+
+    assert callable(myke.main)
+    assert callable(myke.run)
+
+
+def test_submodules_are_bound():
+    import myke.run
+    import myke.usage
+
+    assert myke.usage is sys.modules["myke.usage"]
+    assert myke.run is sys.modules["myke.run"].run
@@ -1,8 +1,12 @@
+import json
 import os
-from typing import List, Pattern
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Dict, List, Pattern, Set
 
 import mockish
 import pytest
+import yapx
 from _pytest.capture import CaptureFixture, CaptureResult
 
 import myke
@@ -74,3 +78,352 @@ def test_main_explain(capsys: CaptureFixture, resources_dir: str):
     assert captured.out
 
     assert expected.strip() == captured.out.strip()
+
+
+def test_main_list_tasks_from_manifest(capsys: CaptureFixture, tmp_path: Path):
+    # 1. ARRANGE
+    mykefile: Path = tmp_path / "Mykefile"
+    mykefile.write_text("import myke\n\n@myke.task\ndef listed_task():\n    ...\n")
+
+    args: List[str] = ["--myke-file", str(mykefile), "--myke-tasks"]
+
+    def _main() -> str:
+        myke.TASKS.clear()
+        with mockish.patch.object(target_sys, "argv", ["", *args]), pytest.raises(
+            SystemExit,
+        ) as e:
+            main()
+        assert e.value.code == 0
+        return capsys.readouterr().out
+
+    # 2. ACT
+    out_imported: str = _main()
+
+    with mockish.patch.object(
+        import_module("myke.main"),
+        "import_mykefile",
+        side_effect=AssertionError("expected cached manifest"),
+    ):
+        out_cached: str = _main()
+
+    mykefile.write_text("import myke\n\n@myke.task\ndef changed_task():\n    ...\n")
+    out_changed: str = _main()
+
+    # 3. ASSERT
+    assert "listed-task" in out_imported
+    assert out_cached == out_imported
+    assert "changed-task" in out_changed
+    assert "listed-task" not in out_changed
+
+    myke.TASKS.clear()
+
+
+def test_prune_subcommands():
+    # 1. ARRANGE
+    from myke.main import _prune_subcommands
+
+    def _cmd(name: str) -> yapx.Command:
+        return yapx.cmd(None, name=name)
+
+    parent, other_parent = _cmd("parent"), _cmd("other-parent")
+    subcommands = {
+        None: [_cmd("a"), _cmd("b")],
+        parent: [_cmd("c"), _cmd("d")],
+        other_parent: [_cmd("e")],
+    }
+
+    def _names(cmds) -> List[str]:
+        return [x.name for x in cmds]
+
+    # 2. ACT
+    pruned_leaf = _prune_subcommands(subcommands, ["--opt", "b", "--name", "x"])
+    pruned_child = _prune_subcommands(subcommands, ["parent", "d"])
+    pruned_help = _prune_subcommands(subcommands, ["--help"])
+
+    # 3. ASSERT
+    assert list(pruned_leaf) == [None]
+    assert _names(pruned_leaf[None]) == ["b"]
+
+    assert list(pruned_child) == [None, parent]
+    assert not pruned_child[None]
+    assert _names(pruned_child[parent]) == ["d"]
+
+    assert pruned_help is subcommands
+
+
+def test_main_fast_path(capsys: CaptureFixture, resources_dir: str):
+    # 1. ARRANGE
+    args: List[str] = ["hello", "--name", "fast"]
+
+    myke.TASKS.clear()
+    mykefile: str = os.path.join(resources_dir, "Mykefile")
+    myke.import_mykefile(mykefile)
+
+    # 2. ACT
+    with mockish.patch.object(target_sys, "argv", ["", *args]), mockish.patch.object(
+        yapx.ArgumentParser,
+        "parse_known_args_to_model",
+        side_effect=AssertionError("expected fast-path"),
+    ):
+        main(mykefile)
+
+    # 3. ASSERT
+    captured: CaptureResult = capsys.readouterr()
+    assert "hello fast" in captured.out
+
+    myke.TASKS.clear()
+
+
+def test_main_profile_startup(capsys: CaptureFixture, resources_dir: str):
+    # 1. ARRANGE
+    args: List[str] = ["--myke-profile-startup", "json", "hello", "--name", "fast"]
+
+    myke.TASKS.clear()
+    mykefile: str = os.path.join(resources_dir, "Mykefile")
+    myke.import_mykefile(mykefile)
+
+    # 2. ACT
+    with mockish.patch.object(target_sys, "argv", ["", *args]):
+        main(mykefile)
+
+    # 3. ASSERT
+    captured: CaptureResult = capsys.readouterr()
+    assert "hello fast" in captured.out
+
+    spans: List[Dict[str, Any]] = json.loads(captured.err)
+    names: List[str] = [x["name"] for x in spans]
+    assert "get_repo_root" in names
+    assert "dispatch" in names
+    assert "task: hello" in names
+    assert [x["total_ms"] for x in spans] == sorted(
+        [x["total_ms"] for x in spans],
+        reverse=True,
+    )
+
+    task_span: Dict[str, Any] = next(x for x in spans if x["name"] == "task: hello")
+    assert task_span["depth"] == 1
+
+    myke.TASKS.clear()
+
+
+def test_split_task_args():
+    from myke.main import _split_task_args
+
+    names: Set[str] = {"lint", "test", "build"}
+
+    assert _split_task_args(["lint"], names) == ([], [["lint"]])
+    assert _split_task_args(["lint", "build"], names) == ([], [["lint", "build"]])
+    assert _split_task_args(["test", "--name", "lint"], names) == (
+        [],
+        [["test", "--name", "lint"]],
+    )
+    assert _split_task_args(
+        ["--env", "prod", "lint", "+", "test", "--fast", "+"],
+        names,
+    ) == (["--env", "prod"], [["lint"], ["test", "--fast"]])
+
+
+def test_main_multiple_tasks(capsys: CaptureFixture, tmp_path: Path):
+    # 1. ARRANGE
+    mykefile: Path = tmp_path / "Mykefile"
+    mykefile.write_text(
+        "import threading\n"
+        "from myke import Context, task\n"
+        "\n"
+        "BARRIER = threading.Barrier(2, timeout=10)\n"
+        "\n"
+        "@task(root=True)\n"
+        "def setup(env: str = 'dev'):\n"
+        "    print('setup', env)\n"
+        "    yield env\n"
+        "    print('teardown')\n"
+        "\n"
+        "@task\n"
+        "def base():\n"
+        "    print('base')\n"
+        "\n"
+        "@task(deps=[base])\n"
+        "def lint(_context: Context):\n"
+        "    BARRIER.wait()\n"
+        "    print('lint', _context.relay_value)\n"
+        "\n"
+        "@task(deps=[base])\n"
+        "def test(_context: Context, fast: bool = False):\n"
+        "    BARRIER.wait()\n"
+        "    print('test', fast, _context.relay_value)\n",
+    )
+
+    myke.TASKS.clear()
+    myke.import_mykefile(str(mykefile))
+
+    args: List[str] = ["-j", "2", "--env", "prod", "lint", "+", "test", "--fast"]
+
+    # 2. ACT
+    with mockish.patch.object(target_sys, "argv", ["", *args]):
+        main(str(mykefile))
+
+    # 3. ASSERT
+    captured: CaptureResult = capsys.readouterr()
+    lines: List[str] = captured.out.splitlines()
+    assert lines[0] == "setup prod"
+    assert lines.count("base") == 1
+    assert "lint prod" in lines
+    assert "test True prod" in lines
+    assert lines[-1] == "teardown"
+
+    myke.TASKS.clear()
+
+
+def test_main_nested_task_names(capsys: CaptureFixture, tmp_path: Path):
+    # 1. ARRANGE
+    mykefile: Path = tmp_path / "Mykefile"
+    mykefile.write_text(
+        "from myke import task\n"
+        "\n"
+        "@task\n"
+        "def test():\n"
+        "    print('top test')\n"
+        "\n"
+        "@task(name='test', parents='db')\n"
+        "def db_test():\n"
+        "    print('db test')\n"
+        "\n"
+        "@task\n"
+        "def show(name: str):\n"
+        "    print('show', name)\n"
+        "\n"
+        "@task\n"
+        "def build():\n"
+        "    print('build')\n",
+    )
+
+    myke.TASKS.clear()
+    myke.import_mykefile(str(mykefile))
+
+    # 2. ACT
+    with mockish.patch.object(target_sys, "argv", ["", "db", "test"]):
+        main(str(mykefile))
+    nested: CaptureResult = capsys.readouterr()
+
+    with mockish.patch.object(
+        target_sys,
+        "argv",
+        ["", "show", "+", "build"],
+    ), pytest.raises(SystemExit) as e:
+        main(str(mykefile))
+    invalid: CaptureResult = capsys.readouterr()
+
+    # 3. ASSERT
+    assert nested.out.splitlines() == ["db test"]
+
+    assert e.value.code == 2
+    assert "build" not in invalid.out.splitlines()
+
+    myke.TASKS.clear()
+
+
+def test_main_usage(capsys: CaptureFixture, tmp_path: Path):
+    # 1. ARRANGE
+    mykefile: Path = tmp_path / "Mykefile"
+    mykefile.write_text(
+        "import sys\n"
+        "import myke\n"
+        "\n"
+        "@myke.task\n"
+        "def build():\n"
+        "    myke.run([sys.executable, '-c', 'bytearray(64 * 1024 * 1024)'])\n"
+        "    myke.run([sys.executable, '-c', 'pass'])\n",
+    )
+
+    myke.TASKS.clear()
+    myke.import_mykefile(str(mykefile))
+
+    # 2. ACT
+    with mockish.patch.object(target_sys, "argv", ["", "--myke-usage", "build"]):
+        main(str(mykefile))
+
+    # 3. ASSERT
+    captured: CaptureResult = capsys.readouterr()
+    header, _, row = captured.err.splitlines()
+    assert header.split()[:3] == ["task", "processes", "wall"]
+    assert row.split()[:2] == ["build", "2"]
+    assert float(row.split()[-1]) >= 64
+
+    myke.TASKS.clear()
+
+
+def test_main_trace(capsys: CaptureFixture, tmp_path: Path):
+    # 1. ARRANGE
+    mykefile: Path = tmp_path / "Mykefile"
+    mykefile.write_text(
+        "import sys\n"
+        "import threading\n"
+        "import myke\n"
+        "\n"
+        "BARRIER = threading.Barrier(2, timeout=10)\n"
+        "\n"
+        "@myke.task(root=True)\n"
+        "def setup():\n"
+        "    yield\n"
+        "\n"
+        "@myke.task\n"
+        "def lint():\n"
+        "    BARRIER.wait()\n"
+        "    myke.run([sys.executable, '-c', 'pass'])\n"
+        "\n"
+        "@myke.task\n"
+        "def test():\n"
+        "    BARRIER.wait()\n"
+        f"    myke.read.text({str(tmp_path / 'Mykefile')!r})\n",
+    )
+    trace_file: Path = tmp_path / "trace.json"
+
+    myke.TASKS.clear()
+    myke.import_mykefile(str(mykefile))
+
+    args: List[str] = ["--myke-trace", str(trace_file), "-j", "2", "lint", "+", "test"]
+
+    # 2. ACT
+    with mockish.patch.object(target_sys, "argv", ["", *args]):
+        main(str(mykefile))
+
+    # 3. ASSERT
+    events: List[Dict[str, Any]] = json.loads(trace_file.read_text())["traceEvents"]
+    spans: Dict[str, Dict[str, Any]] = {x["name"]: x for x in events if x["ph"] == "X"}
+
+    for name in (
+        "task: root (setup)",
+        "task: root (teardown)",
+        "task: lint",
+        "task: test",
+    ):
+        assert name in spans
+
+    assert spans["process: python"]["args"]["argv"][1:] == ["-c", "pass"]
+    assert spans["read.text"]["args"]["args"] == [str(mykefile)]
+    assert spans["task: lint"]["tid"] != spans["task: test"]["tid"]
+    assert spans["process: python"]["tid"] == spans["task: lint"]["tid"]
+
+    thread_names: Dict[int, str] = {
+        x["tid"]: x["args"]["name"] for x in events if x["ph"] == "M"
+    }
+    assert thread_names[spans["task: lint"]["tid"]].startswith("myke")
+
+    myke.TASKS.clear()
+
+
+def test_main_invalid_jobs(capsys: CaptureFixture, monkeypatch: pytest.MonkeyPatch):
+    # 1. ARRANGE
+    monkeypatch.setenv("MYKE_JOBS", "many")
+
+    # 2. ACT
+    with mockish.patch.object(target_sys, "argv", [""]), pytest.raises(
+        SystemExit,
+    ) as e:
+        main()
+
+    # 3. ASSERT
+    assert e.value.code == 2
+
+    captured: CaptureResult = capsys.readouterr()
+    assert "MYKE_JOBS must be an integer, not: 'many'" in captured.err
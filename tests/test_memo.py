@@ -0,0 +1,136 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import mockish
+import pytest
+from _pytest.capture import CaptureFixture, CaptureResult
+
+import myke
+from myke.main import main
+from myke.main import sys as target_sys
+from myke.memo import _get_function_dir, _hash_arguments, _hash_source, get_memo_dir
+
+
+def test_persistent_cache():
+    # 1. ARRANGE
+    calls: List[int] = []
+
+    @myke.persistent_cache
+    def square(x: int, offset: int = 0) -> int:
+        calls.append(x)
+        return x * x + offset
+
+    square.cache_clear()
+
+    # 2. ACT / 3. ASSERT
+    assert square(3) == 9
+    assert square(3) == 9
+    assert square(x=3, offset=0) == 9
+    assert square(3, offset=1) == 10
+    assert calls == [3, 3]
+
+    square.cache_clear()
+    assert square(3) == 9
+    assert calls == [3, 3, 3]
+
+
+def test_hash_arguments_stable_across_processes():
+    # 1. ARRANGE
+    statement: str = (
+        "from myke.memo import _hash_arguments;"
+        " print(_hash_arguments([('tags', {'a', 'b', 'c', frozenset({'d', 'e'})})]))"
+    )
+
+    # 2. ACT
+    hashes: List[str] = [
+        subprocess.run(
+            [sys.executable, "-c", statement],
+            env={**os.environ, "PYTHONHASHSEED": str(seed)},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        for seed in range(4)
+    ]
+
+    # 3. ASSERT
+    assert len(set(hashes)) == 1
+    assert hashes[0] == _hash_arguments([("tags", {"c", "b", "a", frozenset("ed")})])
+    assert hashes[0] != _hash_arguments([("tags", ["a", "b", "c", ["d", "e"]])])
+
+
+def test_hash_source_builtin():
+    assert _hash_source(len) != _hash_source(print)
+
+
+def test_persistent_cache_ttl():
+    # 1. ARRANGE
+    calls: List[str] = []
+
+    @myke.persistent_cache(ttl=60)
+    def lookup(name: str) -> str:
+        calls.append(name)
+        return name.upper()
+
+    lookup.cache_clear()
+
+    # 2. ACT / 3. ASSERT
+    assert lookup("a") == "A"
+    assert lookup("a") == "A"
+    assert calls == ["a"]
+
+    with mockish.patch.object(time, "time", return_value=time.time() + 120):
+        assert lookup("a") == "A"
+    assert calls == ["a", "a"]
+
+
+def test_persistent_cache_lru():
+    # 1. ARRANGE
+    calls: List[int] = []
+
+    @myke.persistent_cache(max_size=2000)
+    def payload(x: int) -> bytes:
+        calls.append(x)
+        return bytes(900)
+
+    payload.cache_clear()
+
+    # 2. ACT
+    payload(1)
+    time.sleep(0.01)
+    payload(2)
+    time.sleep(0.01)
+    payload(1)  # hit; `1` is now the most-recently used.
+    time.sleep(0.01)
+    payload(3)  # evicts `2`.
+
+    # 3. ASSERT
+    assert len(list(_get_function_dir(payload).glob("*.pkl"))) == 2
+    payload(1)
+    payload(3)
+    assert calls == [1, 2, 3]
+    payload(2)
+    assert calls == [1, 2, 3, 2]
+
+
+def test_main_clear_cache(capsys: CaptureFixture):
+    # 1. ARRANGE
+    memo_dir: Path = get_memo_dir()
+    memo_dir.mkdir(parents=True, exist_ok=True)
+
+    # 2. ACT
+    with mockish.patch.object(
+        target_sys,
+        "argv",
+        ["", "--myke-clear-cache"],
+    ), pytest.raises(SystemExit):
+        main()
+
+    # 3. ASSERT
+    captured: CaptureResult = capsys.readouterr()
+    assert f"Cleared: {memo_dir}" in captured.out
+    assert not memo_dir.exists()
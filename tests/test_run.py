@@ -1,10 +1,17 @@
+import asyncio
+import io
 import subprocess
-from typing import List
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List
 
 import pytest
 from _pytest.capture import CaptureFixture, CaptureResult
 
 import myke
+from myke import usage
+from myke.run import CompletedPipeline
+from myke.usage import ResourceUsage, get_usage
 
 
 def test_run(capfd: CaptureFixture):
@@ -114,3 +121,233 @@ def test_require(capfd: CaptureFixture):
 
     assert p.returncode == 0
     assert not p.stderr
+
+
+def test_arun(capfd: CaptureFixture):
+    # 1. ARRANGE
+    async def _run_all() -> List[subprocess.CompletedProcess]:
+        return await asyncio.gather(
+            myke.arun(["python", "-c", "print('hello')"], capture_output=True),
+            myke.ash("echo world >&2", capture_output=True, text=True, echo=False),
+            myke.ash("cat", input="stdin", capture_output=True, text=True),
+            myke.ash("exit 3", check=False),
+        )
+
+    # 2. ACT
+    results: List[subprocess.CompletedProcess] = asyncio.run(_run_all())
+
+    # 3. ASSERT
+    assert results[0].stdout.rstrip() == b"hello"
+    assert results[1].stderr.rstrip() == "world"
+    assert results[2].stdout == "stdin"
+    assert results[3].returncode == 3
+
+    captured: CaptureResult = capfd.readouterr()
+    assert "hello" in captured.out
+    assert "world" not in captured.out
+
+    with pytest.raises(subprocess.CalledProcessError):
+        asyncio.run(myke.ash("exit 1"))
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(myke.ash("sleep 5", timeout=0.1))
+
+
+def test_run_iter_lines(tmp_path: Path):
+    # 1. ARRANGE
+    marker: Path = tmp_path / "marker"
+    cmd: str = f"echo '  a  '; echo; echo b; touch {marker}; echo err >&2; exit 2"
+
+    # 2. ACT
+    lines: Iterator[str] = myke.sh_iter_lines(cmd)
+
+    # 3. ASSERT
+    assert next(lines) == "a"
+    assert next(lines) == "b"
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        next(lines)
+    assert e.value.returncode == 2
+    assert e.value.stderr == "err\n"
+    assert marker.exists()
+
+    assert list(myke.sh_iter_lines(cmd, check=False)) == ["a", "b"]
+
+    endless: Iterator[str] = myke.run_iter_lines(["yes"])
+    assert next(endless) == "y"
+    endless.close()
+
+
+def test_run_capture_echo_streams(tmp_path: Path, capfd: CaptureFixture):
+    # 1. ARRANGE
+    # the process waits for its first line to be seen, before printing the rest.
+    seen: Path = tmp_path / "seen"
+    script: str = (
+        "import os, sys, time\n"
+        "print('first', flush=True)\n"
+        "for _ in range(100):\n"
+        f"    if os.path.exists({str(seen)!r}):\n"
+        "        break\n"
+        "    time.sleep(0.05)\n"
+        "else:\n"
+        "    print('not streamed', file=sys.stderr)\n"
+        "print('second' * 10)\n"
+    )
+
+    class _Terminal(io.StringIO):
+        def write(self, s: str) -> int:
+            if "first" in s:
+                seen.touch()
+            return super().write(s)
+
+    terminal: _Terminal = _Terminal()
+
+    # 2. ACT
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(sys, "stdout", terminal)
+        p: subprocess.CompletedProcess = myke.run(
+            ["python", "-c", script],
+            capture_output=True,
+            text=True,
+        )
+
+    # 3. ASSERT
+    assert seen.exists()
+    assert terminal.getvalue() == p.stdout
+    assert p.stdout == "first\n" + "second" * 10 + "\n"
+    assert not p.stderr
+
+    tail: subprocess.CompletedProcess = myke.run(
+        ["python", "-c", "print('x' * 1000 + 'end')"],
+        capture_output=True,
+        capture_tail=4,
+    )
+    assert tail.stdout == b"end\n"
+    assert capfd.readouterr().out == "x" * 1000 + "end\n"
+
+
+def test_pipe(capfd: CaptureFixture):
+    # 1. ARRANGE
+    words: str = "b\na\nb\n"
+
+    # 2. ACT
+    p: CompletedPipeline = myke.pipe(
+        ["cat"],
+        "sort",
+        ["uniq", "-c"],
+        input=words,
+        capture_output=True,
+        text=True,
+    )
+
+    # 3. ASSERT
+    assert p.returncodes == [0, 0, 0]
+    assert p.stdout.split() == ["1", "a", "2", "b"]
+    assert capfd.readouterr().out == p.stdout
+
+    head: CompletedPipeline = myke.pipe(
+        ["yes"],
+        ["head", "-n", "2"],
+        capture_output=True,
+        echo=False,
+    )
+    assert head.returncode == 0
+    assert head.returncodes[0] != 0
+    assert head.stdout == b"y\ny\n"
+
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        myke.pipe(["sh", "-c", "echo err >&2; exit 3"], ["cat"], capture_output=True)
+    assert e.value.returncode == 3
+    assert e.value.cmd == ["sh", "-c", "echo err >&2; exit 3"]
+    assert e.value.stderr == b"err\n"
+
+    failed: CompletedPipeline = myke.pipe(
+        ["true"],
+        ["sh", "-c", "exit 4"],
+        check=False,
+    )
+    assert failed.returncodes == [0, 4]
+    assert failed.returncode == 4
+
+
+def test_run_many(capfd: CaptureFixture):
+    # 1. ARRANGE
+    commands: Dict[str, str] = {
+        "first": "sleep 0.2; echo one",
+        "second": "echo two; echo err >&2",
+    }
+
+    # 2. ACT
+    results: List[subprocess.CompletedProcess] = myke.run_many(
+        commands,
+        max_workers=2,
+        prefix=True,
+        capture_output=True,
+        text=True,
+    )
+
+    # 3. ASSERT
+    assert [x.stdout for x in results] == ["one\n", "two\n"]
+    assert results[1].stderr == "err\n"
+
+    captured: CaptureResult = capfd.readouterr()
+    assert captured.out.splitlines() == ["[second] two", "[first] one"]
+    assert captured.err.splitlines() == ["[second] err"]
+
+
+def test_run_many_fail_fast(tmp_path: Path):
+    # 1. ARRANGE
+    marker: Path = tmp_path / "marker"
+    commands: List[str] = ["exit 3", f"touch {marker}"]
+
+    # 2. ACT / 3. ASSERT
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        myke.run_many(commands, max_workers=1, echo=False)
+    assert e.value.returncode == 3
+    assert not marker.exists()
+
+    with pytest.raises(subprocess.CalledProcessError):
+        myke.run_many(commands, max_workers=1, fail_fast=False, echo=False)
+    assert marker.exists()
+
+    results: List[subprocess.CompletedProcess] = myke.run_many(
+        commands,
+        check=False,
+        echo=False,
+    )
+    assert [x.returncode for x in results] == [3, 0]
+
+
+def test_run_usage():
+    # 1. ARRANGE
+    script: str = "import time; bytearray(32 * 1024 * 1024); time.sleep(0.1)"
+
+    # 2. ACT
+    p: subprocess.CompletedProcess = myke.run(["python", "-c", script], echo=False)
+    streamed: subprocess.CompletedProcess = myke.run(
+        ["python", "-c", script],
+        capture_output=True,
+    )
+    piped: CompletedPipeline = myke.pipe(["python", "-c", script], ["cat"])
+
+    # 3. ASSERT
+    for x in p, streamed, piped:
+        usage: ResourceUsage = get_usage(x)
+        assert usage.wall_time >= 0.1
+        assert usage.user_time + usage.system_time > 0
+        assert usage.max_rss >= 32 * 1024 * 1024
+
+
+def test_run_many_usage(monkeypatch: pytest.MonkeyPatch):
+    # 1. ARRANGE
+    monkeypatch.setattr(usage, "_ENABLED", [True])
+    monkeypatch.setattr(usage, "_TOTALS", {})
+    commands: List[List[str]] = [[sys.executable, "-c", "pass"]] * 3
+
+    # 2. ACT
+    with usage.measure("fan") as task_usage:
+        myke.run_many(commands, max_workers=3, echo=False)
+
+    # 3. ASSERT
+    assert task_usage.count == 3
+    assert usage.get_totals()["fan"].count == 3
+    assert None not in usage.get_totals()
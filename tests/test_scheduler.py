@@ -0,0 +1,112 @@
+import threading
+from typing import Generator, List
+
+import pytest
+
+import myke
+from myke.exceptions import DependencyCycleError, TaskNotFoundError
+from myke.scheduler import get_graph, set_jobs
+
+
+@pytest.fixture(name="tasks", autouse=True)
+def _fixture_tasks() -> Generator[None, None, None]:
+    myke.TASKS.clear()
+    yield
+    myke.TASKS.clear()
+    set_jobs(None)
+
+
+def test_deps_run_once_in_order():
+    # 1. ARRANGE
+    calls: List[str] = []
+    set_jobs(4)
+
+    @myke.task
+    def compile_a():
+        calls.append("compile-a")
+
+    @myke.task(deps=[compile_a])
+    def compile_b():
+        calls.append("compile-b")
+
+    @myke.task(deps=[compile_a, "compile-b"])
+    def link():
+        calls.append("link")
+
+    @myke.task(deps=[link, compile_a])
+    def package(name: str = "pkg"):
+        calls.append(name)
+
+    # 2. ACT
+    package("out")
+
+    # 3. ASSERT
+    assert calls == ["compile-a", "compile-b", "link", "out"]
+    assert list(get_graph(package)) == [compile_a, compile_b, link, package]
+
+
+def test_deps_run_concurrently():
+    # 1. ARRANGE
+    set_jobs(2)
+    barrier: threading.Barrier = threading.Barrier(2, timeout=10)
+
+    @myke.task
+    def left():
+        barrier.wait()
+
+    @myke.task
+    def right():
+        barrier.wait()
+
+    @myke.task(deps=[left, right])
+    def both():
+        return "done"
+
+    # 2. ACT / 3. ASSERT
+    assert both() == "done"
+
+
+def test_deps_fail_fast():
+    # 1. ARRANGE
+    set_jobs(1)
+    calls: List[str] = []
+
+    @myke.task
+    def broken():
+        raise RuntimeError("broken")
+
+    @myke.task(deps=[broken])
+    def after():
+        calls.append("after")
+
+    @myke.task(deps=[broken, after])
+    def final():
+        calls.append("final")
+
+    # 2. ACT / 3. ASSERT
+    with pytest.raises(RuntimeError, match="broken"):
+        final()
+
+    assert not calls
+
+
+def test_deps_errors():
+    # 1. ARRANGE
+    @myke.task(deps=["cycle-b"])
+    def cycle_a():
+        ...
+
+    @myke.task(deps=[cycle_a])
+    def cycle_b():
+        ...
+
+    @myke.task(deps=["does-not-exist"])
+    def missing():
+        ...
+
+    # 2. ACT / 3. ASSERT
+    with pytest.raises(DependencyCycleError, match="cycle-a -> cycle-b -> cycle-a"):
+        cycle_a()
+
+    with pytest.raises(TaskNotFoundError):
+        missing()
@@ -0,0 +1,68 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+from _pytest.capture import CaptureFixture, CaptureResult
+
+import myke
+from myke.exceptions import ShellExitedError
+
+
+def test_shell(tmp_path: Path, capfd: CaptureFixture):
+    # 1. ARRANGE
+    shell: myke.Shell = myke.Shell(env_update={"MYKE_TEST": "env"})
+
+    # 2. ACT
+    with shell:
+        shell.run(f"cd {tmp_path} && export MYKE_TEST_EXPORT=exported")
+        echoed: subprocess.CompletedProcess = shell.run(
+            'echo "$MYKE_TEST $MYKE_TEST_EXPORT"; echo err >&2',
+        )
+        captured_output: subprocess.CompletedProcess = shell.run(
+            "pwd; printf no-newline; printf err >&2",
+            capture_output=True,
+            echo=False,
+            text=True,
+        )
+        failed: subprocess.CompletedProcess = shell.run("(exit 3)", check=False)
+        with pytest.raises(subprocess.CalledProcessError) as e:
+            shell.run("false")
+
+    # 3. ASSERT
+    assert echoed.returncode == 0
+    assert echoed.stdout is None
+
+    captured: CaptureResult = capfd.readouterr()
+    assert captured.out == "env exported\n"
+    assert captured.err == "err\n"
+
+    assert captured_output.stdout == f"{tmp_path}\nno-newline"
+    assert captured_output.stderr == "err"
+
+    assert failed.returncode == 3
+    assert e.value.returncode == 1
+
+    with pytest.raises(ShellExitedError):
+        shell.run("true")
+
+
+def test_shell_exit():
+    # 1. ARRANGE
+    shell: myke.Shell = myke.Shell()
+
+    # 2. ACT
+    p: subprocess.CompletedProcess = shell.run(
+        "echo bye; exit 4",
+        capture_output=True,
+        check=False,
+    )
+
+    # 3. ASSERT
+    assert p.returncode == 4
+    assert p.stdout == b"bye\n"
+
+    with pytest.raises(ShellExitedError):
+        shell.run("true")
+
+    with pytest.raises(subprocess.TimeoutExpired), myke.Shell() as slow:
+        slow.run("sleep 5", timeout=0.1)
@@ -0,0 +1,192 @@
+import asyncio
+import gc
+import sys
+import tracemalloc
+from typing import Any, List
+
+import pytest
+
+import myke
+from myke import usage
+from myke.exceptions import TaskAlreadyRegisteredError
+from myke.tasks import ROOT_TASK_KEY, Task, TaskRegistry
+
+
+def _noop() -> None:
+    ...
+
+
+def test_task_registry():
+    # 1. ARRANGE
+    tasks: List[Task] = [
+        Task(ROOT_TASK_KEY, _noop),
+        Task("hello", _noop),
+        Task("hello", _noop, parents=("parent",)),
+        Task("goodbye", _noop, parents=(myke.cmd(_noop, name="parent"),)),
+    ]
+
+    # 2. ACT
+    registry: TaskRegistry = TaskRegistry(tasks)
+
+    # 3. ASSERT
+    assert list(registry) == tasks
+    assert len(registry) == 4
+    assert registry[1:] == tasks[1:]
+    assert registry.root is tasks[0]
+    assert registry.get("hello") is tasks[1]
+    assert registry.get("hello", parents=("parent",)) is tasks[2]
+    assert registry.get("goodbye", parents=("parent",)) is tasks[3]
+    assert registry.get("goodbye") is None
+    assert registry.find("goodbye") is tasks[3]
+    assert registry.tree[()] == tasks[:2]
+    assert registry.tree[("parent",)] == [tasks[2]]
+
+    registry.clear()
+    assert not registry
+    assert registry.root is None
+
+
+def test_task_registry_duplicate():
+    registry: TaskRegistry = TaskRegistry([Task("hello", _noop)])
+
+    with pytest.raises(TaskAlreadyRegisteredError):
+        registry.append(Task("hello", print))
+
+    with pytest.raises(TaskAlreadyRegisteredError):
+        registry.extend([Task("goodbye", _noop), Task("goodbye", print)])
+
+    assert [x.name for x in registry] == ["hello"]
+
+
+def test_task_already_registered():
+    myke.TASKS.clear()
+
+    myke.task(_noop)
+    with pytest.raises(TaskAlreadyRegisteredError):
+        myke.task(name="noop")(print)
+
+    myke.TASKS.clear()
+
+
+def test_task_registry_memory():
+    """Check the memory overhead of each registered task."""
+    # 1. ARRANGE
+    n_tasks: int = 10_000
+    names: List[str] = [f"task-{i}" for i in range(n_tasks)]
+    gc.collect()
+    tracemalloc.start()
+
+    # 2. ACT
+    try:
+        registry: TaskRegistry = TaskRegistry(
+            Task(x, _noop, parents=("generated", f"group-{i % 10}"))
+            for i, x in enumerate(names)
+        )
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # 3. ASSERT
+    bytes_per_task: float = size / n_tasks
+
+    assert len(registry) == n_tasks
+    assert len({id(x.parents) for x in registry}) == 10
+    assert bytes_per_task < 512
+
+
+def test_async_tasks():
+    # 1. ARRANGE
+    myke.TASKS.clear()
+    events: List[str] = []
+
+    @myke.task(root=True)
+    async def setup():
+        loop = asyncio.get_running_loop()
+        events.append("setup")
+        yield loop
+        events.append("teardown")
+
+    @myke.task
+    async def hello(loop: Any = None) -> str:
+        await asyncio.sleep(0)
+        assert loop is None or loop is asyncio.get_running_loop()
+        events.append("hello")
+        return "hello"
+
+    # 2. ACT
+    root = myke.TASKS.root.function()
+    loop = next(root)
+    result: str = myke.TASKS.find("hello").function(loop)
+    with pytest.raises(StopIteration):
+        next(root)
+
+    # 3. ASSERT
+    assert result == "hello"
+    assert events == ["setup", "hello", "teardown"]
+    assert asyncio.iscoroutinefunction(hello)
+
+    myke.TASKS.clear()
+
+
+def test_async_tasks_awaitable():
+    # 1. ARRANGE
+    myke.TASKS.clear()
+    events: List[str] = []
+
+    @myke.task
+    async def ping(started: asyncio.Event, other: asyncio.Event) -> str:
+        started.set()
+        # only completes if the other task runs concurrently.
+        await asyncio.wait_for(other.wait(), timeout=10)
+        return "ping"
+
+    @myke.task
+    async def build() -> None:
+        events.append("build")
+
+    @myke.task(deps=[build])
+    async def deploy() -> None:
+        events.append("deploy")
+
+    async def _gather() -> List[str]:
+        a, b = asyncio.Event(), asyncio.Event()
+        return await asyncio.gather(ping(a, b), ping(b, a))
+
+    # 2. ACT
+    results: List[str] = asyncio.run(_gather())
+    myke.TASKS.find("deploy").function()
+
+    # 3. ASSERT
+    assert results == ["ping", "ping"]
+    assert events == ["build", "deploy"]
+
+    myke.TASKS.clear()
+
+
+def test_add_tasks_usage(monkeypatch: pytest.MonkeyPatch):
+    # 1. ARRANGE
+    myke.TASKS.clear()
+    monkeypatch.setattr(usage, "_ENABLED", [True])
+    monkeypatch.setattr(usage, "_TOTALS", {})
+
+    def build() -> None:
+        myke.run([sys.executable, "-c", "pass"], echo=False)
+
+    def lint() -> None:
+        myke.run([sys.executable, "-c", "pass"], echo=False)
+
+    myke.add_tasks(build, ci=lint)
+    myke.task(parents="ci")(lint)
+
+    # 2. ACT
+    for x in myke.TASKS:
+        x.function()
+
+    # 3. ASSERT
+    assert {k: v.count for k, v in usage.get_totals().items()} == {
+        "build": 1,
+        "ci": 1,
+        "ci lint": 1,
+    }
+
+    myke.TASKS.clear()
@@ -0,0 +1,78 @@
+import os
+from pathlib import Path
+from typing import Generator, List
+
+import pytest
+from _pytest.capture import CaptureFixture, CaptureResult
+
+import myke
+
+
+@pytest.fixture(name="tasks", autouse=True)
+def _fixture_tasks() -> Generator[None, None, None]:
+    myke.TASKS.clear()
+    yield
+    myke.TASKS.clear()
+
+
+def _set_mtime(path: Path, mtime: float) -> None:
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.mark.usefixtures("clean_dir")
+def test_task_skipped_when_outputs_newer(capsys: CaptureFixture):
+    # 1. ARRANGE
+    os.environ["MYKE_VERBOSE"] = "1"
+    calls: List[str] = []
+
+    Path("src").mkdir()
+    Path("src", "a.txt").write_text("a")
+
+    @myke.task(inputs=["src/*.txt"], outputs="out.txt")
+    def build():
+        calls.append("build")
+        Path("out.txt").write_text("out")
+
+    # 2. ACT / 3. ASSERT
+    build()
+    assert calls == ["build"]
+
+    _set_mtime(Path("src", "a.txt"), 1_000_000)
+    _set_mtime(Path("out.txt"), 2_000_000)
+    build()
+    assert calls == ["build"]
+
+    _set_mtime(Path("src", "a.txt"), 3_000_000)
+    build()
+    assert calls == ["build", "build"]
+
+    captured: CaptureResult = capsys.readouterr()
+    assert "build: running; output does not exist: out.txt." in captured.err
+    assert "build: skipped; outputs are newer than inputs." in captured.err
+    assert "build: running; input is newer than outputs: src/a.txt." in captured.err
+
+
+@pytest.mark.usefixtures("clean_dir")
+def test_task_skipped_when_inputs_unchanged():
+    # 1. ARRANGE
+    calls: List[str] = []
+
+    Path("a.txt").write_text("a")
+
+    @myke.task(inputs=["a.txt"], outputs=["out.txt"], hash_inputs=True)
+    def build():
+        calls.append("build")
+        Path("out.txt").write_text("out")
+
+    # 2. ACT / 3. ASSERT
+    build()
+    assert calls == ["build"]
+
+    # touched, but unchanged.
+    _set_mtime(Path("a.txt"), 3_000_000_000)
+    build()
+    assert calls == ["build"]
+
+    Path("a.txt").write_text("b")
+    build()
+    assert calls == ["build", "build"]
@@ -1,5 +1,8 @@
+import os
+import sys
 from pathlib import Path
 from typing import List
+from unittest import mock
 
 import myke
 
@@ -25,3 +28,89 @@ def test_get_repo_root():
             Path.cwd() / ".git" / "refs" / "heads" / "main",
         )
     )
+
+
+def test_get_cache_dir(tmp_path: Path):
+    os.environ.pop("MYKE_CACHE_DIR")
+    os.environ["XDG_CACHE_HOME"] = str(tmp_path)
+    assert myke.utils.get_cache_dir() == tmp_path / "myke"
+
+    os.environ["MYKE_CACHE_DIR"] = str(tmp_path / "other")
+    assert myke.utils.get_cache_dir() == tmp_path / "other"
+
+
+def test_mykefile_bytecode_cache(tmp_path: Path):
+    # 1. ARRANGE
+    mykefile: Path = tmp_path / "Mykefile"
+    mykefile.write_text("import myke\n\n@myke.task\ndef bytecode_cached():\n    ...\n")
+
+    cache_dir: Path = tmp_path / "cache"
+    os.environ["MYKE_CACHE_DIR"] = str(cache_dir)
+
+    myke.TASKS.clear()
+
+    # 2. ACT
+    with mock.patch.object(sys, "dont_write_bytecode", False):
+        myke.import_mykefile(str(mykefile))
+    cached: List[Path] = list((cache_dir / "bytecode").glob("*.pyc"))
+
+    myke.TASKS.clear()
+    with mock.patch.object(
+        myke.utils._MykeSourceFileLoader,
+        "source_to_code",
+        side_effect=AssertionError("expected cached bytecode"),
+    ):
+        myke.import_mykefile(str(mykefile))
+
+    # 3. ASSERT
+    assert len(cached) == 1
+    assert not (tmp_path / "__pycache__").exists()
+    assert [x.name for x in myke.TASKS] == ["bytecode-cached"]
+
+    myke.TASKS.clear()
+
+
+def test_get_repo_root_without_git(tmp_path: Path):
+    # 1. ARRANGE
+    repo: Path = tmp_path / "repo"
+    (repo / ".git").mkdir(parents=True)
+    (repo / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+    (repo / "subdir").mkdir()
+
+    worktree: Path = tmp_path / "worktree"
+    worktree.mkdir()
+    (repo / ".git" / "worktrees" / "wt").mkdir(parents=True)
+    (repo / ".git" / "worktrees" / "wt" / "HEAD").write_text("ref: refs/heads/wt\n")
+    (worktree / ".git").write_text(f"gitdir: {repo / '.git' / 'worktrees' / 'wt'}\n")
+
+    not_repo: Path = tmp_path / "not-repo"
+    not_repo.mkdir()
+
+    # 2. ACT / 3. ASSERT
+    with mock.patch.object(
+        myke.utils,
+        "run",
+        side_effect=AssertionError("expected no subprocess"),
+    ):
+        assert myke.utils.get_repo_root(repo / "subdir") == repo.resolve()
+        assert myke.utils.get_repo_root(repo / ".git" / "HEAD") == repo.resolve()
+        assert myke.utils.get_repo_root(worktree) == worktree.resolve()
+
+    # hide any `.git` above `tmp_path`, in case it is itself within a repo.
+    root: Path = tmp_path.resolve()
+    is_dir = Path.is_dir
+    is_file = Path.is_file
+
+    def _within_root(path: Path) -> bool:
+        return path == root or root in path.parents
+
+    with mock.patch.object(
+        Path,
+        "is_dir",
+        lambda x: _within_root(x) and is_dir(x),
+    ), mock.patch.object(
+        Path,
+        "is_file",
+        lambda x: _within_root(x) and is_file(x),
+    ):
+        assert myke.utils.get_repo_root(not_repo) is None